@@ -0,0 +1,150 @@
+"""
+Benchmark evaluating packets against a firewall rule set with FirewallMatcher.
+
+Compares the compiled matcher with testing the rule dicts one by one in position order,
+for a generated rule set and random packets:
+
+    PYTHONPATH=. python benchmarks/bench_firewall_matcher.py [--rules 500] [--packets 100000]
+"""
+
+import argparse
+import random
+import time
+from ipaddress import ip_address
+
+from upcloud_api import FirewallMatcher
+
+FIELDS = ('source_address', 'destination_address', 'source_port', 'destination_port')
+
+
+def build_rules(count, rng):
+    """
+    Return count rule dicts with random address and port ranges, ending with a drop rule.
+    """
+    rules = []
+    for position in range(1, count):
+        rule = {
+            'position': str(position),
+            'direction': rng.choice(['in', 'out']),
+            'family': 'IPv4',
+            'protocol': rng.choice(['', 'tcp', 'udp']),
+            'action': rng.choice(['accept', 'drop']),
+        }
+        low = rng.randrange(0, 1 << 16)
+        rule['source_address_start'] = f'10.0.{low >> 8}.{low & 255}'
+        high = min(low + rng.randrange(0, 1024), (1 << 16) - 1)
+        rule['source_address_end'] = f'10.0.{high >> 8}.{high & 255}'
+        if rule['protocol']:
+            port = rng.randrange(1, 65000)
+            rule['destination_port_start'] = str(port)
+            rule['destination_port_end'] = str(port + rng.randrange(0, 8))
+        rules.append(rule)
+    rules.append({'position': str(count), 'direction': 'in', 'family': 'IPv4', 'action': 'drop'})
+    return rules
+
+
+def build_packets(count, rules, rng):
+    """
+    Return count packets, half of them aimed at the port range of a random rule.
+    """
+    packets = []
+    for _ in range(count):
+        rule = rng.choice(rules)
+        port = rule.get('destination_port_start')
+        address = rng.randrange(0, 1 << 16)
+        packets.append(
+            {
+                'direction': rng.choice(['in', 'out']),
+                'protocol': rng.choice(['tcp', 'udp']),
+                'source_address': f'10.0.{address >> 8}.{address & 255}',
+                'source_port': rng.randrange(1024, 65536),
+                'destination_port': (
+                    int(port) if port and rng.random() < 0.5 else rng.randrange(1, 65536)
+                ),
+            }
+        )
+    return packets
+
+
+def linear_evaluate_many(rules, packets, default_action='accept'):
+    """
+    Evaluate packets by testing the rules one by one in position order.
+
+    The rule ranges are converted to integers up front, so that only the scan is measured.
+    """
+    ranges = []
+    for rule in sorted(rules, key=lambda rule: int(rule['position'])):
+        bounds = []
+        for field in FIELDS:
+            start = rule.get(f'{field}_start')
+            if start:
+                end = rule.get(f'{field}_end') or start
+                if field.endswith('_address'):
+                    start, end = int(ip_address(start)), int(ip_address(end))
+                bounds.append((field, int(start), int(end)))
+        ranges.append((rule.get('direction', 'in'), rule.get('protocol'), bounds, rule['action']))
+
+    results = []
+    for packet in packets:
+        values = dict(packet)
+        for field in ('source_address', 'destination_address'):
+            if field in values:
+                values[field] = int(ip_address(values[field]))
+
+        action = default_action
+        for direction, protocol, bounds, rule_action in ranges:
+            if direction != packet.get('direction', 'in'):
+                continue
+            if protocol and protocol != packet.get('protocol'):
+                continue
+            if all(
+                values.get(field) is not None and start <= values[field] <= end
+                for field, start, end in bounds
+            ):
+                action = rule_action
+                break
+        results.append(action)
+    return results
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rules', type=int, default=500)
+    parser.add_argument('--packets', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)  # noqa: S311
+    rules = build_rules(args.rules, rng)
+    packets = build_packets(args.packets, rules, rng)
+
+    start = time.perf_counter()
+    matcher = FirewallMatcher(rules)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = matcher.evaluate_many(packets)
+    compiled_time = time.perf_counter() - start
+
+    sample = packets[: max(1, args.packets // 20)]
+    start = time.perf_counter()
+    linear = linear_evaluate_many(rules, sample)
+    linear_time = (time.perf_counter() - start) * len(packets) / len(sample)
+
+    if linear != compiled[: len(sample)]:
+        raise SystemExit('the matcher and the linear evaluation disagree')
+
+    print(f'{args.rules} rules, {args.packets} packets (compiled in {compile_time * 1000:.1f} ms)')
+    print(f'{"method":>10} {"time (s)":>9} {"packets/s":>11}')
+    print(f'{"linear":>10} {linear_time:>9.2f} {args.packets / linear_time:>11,.0f}   (estimated)')
+    print(
+        f'{"matcher":>10} {compiled_time:>9.2f} {args.packets / compiled_time:>11,.0f}'
+        f'   {linear_time / compiled_time:.0f}x faster'
+    )
+
+
+if __name__ == '__main__':
+    main()
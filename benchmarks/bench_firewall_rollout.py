@@ -0,0 +1,89 @@
+"""
+Benchmark rolling out a firewall rule set to a fleet of servers against a local mock API.
+
+Compares configure_firewall on one server after another with apply_firewall_to_servers.
+The mock API delays every response by --latency seconds to stand in for the round trip
+to the real API:
+
+    PYTHONPATH=. python benchmarks/bench_firewall_rollout.py [--servers 200] [--latency 0.02]
+"""
+
+import argparse
+import time
+
+from mock_api import start_mock_api
+
+from upcloud_api import CloudManager, FirewallRule
+
+
+def build_rules():
+    """
+    Return the rule set to roll out: SSH, HTTP and HTTPS in, everything else dropped.
+    """
+    rules = [
+        FirewallRule(
+            direction='in',
+            protocol='tcp',
+            destination_port_start=str(port),
+            destination_port_end=str(port),
+            action='accept',
+        )
+        for port in (22, 80, 443)
+    ]
+    return rules + [FirewallRule(direction='in', action='drop')]
+
+
+def rollout(count, latency, max_parallel):
+    """
+    Roll the rules out to count servers with no rules; return the time it took.
+
+    max_parallel=None configures the servers one after another with configure_firewall.
+    """
+    server, api_root, state = start_mock_api(latency)
+    try:
+        manager = CloudManager('user', 'password', pool_size=max(10, max_parallel or 1))
+        manager.api.api_root = api_root
+        uuids = [f'00000000-0000-4000-8000-{i:012d}' for i in range(count)]
+        rules = build_rules()
+
+        start = time.perf_counter()
+        if max_parallel is None:
+            bodies = [rule.to_dict() for rule in rules]
+            for uuid in uuids:
+                manager.configure_firewall(uuid, bodies)
+        else:
+            result = manager.apply_firewall_to_servers(uuids, rules, max_parallel=max_parallel)
+            if not result.ok:
+                raise SystemExit(f'rollout failed: {result.errors}')
+        elapsed = time.perf_counter() - start
+
+        if any(len(state.firewall_rules.get(uuid, [])) != len(rules) for uuid in uuids):
+            raise SystemExit('not every server got the rule set')
+        return elapsed
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--servers', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--parallel', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+
+    serial = rollout(args.servers, args.latency, None)
+    print(f'{args.servers} servers, {len(build_rules())} rules each')
+    print(f'{"method":>30} {"time (s)":>9}')
+    print(f'{"configure_firewall, serially":>30} {serial:>9.2f}')
+    for max_parallel in args.parallel:
+        elapsed = rollout(args.servers, args.latency, max_parallel)
+        label = f'apply_firewall_to_servers({max_parallel})'
+        print(f'{label:>30} {elapsed:>9.2f}   {serial / elapsed:.1f}x faster')
+
+
+if __name__ == '__main__':
+    main()
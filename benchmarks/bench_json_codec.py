@@ -0,0 +1,72 @@
+"""
+Benchmark decoding large list responses with each installed JSON codec.
+
+The list fixtures under test/json_data are repeated to the size of a large account:
+
+    PYTHONPATH=. python benchmarks/bench_json_codec.py [--copies 2000] [--rounds 20]
+"""
+
+import argparse
+import functools
+import json
+import os
+import timeit
+
+from upcloud_api.codec import CODECS, get_codec
+from upcloud_api.errors import UpCloudClientError
+
+FIXTURES = {
+    'server.json': ('servers', 'server'),
+    'storage_public.json': ('storages', 'storage'),
+    'ip_address.json': ('ip_addresses', 'ip_address'),
+}
+JSON_DATA = os.path.join(os.path.dirname(__file__), '..', 'test', 'json_data')
+
+
+def build_body(filename, keys, copies):
+    """
+    Return the fixture encoded as bytes with its list repeated to `copies` elements.
+    """
+    with open(os.path.join(JSON_DATA, filename)) as f:
+        data = json.load(f)
+
+    outer, inner = keys
+    items = data[outer][inner]
+    data[outer][inner] = [items[i % len(items)] for i in range(copies)]
+    return json.dumps(data).encode()
+
+
+def main():
+    """
+    Print the mean decode time per codec next to the `requests` default (bytes -> str -> json).
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--copies', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    codecs = []
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except UpCloudClientError:
+            print(f'{name}: not installed')
+
+    for filename, keys in FIXTURES.items():
+        body = build_body(filename, keys, args.copies)
+        print(f'\n{filename} x{args.copies} ({len(body) / 1024:.0f} KiB)')
+
+        def decode_text(body=body):
+            return json.loads(body.decode('utf-8'))
+
+        baseline = timeit.timeit(decode_text, number=args.rounds) / args.rounds
+        print(f'  {"res.json()":<12} {baseline * 1000:8.2f} ms')
+
+        for codec in codecs:
+            elapsed = timeit.timeit(functools.partial(codec.loads, body), number=args.rounds)
+            elapsed /= args.rounds
+            print(f'  {codec.name:<12} {elapsed * 1000:8.2f} ms  {baseline / elapsed:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
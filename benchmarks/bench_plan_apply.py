@@ -0,0 +1,120 @@
+"""
+Benchmark applying a Plan against a local mock API, serially and in parallel.
+
+The mock API keeps its state in memory and delays every response by --latency seconds
+to stand in for the round trip to the real API:
+
+    PYTHONPATH=. python benchmarks/bench_plan_apply.py [--servers 50] [--latency 0.02]
+"""
+
+import argparse
+import time
+
+from mock_api import start_mock_api
+
+from upcloud_api import (
+    CloudManager,
+    FirewallRule,
+    IpNetwork,
+    Network,
+    Plan,
+    Poller,
+    Router,
+    Server,
+    ServerGroup,
+    Spec,
+    Storage,
+    Tag,
+)
+
+
+def build_spec(count):
+    """
+    Return a Spec of count servers in one private network, server group and tag, with
+    three firewall rules each.
+    """
+    hostnames = [f'web{i}.example.com' for i in range(count)]
+    servers = [
+        Server(
+            hostname=hostname,
+            zone='uk-lon1',
+            plan='1xCPU-1GB',
+            storage_devices=[Storage(os='01000000-0000-4000-8000-000030240200', size=10)],
+            networking=[{'type': 'private', 'network': 'private'}],
+        )
+        for hostname in hostnames
+    ]
+    rules = [
+        FirewallRule(
+            direction='in',
+            protocol='tcp',
+            destination_port_start=str(port),
+            destination_port_end=str(port),
+            action='accept',
+        )
+        for port in (22, 80, 443)
+    ]
+    return Spec(
+        routers=[Router(name='main')],
+        networks=[
+            Network(
+                name='private',
+                zone='uk-lon1',
+                router='main',
+                ip_networks=[IpNetwork(address='10.0.0.0/22', dhcp='yes', family='IPv4')],
+            )
+        ],
+        server_groups=[ServerGroup(title='web', servers=hostnames, anti_affinity='yes')],
+        servers=servers,
+        tags=[Tag('web', servers=hostnames)],
+        firewall_rules={hostname: rules for hostname in hostnames},
+    )
+
+
+def apply(count, latency, max_parallel):
+    """
+    Plan and apply the spec on an empty mock account; return the plan and the apply time.
+    """
+    server, api_root, _ = start_mock_api(latency)
+    try:
+        manager = CloudManager('user', 'password', pool_size=max(10, max_parallel))
+        manager.api.api_root = api_root
+        spec = build_spec(count)
+
+        # new servers are started when first polled, so poll without sleeping
+        plan = Plan(manager, spec, poller=Poller(initial_interval=0, jitter=0))
+        start = time.perf_counter()
+        result = plan.apply(max_parallel=max_parallel)
+        elapsed = time.perf_counter() - start
+
+        if not result.ok:
+            raise SystemExit(f'apply failed: {result.errors}')
+        remaining = Plan(manager, spec)
+        if len(remaining):
+            raise SystemExit(f'the applied spec still has changes:\n{remaining}')
+        return plan, elapsed
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--servers', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--parallel', type=int, default=16)
+    args = parser.parse_args()
+
+    plan, serial = apply(args.servers, args.latency, 1)
+    print(plan.render().splitlines()[0])
+    print(f'{"max_parallel":>14} {"apply (s)":>10}')
+    print(f'{1:>14} {serial:>10.2f}')
+    _, parallel = apply(args.servers, args.latency, args.parallel)
+    print(f'{args.parallel:>14} {parallel:>10.2f}   {serial / parallel:.1f}x faster')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark memory used per resource object.
+
+Builds Storage, IPAddress and FirewallRule objects from the fixtures under test/json_data and
+compares them with plain objects holding the same attributes in a per-instance __dict__ (how
+resources were stored before they got __slots__):
+
+    PYTHONPATH=. python benchmarks/bench_resource_memory.py [--count 100000]
+"""
+
+import argparse
+import json
+import os
+import tracemalloc
+
+from upcloud_api import FirewallRule, IPAddress, Storage
+
+JSON_DATA = os.path.join(os.path.dirname(__file__), '..', 'test', 'json_data')
+
+
+class DictResource:
+    """
+    A resource that keeps its attributes in a __dict__.
+    """
+
+
+def load(filename, *keys):
+    """
+    Return the list under keys in a fixture.
+    """
+    with open(os.path.join(JSON_DATA, filename)) as f:
+        data = json.load(f)
+    for key in keys:
+        data = data[key]
+    return data
+
+
+def bytes_per_object(build, items, count):
+    """
+    Return the average number of bytes allocated for each object built from items.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(items[i % len(items)]) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def as_dict_resource(resource):
+    """
+    Copy the attributes of a slotted resource onto a DictResource.
+    """
+    names = [name for name in type(resource).__slots__ if hasattr(resource, name)]
+    obj = DictResource()
+    for name in names + ['cloud_manager']:
+        setattr(obj, name, getattr(resource, name, None))
+    for name, value in getattr(resource, '_extra', {}).items():
+        setattr(obj, name, value)
+    return obj
+
+
+def main():
+    """
+    Print bytes per object with and without __slots__ for each resource class.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    cases = {
+        Storage: load('storage_public.json', 'storages', 'storage'),
+        IPAddress: load('ip_address.json', 'ip_addresses', 'ip_address'),
+        FirewallRule: load('firewall_rules.json', 'firewall_rules', 'firewall_rule'),
+    }
+
+    for cls, items in cases.items():
+
+        def build(item, cls=cls):
+            return cls(cloud_manager=None, **item)
+
+        slotted = bytes_per_object(build, items, args.count)
+        with_dict = bytes_per_object(as_dict_resource, [build(item) for item in items], args.count)
+        print(
+            f'{cls.__name__:<14} __dict__: {with_dict:6.0f} B   __slots__: {slotted:6.0f} B'
+            f'   saved: {1 - slotted / with_dict:4.0%}'
+        )
+
+
+if __name__ == '__main__':
+    main()
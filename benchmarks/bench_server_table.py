@@ -0,0 +1,92 @@
+"""
+Benchmark a fleet query on a ServerTable against scanning a list of Server objects.
+
+Servers are generated to the size of a large account:
+
+    PYTHONPATH=. python benchmarks/bench_server_table.py [--count 20000] [--rounds 20]
+"""
+
+import argparse
+import time
+import timeit
+
+from upcloud_api import Server, ServerTable
+
+ZONES = ['fi-hel1', 'fi-hel2', 'de-fra1', 'nl-ams1', 'uk-lon1', 'us-nyc1', 'sg-sin1']
+STATES = ['started', 'started', 'started', 'stopped', 'maintenance']
+
+
+def build_servers(count):
+    """
+    Return count server dicts like the ones in a /server list response.
+    """
+    return [
+        {
+            'uuid': f'00000000-0000-4000-8000-{i:012d}',
+            'hostname': f'server{i}.example.com',
+            'title': f'server {i}',
+            'zone': ZONES[i % len(ZONES)],
+            'state': STATES[i % len(STATES)],
+            'plan': 'custom',
+            'core_number': str(1 << (i % 6)),
+            'memory_amount': str(1024 << (i % 4)),
+            'tags': {'tag': [f'team{i % 13}'] + (['web'] if i % 3 == 0 else [])},
+            'labels': {'label': [{'key': 'env', 'value': 'prod' if i % 4 else 'dev'}]},
+        }
+        for i in range(count)
+    ]
+
+
+def scan(servers):
+    """
+    Return the UUIDs of started servers in fi-hel1 tagged web with more than 4 cores.
+    """
+    return [
+        server.uuid
+        for server in servers
+        if server.zone == 'fi-hel1'
+        and server.state == 'started'
+        and 'web' in server.tags
+        and int(server.core_number) > 4
+    ]
+
+
+def query(table):
+    """
+    Return the same UUIDs as scan from a ServerTable.
+    """
+    return table.filter(
+        zone='fi-hel1', state='started', tags='web', core_number=lambda n: n > 4
+    ).column('uuid')
+
+
+def main():
+    """
+    Print the mean time of the query for both representations.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    data = build_servers(args.count)
+    servers = [Server(dict(server)) for server in data]
+    table = ServerTable(data)
+
+    # the first query also builds the row lists and bitmasks of the values it uses
+    start = time.perf_counter()
+    expected = query(table)
+    first = time.perf_counter() - start
+    if scan(servers) != expected:
+        raise SystemExit('ServerTable and list scan disagree')
+
+    baseline = timeit.timeit(lambda: scan(servers), number=args.rounds) / args.rounds
+    elapsed = timeit.timeit(lambda: query(table), number=args.rounds) / args.rounds
+    print(f'{args.count} servers, {len(expected)} matching')
+    print(f'  {"list scan":<18} {baseline * 1000:8.2f} ms')
+    print(f'  {"ServerTable first":<18} {first * 1000:8.2f} ms  {baseline / first:5.1f}x')
+    print(f'  {"ServerTable":<18} {elapsed * 1000:8.2f} ms  {baseline / elapsed:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
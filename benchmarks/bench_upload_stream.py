@@ -0,0 +1,148 @@
+"""
+Benchmark uploading a disk image with UploadStream against a local, bandwidth-limited uploader.
+
+Compares uploading the file and then reading it again to hash it with hashing (and
+compressing) it on the fly. The image is a mix of zero-filled, text-like and random
+blocks, like a partly used disk:
+
+    PYTHONPATH=. python benchmarks/bench_upload_stream.py [--size 128] [--bandwidth 50]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from upcloud_api.upload import UploadStream, zstandard
+
+
+def start_uploader(bandwidth):
+    """
+    Serve an uploader that discards the received bytes at bandwidth MB/s on a free port.
+
+    Returns the server and its URL.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _receive(self, size):
+            self.rfile.read(size)
+            self.received += size
+            # throttle to the bandwidth
+            delay = self.received / (bandwidth * 1e6) - (time.perf_counter() - self.started)
+            if delay > 0:
+                time.sleep(delay)
+
+        def do_PUT(self):
+            self.received = 0
+            self.started = time.perf_counter()
+            if self.headers.get('Transfer-Encoding') == 'chunked':
+                while True:
+                    size = int(self.rfile.readline().strip(), 16)
+                    self._receive(size)
+                    self.rfile.readline()
+                    if not size:
+                        break
+            else:
+                length = int(self.headers['Content-Length'])
+                while length:
+                    size = min(length, 1 << 20)
+                    self._receive(size)
+                    length -= size
+
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/uploader/session/1'
+
+
+def write_image(path, size_mb, rng):
+    """
+    Write an image of size_mb MiB: a third zeros, a third repetitive text and a third random.
+    """
+    text = b''.join(f'line {i}: lorem ipsum dolor sit amet\n'.encode() for i in range(30000))
+    with open(path, 'wb') as f:
+        for block in range(size_mb):
+            kind = block % 3
+            if kind == 0:
+                f.write(bytes(1 << 20))
+            elif kind == 1:
+                f.write(text[: 1 << 20])
+            else:
+                f.write(rng.randbytes(1 << 20))
+
+
+def upload_then_hash(path, url):
+    """
+    Upload the file in one PUT, then read it again to compute its digests.
+    """
+    with open(path, 'rb') as f:
+        requests.put(url, data=f, timeout=600).raise_for_status()
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5(usedforsecurity=False)
+    with open(path, 'rb') as f:
+        while block := f.read(1 << 20):
+            sha256.update(block)
+            md5.update(block)
+    return os.path.getsize(path), os.path.getsize(path) * 2
+
+
+def upload_stream(path, url, compression):
+    """
+    Upload the file with UploadStream; digests are computed while sending.
+    """
+    stream = UploadStream(path, compression=compression)
+    stream.upload(url, timeout=600)
+    return stream.bytes_sent, stream.bytes_read
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=128, help='image size in MiB')
+    parser.add_argument('--bandwidth', type=float, default=50, help='upload bandwidth in MB/s')
+    args = parser.parse_args()
+
+    server, url = start_uploader(args.bandwidth)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'disk.img')
+        write_image(path, args.size, random.Random(1))  # noqa: S311
+
+        methods = [('upload, then hash', lambda: upload_then_hash(path, url))]
+        for compression in (None, 'gzip', 'xz', 'zstd'):
+            if compression == 'zstd' and zstandard is None:
+                continue
+            label = f'UploadStream({compression or "none"})'
+            methods.append((label, lambda c=compression: upload_stream(path, url, c)))
+
+        print(f'{args.size} MiB image, {args.bandwidth:g} MB/s uplink')
+        print(f'{"method":>22} {"time (s)":>9} {"sent (MiB)":>11} {"read (MiB)":>11}')
+        for label, method in methods:
+            start = time.perf_counter()
+            sent, read = method()
+            elapsed = time.perf_counter() - start
+            print(f'{label:>22} {elapsed:>9.2f} {sent / 2**20:>11.1f} {read / 2**20:>11.1f}')
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+In-memory mock of the API endpoints used by the benchmarks, served over HTTP on a local port.
+
+Every response is delayed by `latency` seconds to stand in for the round trip to the real API.
+"""
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockState:
+    """
+    In-memory resources of the mock API.
+    """
+
+    def __init__(self):
+        """
+        Start with an empty account.
+        """
+        self.lists = {'router': [], 'network': [], 'server-group': [], 'server': [], 'tag': []}
+        self.firewall_rules = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def get(self, parts):
+        """
+        Return the body of a GET response.
+        """
+        if len(parts) == 3 and parts[2] == 'firewall_rule':
+            rules = self.firewall_rules.get(parts[1], [])
+            return {'firewall_rules': {'firewall_rule': rules}}
+
+        if len(parts) == 2 and parts[0] == 'server':
+            # new servers are started by the time their details are requested
+            server = next(server for server in self.lists['server'] if server['uuid'] == parts[1])
+            if server['state'] == 'maintenance':
+                server['state'] = 'started'
+            return {'server': server}
+
+        kind = parts[0]
+        plural = {'server-group': 'server_groups'}.get(kind, f'{kind}s')
+        return {plural: {kind.replace('-', '_'): self.lists[kind]}}
+
+    def post(self, parts, body):
+        """
+        Create a resource and return the body of the POST response.
+        """
+        if len(parts) == 3 and parts[2] == 'firewall_rule':
+            rules = self.firewall_rules.setdefault(parts[1], [])
+            rules.append(dict(body['firewall_rule'], position=str(len(rules) + 1)))
+            return {'firewall_rule': rules[-1]}
+
+        kind = parts[0]
+        key = kind.replace('-', '_')
+        resource = dict(body[key], uuid=f'00000000-0000-4000-8000-{next(self.ids):012d}')
+        if kind == 'network':
+            resource['type'] = 'private'
+            resource['ip_networks'] = {'ip_network': [resource['ip_networks']['ip_network']]}
+        if kind == 'server':
+            resource.pop('networking', None)
+            resource['state'] = 'maintenance'
+            for group in self.lists['server-group']:
+                if group['uuid'] == resource.get('server_group'):
+                    group['servers']['server'].append(resource['uuid'])
+        self.lists[kind].append(resource)
+        return {key: resource}
+
+    def put(self, parts, body):
+        """
+        Replace the firewall rules of a server and return the body of the PUT response.
+        """
+        self.firewall_rules[parts[1]] = body['firewall_rules']['firewall_rule']
+        return body
+
+
+def start_mock_api(latency):
+    """
+    Serve a mock API on a free local port.
+
+    Returns the server, its API root URL and its MockState.
+    """
+    state = MockState()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _respond(self, body):
+            time.sleep(latency)
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _parts(self):
+            return self.path.split('?')[0].strip('/').split('/')[1:]
+
+        def do_GET(self):
+            with state.lock:
+                body = state.get(self._parts())
+            self._respond(body)
+
+        def _request_body(self):
+            length = int(self.headers.get('Content-Length', 0))
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def do_POST(self):
+            request_body = self._request_body()
+            with state.lock:
+                body = state.post(self._parts(), request_body)
+            self._respond(body)
+
+        def do_PUT(self):
+            request_body = self._request_body()
+            with state.lock:
+                body = state.put(self._parts(), request_body)
+            self._respond(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/1.3', state
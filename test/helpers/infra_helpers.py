@@ -1,10 +1,7 @@
 def create_cluster(manager, cluster):
     """Create all servers in cluster."""
-    for server in cluster:
-        s = manager.create_server(cluster[server])
-
-    for server in cluster:
-        cluster[server].ensure_started()
+    result = manager.create_servers(list(cluster.values()))
+    assert result.ok, result.errors
 
     return manager.get_servers()
 
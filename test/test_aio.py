@@ -0,0 +1,296 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+from conftest import read_from_file
+
+from upcloud_api import FirewallRule, RateLimiter, Storage, UpCloudClientError
+from upcloud_api.aio import AsyncCloudManager, AsyncServer, AsyncServerTable
+from upcloud_api.polling import Poller
+from upcloud_api.storage_import import StorageImport
+
+SERVER_UUID = '00798b85-efdc-41ca-8021-f6ef457b8531'
+
+
+class AsyncMockAPI:
+    """
+    Serves the JSON fixtures under test/json_data through an httpx.MockTransport.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.overrides = {}
+
+    def handler(self, request):
+        path = request.url.path.replace('/1.3/', '', 1)
+        self.calls.append((request.method, path))
+
+        if (request.method, path) in self.overrides:
+            status, body = self.overrides[(request.method, path)]
+            return httpx.Response(status, json=body)
+
+        if request.method == 'DELETE':
+            return httpx.Response(204)
+
+        if request.method == 'GET':
+            return httpx.Response(200, content=read_from_file(path + '.json'))
+
+        return httpx.Response(200, content=read_from_file(path + '_post.json'))
+
+    def manager(self):
+        return AsyncCloudManager(
+            'testuser', 'mock-api-password', transport=httpx.MockTransport(self.handler)
+        )
+
+
+def server_body(state):
+    data = json.loads(read_from_file(f'server/{SERVER_UUID}.json'))
+    data['server']['state'] = state
+    return data
+
+
+class TestAsyncCloudManager:
+    def test_get_zones(self):
+        mock = AsyncMockAPI()
+
+        async def run():
+            async with mock.manager() as manager:
+                return await manager.get_zones()
+
+        assert asyncio.run(run()) == json.loads(read_from_file('zone.json'))
+
+    def test_get_populated_servers(self):
+        mock = AsyncMockAPI()
+
+        async def run():
+            async with mock.manager() as manager:
+                return await manager.get_servers(populate=True)
+
+        servers = asyncio.run(run())
+
+        assert [type(server) for server in servers] == [AsyncServer, AsyncServer]
+        assert all(server.populated for server in servers)
+        assert ('GET', f'server/{SERVER_UUID}') in mock.calls
+        assert servers[0].storage_devices[0].title == 'Storage for server1.example.com'
+
+    def test_iter_servers(self):
+        mock = AsyncMockAPI()
+
+        async def run():
+            async with mock.manager() as manager:
+                return [server async for server in manager.iter_servers()]
+
+        servers = asyncio.run(run())
+
+        assert [type(server) for server in servers] == [AsyncServer, AsyncServer]
+        assert servers[0].uuid == SERVER_UUID
+
+    def test_get_server_table(self):
+        mock = AsyncMockAPI()
+
+        async def run():
+            async with mock.manager() as manager:
+                return await manager.get_server_table()
+
+        table = asyncio.run(run())
+
+        assert len(table) == 2
+        assert isinstance(table, AsyncServerTable)
+        assert [type(server) for server in table.filter(uuid=SERVER_UUID).servers()] == [
+            AsyncServer
+        ]
+        with pytest.raises(UpCloudClientError):
+            table.servers(populate=True)
+
+    def test_populate_server_table(self):
+        mock = AsyncMockAPI()
+
+        async def run():
+            async with mock.manager() as manager:
+                table = await manager.get_server_table()
+                return await table.filter(uuid=SERVER_UUID).populate_servers(max_concurrency=2)
+
+        servers = asyncio.run(run())
+
+        assert servers.ok
+        assert [type(server) for server in servers] == [AsyncServer]
+        assert servers[0].populated
+        assert servers[0].storage_devices[0].title == 'Storage for server1.example.com'
+        assert mock.calls == [('GET', 'server'), ('GET', f'server/{SERVER_UUID}')]
+
+    def test_tag_servers_from_identity_map(self):
+        mock = AsyncMockAPI()
+        tag = {'tag': {'name': 'web', 'description': '', 'servers': {'server': [SERVER_UUID]}}}
+        mock.overrides[('GET', 'tag/web')] = (200, tag)
+
+        async def run():
+            async with AsyncCloudManager(
+                'testuser',
+                'mock-api-password',
+                transport=httpx.MockTransport(mock.handler),
+                identity_map=True,
+            ) as manager:
+                server = await manager.get_server(SERVER_UUID)
+                return server, await manager.get_tag('web')
+
+        server, tag = asyncio.run(run())
+
+        assert tag.servers[0] is server
+        assert isinstance(server, AsyncServer)
+
+    def test_get_storage(self):
+        mock = AsyncMockAPI()
+
+        async def run():
+            async with mock.manager() as manager:
+                return await manager.get_storage('01d4fcd4-e446-433b-8a9c-551a1284952e')
+
+        storage = asyncio.run(run())
+        assert isinstance(storage, Storage)
+        assert storage.uuid == '01d4fcd4-e446-433b-8a9c-551a1284952e'
+
+    def test_upload_file_for_storage_import(self, tmp_path):
+        mock = AsyncMockAPI()
+        handler = mock.handler
+        uploads = []
+
+        def upload_handler(request):
+            if request.url.host != 'fi-hel1.img.upcloud.com':
+                return handler(request)
+            uploads.append((request.headers['Content-Length'], request.content))
+            return httpx.Response(200, json={'written_bytes': len(request.content)})
+
+        mock.handler = upload_handler
+        path = tmp_path / 'disk.img'
+        path.write_bytes(b'x' * 3000000)
+        storage_import = StorageImport(
+            direct_upload_url='https://fi-hel1.img.upcloud.com/uploader/session/07a6c9a3'
+        )
+
+        async def run():
+            async with mock.manager() as manager:
+                return await manager.upload_file_for_storage_import(storage_import, str(path))
+
+        assert asyncio.run(run()) == {'written_bytes': 3000000}
+        assert uploads == [('3000000', b'x' * 3000000)]
+
+    def test_shared_rate_limiter_off_the_event_loop(self, tmp_path, monkeypatch):
+        mock = AsyncMockAPI()
+        limiter = RateLimiter(rate=100, path=str(tmp_path / 'rate-limit'))
+        threads = []
+        reserve = limiter.reserve
+
+        def recording_reserve(method='GET'):
+            threads.append(threading.current_thread())
+            return reserve(method)
+
+        monkeypatch.setattr(limiter, 'reserve', recording_reserve)
+
+        async def run():
+            async with mock.manager() as manager:
+                manager.api.rate_limiter = limiter
+                await manager.get_zones()
+                with manager.api.paced_by(RateLimiter(rate=100, path=str(tmp_path / 'rollout'))):
+                    await manager.get_zones()
+
+        asyncio.run(run())
+
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+    def test_api_error(self):
+        from upcloud_api import UpCloudAPIError
+
+        mock = AsyncMockAPI()
+        mock.overrides[('GET', 'server/missing')] = (
+            404,
+            {'error': {'error_code': 'SERVER_NOT_FOUND', 'error_message': 'not found'}},
+        )
+
+        async def run():
+            async with mock.manager() as manager:
+                await manager.get_server('missing')
+
+        with pytest.raises(UpCloudAPIError) as exc:
+            asyncio.run(run())
+        assert exc.value.error_code == 'SERVER_NOT_FOUND'
+
+
+class TestAsyncServer:
+    def test_save_changed_fields(self):
+        mock = AsyncMockAPI()
+        mock.overrides[('PUT', f'server/{SERVER_UUID}')] = (200, server_body('started'))
+
+        async def run():
+            async with mock.manager() as manager:
+                server = await manager.get_server(SERVER_UUID)
+                await server.save()
+                server.title = 'Updated server'
+                await server.save()
+                await server.save()
+
+        asyncio.run(run())
+
+        assert mock.calls.count(('PUT', f'server/{SERVER_UUID}')) == 1
+
+    def test_modify_server_rejects_other_fields(self):
+        mock = AsyncMockAPI()
+
+        async def run():
+            async with mock.manager() as manager:
+                await manager.modify_server(SERVER_UUID, state='stopped')
+
+        with pytest.raises(UpCloudClientError):
+            asyncio.run(run())
+        assert mock.calls == []
+
+    def test_ensure_started(self):
+        mock = AsyncMockAPI()
+        mock.overrides[('GET', f'server/{SERVER_UUID}')] = (200, server_body('stopped'))
+        mock.overrides[('POST', f'server/{SERVER_UUID}/start')] = (200, server_body('started'))
+
+        async def run():
+            async with mock.manager() as manager:
+                server = await manager.get_server(SERVER_UUID)
+                assert server.state == 'stopped'
+                return await server.ensure_started(), server
+
+        started, server = asyncio.run(run())
+        assert started
+        assert server.state == 'started'
+
+    def test_stop_and_destroy(self):
+        mock = AsyncMockAPI()
+        mock.overrides[('POST', f'server/{SERVER_UUID}/stop')] = (200, server_body('started'))
+
+        async def run():
+            async with mock.manager() as manager:
+                server = await manager.get_server(SERVER_UUID)
+                await server.stop()
+                mock.overrides[('GET', f'server/{SERVER_UUID}')] = (200, server_body('stopped'))
+                await server._wait_for_state_change(['stopped'], Poller(initial_interval=0))
+                await server.stop_and_destroy()
+
+        asyncio.run(run())
+
+        assert ('DELETE', f'server/{SERVER_UUID}') in mock.calls
+        assert ('DELETE', 'storage/012580a1-32a1-466e-a323-689ca16f2d43') in mock.calls
+
+    def test_sync_firewall(self):
+        mock = AsyncMockAPI()
+        rules = json.loads(read_from_file('firewall_rules.json'))
+        mock.overrides[('GET', f'server/{SERVER_UUID}/firewall_rule')] = (200, rules)
+        desired = [FirewallRule(**rule) for rule in rules['firewall_rules']['firewall_rule'][:4]]
+
+        async def run():
+            async with mock.manager() as manager:
+                server = await manager.get_server(SERVER_UUID)
+                return await server.sync_firewall(desired)
+
+        summary = asyncio.run(run())
+
+        assert summary['deleted'] == 1
+        assert summary['unchanged'] == 4
+        assert mock.calls[-1] == ('DELETE', f'server/{SERVER_UUID}/firewall_rule/5')
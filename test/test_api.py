@@ -0,0 +1,232 @@
+import time
+
+import responses
+from conftest import Mock
+
+from upcloud_api import CloudManager, Poller, ResponseCache
+from upcloud_api.api import API
+
+
+class TestAPIConnectionPool:
+    @responses.activate
+    def test_session_is_reused(self):
+        Mock.mock_get('zone')
+        api = API('Basic dGVzdA==')
+
+        api.get_request('/zone')
+        session = api.session
+        api.get_request('/zone')
+
+        assert api.session is session
+        adapter = session.get_adapter(Mock.base_url)
+        assert adapter._pool_maxsize == 10
+
+    @responses.activate
+    def test_idle_session_is_evicted(self):
+        Mock.mock_get('zone')
+        api = API('Basic dGVzdA==', pool_idle_timeout=0)
+
+        api.get_request('/zone')
+        session = api.session
+        api._last_used -= 1
+        api.get_request('/zone')
+
+        assert api.session is not session
+
+    @responses.activate
+    def test_keep_alive_disabled(self):
+        Mock.mock_get('zone')
+        api = API('Basic dGVzdA==', keep_alive=False)
+
+        api.get_request('/zone')
+
+        assert responses.calls[0].request.headers['Connection'] == 'close'
+
+    def test_cloud_manager_pool_settings(self):
+        manager = CloudManager('testuser', 'mock-api-password', pool_size=32, pool_idle_timeout=5)
+
+        assert manager.api.pool_size == 32
+        assert manager.api.pool_idle_timeout == 5
+        adapter = manager.api.session.get_adapter(Mock.base_url)
+        assert adapter._pool_maxsize == 32
+
+        manager.close()
+        assert manager.api._session is None
+
+
+class TestResponseCache:
+    @responses.activate
+    def test_catalog_responses_are_cached(self):
+        Mock.mock_get('zone')
+        manager = CloudManager('testuser', 'mock-api-password', cache=True)
+
+        zones = manager.get_zones()
+        zones['zones']['zone'].clear()
+        cached = manager.get_zones()
+
+        assert len(responses.calls) == 1
+        assert cached['zones']['zone']
+        assert manager.api.cache.stats == {'hits': 1, 'misses': 1, 'revalidated': 0, 'size': 1}
+
+    @responses.activate
+    def test_mutable_resources_are_not_cached_by_default(self):
+        Mock.mock_get('server')
+        manager = CloudManager('testuser', 'mock-api-password', cache=True)
+
+        manager.get_servers()
+        manager.get_servers()
+
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_expired_entries_are_refetched(self):
+        Mock.mock_get('zone')
+        api = API('Basic dGVzdA==', cache=ResponseCache(ttls={'/zone': 0.01}))
+
+        api.get_request('/zone')
+        time.sleep(0.02)
+        api.get_request('/zone')
+
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_state_polls_revalidate_cached_responses(self):
+        uuid = '00798b85-efdc-41ca-8021-f6ef457b8531'
+        for state in ('maintenance', 'started'):
+            data = Mock.read_from_file('server.json').replace('"started"', f'"{state}"')
+            responses.add(responses.GET, f'{Mock.base_url}/server', body=data)
+        for state in ('maintenance', 'started'):
+            body = {'server': {'uuid': uuid, 'state': state}}
+            responses.add(responses.GET, f'{Mock.base_url}/server/{uuid}', json=body)
+        cache = ResponseCache(ttls={'/server': 60, '/server/*': 60})
+        manager = CloudManager('testuser', 'mock-api-password', cache=cache)
+        server = manager.get_servers()[0]
+
+        stragglers = manager.wait_for_servers(
+            [server], ['started'], poller=Poller(initial_interval=0, jitter=0, timeout=5)
+        )
+
+        assert stragglers == []
+        assert manager.get_server_state(uuid) == 'maintenance'
+        assert manager.get_server_state(uuid) == 'started'
+
+    @responses.activate
+    def test_writes_invalidate_opted_in_resources(self):
+        Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
+        Mock.mock_server_operation('server/00798b85-efdc-41ca-8021-f6ef457b8531/stop')
+        cache = ResponseCache(ttls={'/server/*': 60})
+        manager = CloudManager('testuser', 'mock-api-password', cache=cache)
+
+        server = manager.get_server('00798b85-efdc-41ca-8021-f6ef457b8531')
+        manager.get_server('00798b85-efdc-41ca-8021-f6ef457b8531')
+        assert len(responses.calls) == 1
+
+        server.stop()
+        manager.get_server('00798b85-efdc-41ca-8021-f6ef457b8531')
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_writes_invalidate_related_resources(self):
+        uuid = '00798b85-efdc-41ca-8021-f6ef457b8531'
+        responses.add(responses.DELETE, f'{Mock.base_url}/server/{uuid}', status=204)
+        responses.add(responses.POST, f'{Mock.base_url}/ip_address', json={}, status=201)
+        responses.add(responses.POST, f'{Mock.base_url}/server/{uuid}/tag/web', json={})
+        api = API('Basic dGVzdA==', cache=ResponseCache())
+
+        def cached(*endpoints):
+            for endpoint in endpoints:
+                api.cache.set(endpoint, {}, 60)
+            return lambda endpoint: api.cache.get(endpoint) is not None
+
+        is_cached = cached('/storage', f'/storage/{uuid}', '/zone')
+        api.delete_request(f'/server/{uuid}?storages=1')
+        assert not is_cached('/storage')
+        assert not is_cached(f'/storage/{uuid}')
+        assert is_cached('/zone')
+
+        is_cached = cached('/server', f'/server/{uuid}', '/storage')
+        api.post_request('/ip_address', {'ip_address': {'server': uuid}})
+        assert not is_cached('/server')
+        assert not is_cached(f'/server/{uuid}')
+        assert is_cached('/storage')
+
+        is_cached = cached('/tag', '/tag/web', '/storage')
+        api.post_request(f'/server/{uuid}/tag/web')
+        assert not is_cached('/tag')
+        assert not is_cached('/tag/web')
+        assert is_cached('/storage')
+
+    def test_invalidate_write(self):
+        cache = ResponseCache()
+        for endpoint in ('/server/1', '/storage/2', '/network/3', '/router/4'):
+            cache.set(endpoint, {}, 60)
+
+        # firewall rules and power operations only change the server itself
+        cache.invalidate_write('POST', '/server/1/firewall_rule')
+        cache.invalidate_write('POST', '/server/1/stop')
+        assert cache.get('/storage/2') is not None
+
+        cache.invalidate_write('POST', '/server/1/storage/attach')
+        assert cache.get('/storage/2') is None
+        assert cache.get('/router/4') is not None
+
+        cache.invalidate_write('PUT', '/network/3/')
+        assert cache.get('/router/4') is None
+
+    @responses.activate
+    def test_expired_entries_are_revalidated(self):
+        url = Mock.base_url + '/storage/template'
+        responses.add(
+            responses.GET,
+            url,
+            body=Mock.read_from_file('storage_template.json'),
+            headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'},
+        )
+        responses.add(responses.GET, url, status=304)
+        api = API('Basic dGVzdA==', cache=ResponseCache(ttls={'/storage/template': 0}))
+
+        first = api.get_request('/storage/template')
+        second = api.get_request('/storage/template')
+
+        assert second == first
+        conditional = responses.calls[1].request.headers
+        assert conditional['If-None-Match'] == '"v1"'
+        assert conditional['If-Modified-Since'] == 'Wed, 21 Oct 2015 07:28:00 GMT'
+        assert api.cache.revalidated == 1
+
+    @responses.activate
+    def test_responses_without_validators_are_not_kept_after_expiry(self):
+        Mock.mock_get('zone')
+        api = API('Basic dGVzdA==', cache=ResponseCache(ttls={'/zone': 0}))
+
+        api.get_request('/zone')
+        api.get_request('/zone')
+
+        assert len(responses.calls) == 2
+        assert 'If-None-Match' not in responses.calls[1].request.headers
+        assert api.cache.stats['size'] == 0
+
+    def test_lru_bound_and_invalidation(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set('/zone', {'zones': 1}, 60)
+        cache.set('/plan', {'plans': 1}, 60)
+        cache.get('/zone')
+        cache.set('/price', {'prices': 1}, 60)
+
+        assert cache.get('/plan') is None
+        assert cache.get('/zone') == {'zones': 1}
+
+        cache.invalidate('/zone')
+        assert cache.get('/zone') is None
+        assert cache.get('/price') == {'prices': 1}
+
+        cache.invalidate()
+        assert cache.stats['size'] == 0
+
+    def test_ttl_lookup(self):
+        cache = ResponseCache(ttls={'/server/*': 5, '/plan': None})
+
+        assert cache.ttl_for('/zone') == 3600
+        assert cache.ttl_for('/server/uuid?x=1') == 5
+        assert cache.ttl_for('/server') is None
+        assert cache.ttl_for('/plan') is None
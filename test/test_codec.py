@@ -0,0 +1,55 @@
+import json
+
+import pytest
+import responses
+from conftest import Mock
+
+from upcloud_api import CloudManager, UpCloudClientError
+from upcloud_api.codec import CODECS, JSONCodec, get_codec
+
+INSTALLED = [name for name, (_, module) in CODECS.items() if module() is not None]
+
+
+class CountingCodec(JSONCodec):
+    def __init__(self):
+        self.decoded = []
+
+    def loads(self, data):
+        self.decoded.append(data)
+        return super().loads(data)
+
+
+class TestJSONCodec:
+    def test_default_is_fastest_installed(self):
+        assert get_codec().name == INSTALLED[0]
+
+    def test_unknown_codec(self):
+        with pytest.raises(UpCloudClientError):
+            get_codec('yaml')
+
+    @pytest.mark.parametrize('name', INSTALLED)
+    @responses.activate
+    def test_round_trip(self, name):
+        responses.add(
+            responses.POST,
+            Mock.base_url + '/tag',
+            body=Mock.read_from_file('tag_TheTestTag.json'),
+            status=201,
+        )
+        manager = CloudManager('testuser', 'mock-api-password', json_codec=name)
+
+        res = manager.api.post_request('/tag', {'tag': {'name': 'ä-tag'}})
+
+        assert json.loads(responses.calls[0].request.body) == {'tag': {'name': 'ä-tag'}}
+        assert res == json.loads(Mock.read_from_file('tag_TheTestTag.json'))
+
+    @responses.activate
+    def test_decodes_response_bytes(self):
+        Mock.mock_get('zone')
+        codec = CountingCodec()
+        manager = CloudManager('testuser', 'mock-api-password', json_codec=codec)
+
+        manager.get_zones()
+
+        assert manager.api.json_codec is codec
+        assert isinstance(codec.decoded[0], bytes)
@@ -1,9 +1,11 @@
 import json
+import re
 
 import responses
 from conftest import Mock
 
-from upcloud_api import FirewallRule
+from upcloud_api import FirewallRule, RateLimiter
+from upcloud_api.firewall import diff_firewall_rules
 
 
 def firewall_rule_callback(request):
@@ -148,3 +150,179 @@ class TestFirewall:
         assert returned_firewall[1].position == '2'
         assert returned_firewall[1].direction == 'out'
         assert returned_firewall[1].source_address_end == '192.168.1.255'
+
+    def test_diff_firewall_rules(self):
+        current = [
+            FirewallRule(action='accept', protocol=protocol, position=str(position)).to_dict()
+            for position, protocol in enumerate('abcd', start=1)
+        ]
+        desired = [FirewallRule(action='accept', protocol=p) for p in 'xacd']
+
+        edits = diff_firewall_rules(current, desired)
+
+        assert [edit[:2] for edit in edits] == [('delete', 2), ('insert', 1)]
+        assert edits[1][2]['protocol'] == 'x'
+        assert edits[1][2]['position'] == '1'
+        # the API returns empty fields as '' and positions that do not matter
+        assert diff_firewall_rules([dict(rule, comment='') for rule in current], current) == []
+
+    @responses.activate
+    def test_sync_firewall(self, manager):
+        uuid = '00798b85-efdc-41ca-8021-f6ef457b8531'
+        target = f'server/{uuid}/firewall_rule'
+        Mock.mock_get(target, 'firewall_rules.json')
+        current = json.loads(Mock.read_from_file('firewall_rules.json'))
+        current = current['firewall_rules']['firewall_rule']
+
+        # nothing to change: only the listing request
+        summary = manager.sync_firewall(uuid, [FirewallRule(**rule) for rule in current])
+        assert summary == {
+            'inserted': 0,
+            'deleted': 0,
+            'unchanged': 5,
+            'replaced': False,
+            'requests': 0,
+        }
+        assert len(responses.calls) == 1
+
+        # one rule less: a single delete
+        Mock.mock_delete(f'{target}/3')
+        summary = manager.sync_firewall(uuid, current[:2] + current[3:])
+        assert summary['deleted'] == 1
+        assert summary['requests'] == 1
+        assert responses.calls[-1].request.method == 'DELETE'
+
+    @responses.activate
+    def test_sync_firewall_replace(self, manager):
+        uuid = '00798b85-efdc-41ca-8021-f6ef457b8531'
+        url = f'{Mock.base_url}/server/{uuid}/firewall_rule'
+        Mock.mock_get(f'server/{uuid}/firewall_rule', 'firewall_rules.json')
+        responses.add_callback(
+            responses.PUT, url, callback=lambda request: (200, {}, request.body)
+        )
+        desired = [
+            FirewallRule(protocol='tcp', destination_port_start='443', action='accept'),
+            FirewallRule(protocol='udp', destination_port_start='53', action='accept'),
+        ]
+
+        summary = manager.sync_firewall(uuid, desired)
+
+        assert summary['inserted'] == 2
+        assert summary['deleted'] == 5
+        assert summary['replaced'] is True
+        assert summary['requests'] == 1
+        body = json.loads(responses.calls[-1].request.body)
+        rules = body['firewall_rules']['firewall_rule']
+        assert [(rule['position'], rule['protocol']) for rule in rules] == [
+            ('1', 'tcp'),
+            ('2', 'udp'),
+        ]
+
+    @responses.activate
+    def test_sync_firewall_without_replace(self, manager):
+        uuid = '00798b85-efdc-41ca-8021-f6ef457b8531'
+        Mock.mock_get(f'server/{uuid}')
+        server = manager.get_server(uuid)
+        current = [FirewallRule(protocol=p, position=str(i)) for i, p in enumerate('ab', 1)]
+        url = f'{Mock.base_url}/server/{uuid}/firewall_rule'
+        Mock.mock_delete(f'server/{uuid}/firewall_rule/1')
+        responses.add_callback(
+            responses.POST, url, callback=lambda request: (201, {}, request.body)
+        )
+
+        summary = manager.sync_firewall(
+            server,
+            [FirewallRule(protocol='b'), FirewallRule(protocol='c')],
+            current,
+            replace=False,
+        )
+
+        assert summary['requests'] == 2
+        assert [(call.request.method, call.request.url) for call in responses.calls[1:]] == [
+            ('DELETE', f'{url}/1'),
+            ('POST', url),
+        ]
+        created = json.loads(responses.calls[2].request.body)['firewall_rule']
+        assert (created['position'], created['protocol']) == ('2', 'c')
+
+    @responses.activate
+    def test_apply_firewall_to_servers(self, manager, monkeypatch):
+        monkeypatch.setattr('upcloud_api.utils.sleep', lambda seconds: None)
+        firewall_rules = {uuid: [] for uuid in ('ok', 'busy', 'broken', 'done')}
+        firewall_rules['done'] = [{'action': 'accept', 'protocol': 'tcp', 'position': '1'}]
+        failing = {'busy': [429], 'broken': [500]}
+
+        def _callback(request):
+            uuid = request.url.split('/')[-2]
+            if failing.get(uuid):
+                error = {'error_code': 'FAILED', 'error_message': uuid}
+                return (failing[uuid].pop(), {}, json.dumps({'error': error}))
+            if request.method == 'PUT':
+                body = json.loads(request.body)
+                firewall_rules[uuid] = body['firewall_rules']['firewall_rule']
+            elif request.method == 'POST':
+                rule = json.loads(request.body)['firewall_rule']
+                firewall_rules[uuid].append(rule)
+                return (201, {}, json.dumps({'firewall_rule': rule}))
+            return (
+                200,
+                {},
+                json.dumps({'firewall_rules': {'firewall_rule': firewall_rules[uuid]}}),
+            )
+
+        for method in (responses.GET, responses.POST, responses.PUT):
+            responses.add_callback(
+                method, re.compile(rf'{Mock.base_url}/server/\w+/firewall_rule'), _callback
+            )
+        rules = [
+            FirewallRule(action='accept', protocol='tcp'),
+            FirewallRule(action='accept', protocol='udp'),
+        ]
+
+        result = manager.apply_firewall_to_servers(list(firewall_rules), rules, max_parallel=4)
+
+        assert list(result.errors) == ['broken']
+        assert result.errors['broken'].status_code == 500
+        assert result[2] is None
+        assert [summary['requests'] for summary in (result[0], result[1], result[3])] == [1, 1, 1]
+        assert result[3]['inserted'] == 1
+        assert result[3]['unchanged'] == 1
+
+        # resuming only touches the failed server
+        resumed = manager.apply_firewall_to_servers(list(result.errors), rules)
+
+        assert resumed.ok
+        expected = [('accept', 'tcp'), ('accept', 'udp')]
+        for uuid_rules in firewall_rules.values():
+            assert [(rule['action'], rule['protocol']) for rule in uuid_rules] == expected
+
+    @responses.activate
+    def test_apply_firewall_to_servers_rate_limiter(self, manager):
+        class RecordingLimiter(RateLimiter):
+            def acquire(self, method='GET'):
+                self.methods.append(method)
+
+        limiter = RecordingLimiter(rate=5)
+        limiter.methods = []
+        responses.add(
+            responses.GET,
+            re.compile(rf'{Mock.base_url}/server/\w+/firewall_rule'),
+            json={'firewall_rules': {'firewall_rule': []}},
+        )
+        responses.add(
+            responses.POST,
+            re.compile(rf'{Mock.base_url}/server/\w+/firewall_rule'),
+            json={'firewall_rule': {'action': 'drop', 'position': '1'}},
+            status=201,
+        )
+
+        result = manager.apply_firewall_to_servers(
+            ['a', 'b', 'c'], [FirewallRule(action='drop')], rate_limiter=limiter
+        )
+
+        assert result.ok
+        assert sorted(limiter.methods) == ['GET'] * 3 + ['POST'] * 3
+        # the limiter only paces the rollout
+        assert manager.api.rate_limiter is None
+        manager.get_firewall_rules('a')
+        assert len(limiter.methods) == 6
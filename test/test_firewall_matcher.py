@@ -0,0 +1,179 @@
+import json
+import random
+from ipaddress import ip_address
+
+import pytest
+from conftest import Mock
+
+from upcloud_api import FirewallMatcher, FirewallRule, UpCloudClientError
+
+
+def linear_evaluate(rules, packet, default_action='accept'):
+    """
+    Reference evaluation: test the rules one by one in position order.
+    """
+
+    def in_range(rule, field, value):
+        start = rule.get(f'{field}_start') or rule.get(f'{field}_end')
+        end = rule.get(f'{field}_end') or start
+        if not start:
+            return True
+        if value is None:
+            return False
+        if field.endswith('_address'):
+            return int(ip_address(start)) <= int(ip_address(value)) <= int(ip_address(end))
+        return int(start) <= int(value) <= int(end)
+
+    for rule in sorted(rules, key=lambda rule: int(rule['position'])):
+        if rule.get('direction', 'in') != packet.get('direction', 'in'):
+            continue
+        if rule.get('family', 'IPv4') != packet.get('family', 'IPv4'):
+            continue
+        if rule.get('protocol') and rule['protocol'] != packet.get('protocol'):
+            continue
+        if rule.get('icmp_type') and rule['icmp_type'] != packet.get('icmp_type'):
+            continue
+        fields = ('source_address', 'destination_address', 'source_port', 'destination_port')
+        if all(in_range(rule, field, packet.get(field)) for field in fields):
+            return rule.get('action', 'drop')
+    return default_action
+
+
+class TestFirewallMatcher:
+    def test_first_match_by_position(self):
+        matcher = FirewallMatcher(
+            [
+                FirewallRule(
+                    position='2', protocol='tcp', destination_port_start='22', action='accept'
+                ),
+                FirewallRule(
+                    position='1',
+                    source_address_start='10.0.0.0',
+                    source_address_end='10.0.0.255',
+                    action='drop',
+                ),
+                FirewallRule(position='3', action='drop'),
+            ]
+        )
+        ssh = {'protocol': 'tcp', 'destination_port': 22}
+
+        assert matcher.evaluate(dict(ssh, source_address='10.0.0.5')) == 'drop'
+        assert matcher.evaluate(dict(ssh, source_address='10.0.1.5')) == 'accept'
+        assert matcher.match(dict(ssh, source_address='10.0.1.5')).position == '2'
+        assert matcher.evaluate(dict(ssh, destination_port=23)) == 'drop'
+        # no rules for outgoing or IPv6 traffic
+        assert matcher.evaluate({'direction': 'out'}) == 'accept'
+        assert matcher.evaluate({'source_address': '2001:db8::1'}) == 'accept'
+        assert matcher.match({'direction': 'out'}) is None
+        assert [rule.position for rule in matcher.rules] == ['1', '2', '3']
+
+    def test_ranges_protocols_and_icmp(self):
+        matcher = FirewallMatcher(
+            [
+                {'position': '1', 'protocol': 'icmp', 'icmp_type': '8', 'action': 'accept'},
+                {
+                    'position': '2',
+                    'family': 'IPv6',
+                    'source_address_start': '2001:db8::',
+                    'source_address_end': '2001:db8::ffff',
+                    'action': 'accept',
+                },
+                {
+                    'position': '3',
+                    'protocol': 'udp',
+                    'destination_port_start': '1000',
+                    'destination_port_end': '2000',
+                    'action': 'accept',
+                },
+            ],
+            default_action='drop',
+        )
+
+        assert matcher.evaluate({'protocol': 'icmp', 'icmp_type': 8}) == 'accept'
+        assert matcher.evaluate({'protocol': 'icmp', 'icmp_type': 0}) == 'drop'
+        assert matcher.evaluate({'source_address': '2001:db8::abcd'}) == 'accept'
+        assert matcher.evaluate({'source_address': '2001:db8::1:0'}) == 'drop'
+        assert matcher.evaluate_many(
+            [
+                {'protocol': 'udp', 'destination_port': port}
+                for port in (999, 1000, 1500, 2000, 2001)
+            ]
+        ) == ['drop', 'accept', 'accept', 'accept', 'drop']
+        # a port rule does not match a packet without a port
+        assert matcher.evaluate({'protocol': 'udp'}) == 'drop'
+
+    def test_api_rules(self):
+        rules = json.loads(Mock.read_from_file('firewall_rules.json'))
+        # the fixture's IPv6 rule has an incomplete address
+        rules = [
+            FirewallRule(**rule)
+            for rule in rules['firewall_rules']['firewall_rule']
+            if rule['family'] == 'IPv4'
+        ]
+
+        matcher = FirewallMatcher(rules)
+
+        assert len(matcher) == len(rules) > 1
+        for packet in (
+            {'protocol': 'tcp', 'destination_port': 80, 'source_address': '192.0.2.1'},
+            {'protocol': 'tcp', 'destination_port': 22, 'source_address': '192.0.2.1'},
+            {'protocol': 'udp', 'destination_port': 53, 'source_address': '192.0.2.1'},
+        ):
+            expected = linear_evaluate([rule.to_dict() for rule in rules], packet)
+            assert matcher.evaluate(packet) == expected
+
+    def test_matches_linear_evaluation(self):
+        rng = random.Random(7)  # noqa: S311
+
+        def random_range(field):
+            if rng.random() < 0.4:
+                return {}
+            if field.endswith('_address'):
+                low = rng.randrange(0, 64)
+                high = low + rng.randrange(0, 16)
+                return {
+                    f'{field}_start': f'192.0.2.{low}',
+                    f'{field}_end': f'192.0.2.{high}',
+                }
+            low = rng.randrange(0, 100)
+            return {f'{field}_start': str(low), f'{field}_end': str(low + rng.randrange(0, 20))}
+
+        rules = []
+        for position in range(1, 81):
+            rule = {
+                'position': str(position),
+                'direction': rng.choice(['in', 'out']),
+                'protocol': rng.choice(['', 'tcp', 'udp']),
+                'action': rng.choice(['accept', 'drop']),
+            }
+            for field in (
+                'source_address',
+                'destination_address',
+                'source_port',
+                'destination_port',
+            ):
+                rule.update(random_range(field))
+            rules.append(rule)
+        rng.shuffle(rules)
+
+        packets = [
+            {
+                'direction': rng.choice(['in', 'out']),
+                'protocol': rng.choice(['tcp', 'udp', 'icmp']),
+                'source_address': f'192.0.2.{rng.randrange(0, 90)}',
+                'destination_address': f'192.0.2.{rng.randrange(0, 90)}',
+                'source_port': rng.randrange(0, 130),
+                'destination_port': rng.randrange(0, 130),
+            }
+            for _ in range(2000)
+        ]
+
+        matcher = FirewallMatcher(rules, default_action='drop')
+
+        assert matcher.evaluate_many(packets) == [
+            linear_evaluate(rules, packet, 'drop') for packet in packets
+        ]
+
+    def test_invalid_rule(self):
+        with pytest.raises(UpCloudClientError):
+            FirewallMatcher([FirewallRule(source_address_start='not an address')])
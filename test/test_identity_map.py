@@ -0,0 +1,132 @@
+import gc
+
+import pytest
+import responses
+from conftest import Mock
+
+import upcloud_api
+from upcloud_api import IdentityMap, Inventory, Server, Storage
+
+HELSINKI = '00798b85-efdc-41ca-8021-f6ef457b8531'
+STORAGE = '01d4fcd4-e446-433b-8a9c-551a1284952e'
+
+
+@pytest.fixture
+def manager():
+    return upcloud_api.CloudManager('testuser', 'mock-api-password', identity_map=True)
+
+
+class TestIdentityMap:
+    def test_load(self):
+        identity_map = IdentityMap()
+        server = identity_map.load(Server, 'uuid-1', lambda: Server(uuid='uuid-1'))
+        updates = []
+
+        same = identity_map.load(Server, 'uuid-1', lambda: Server(uuid='uuid-1'), updates.append)
+
+        assert same is server
+        assert updates == [server]
+        assert identity_map.get(Server, 'uuid-1') is server
+        assert identity_map.get(Storage, 'uuid-1') is None
+        assert len(identity_map) == 1
+
+    def test_objects_are_weakly_referenced(self):
+        identity_map = IdentityMap()
+        identity_map.add(Storage(uuid='uuid-1'))
+        gc.collect()
+
+        assert identity_map.get(Storage, 'uuid-1') is None
+        assert len(identity_map) == 0
+
+    @responses.activate
+    def test_same_server_object(self, manager):
+        Mock.mock_get('server')
+        Mock.mock_get(f'server/{HELSINKI}')
+
+        server = manager.get_server(HELSINKI)
+        listed = manager.get_servers()
+
+        assert listed[0] is server
+        assert manager.get_server(HELSINKI) is server
+        assert list(manager.iter_servers())[0] is server
+        # list data updates the populated instance without dropping its details
+        assert server.populated
+        assert server.storage_devices
+
+    @responses.activate
+    def test_populate_again(self, manager):
+        Mock.mock_get('server')
+        Mock.mock_get(f'server/{HELSINKI}')
+        Mock.mock_get('server/009d64ef-31d1-4684-a26b-c86c955cbf46')
+        server = manager.get_servers(populate=True)[0]
+        assert server.storage_devices[0].title == 'Storage for server1.example.com'
+
+        data = Mock.read_from_file(f'server_{HELSINKI}.json').replace(
+            'Storage for server1.example.com', 'Resized storage'
+        )
+        responses.replace(responses.GET, f'{Mock.base_url}/server/{HELSINKI}', body=data)
+        calls = len(responses.calls)
+
+        assert manager.get_servers(populate=True)[0] is server
+        # the identity-mapped servers are populated again, not skipped as up to date
+        assert len(responses.calls) == calls + 3
+        assert server.storage_devices[0].title == 'Resized storage'
+
+    @responses.activate
+    def test_inventory_keeps_servers_populated(self, manager):
+        Mock.mock_get(f'server/{HELSINKI}')
+        Mock.mock_get('server')
+        Mock.mock_get('ip_address')
+        responses.add(
+            responses.GET, f'{Mock.base_url}/storage/normal', json={'storages': {'storage': []}}
+        )
+        Mock.mock_get('tag')
+        server = manager.get_server(HELSINKI)
+
+        inventory = Inventory(manager)
+        inventory.refresh(full=True)
+
+        assert inventory.get_server(HELSINKI) is server
+        assert server.populated
+        assert server.storage_devices
+
+    @responses.activate
+    def test_updated_in_place(self, manager):
+        Mock.mock_get('server')
+        server = manager.get_servers()[0]
+        assert server.state == 'started'
+
+        responses.reset()
+        data = Mock.read_from_file('server.json').replace('"started"', '"stopped"')
+        responses.add(responses.GET, f'{Mock.base_url}/server', body=data, status=200)
+
+        assert manager.get_servers()[0] is server
+        assert server.state == 'stopped'
+
+    @responses.activate
+    def test_same_storage_object(self, manager):
+        Mock.mock_get(f'storage/{STORAGE}')
+
+        storage = manager.get_storage(STORAGE)
+
+        assert manager.get_storage(STORAGE) is storage
+        assert len(manager.identity_map) == 1
+
+    @responses.activate
+    def test_tag_servers(self, manager):
+        Mock.mock_get('tag/TheTestTag')
+        server = Server._from_api({'uuid': '0057e20a-6878-43a7-b2b3-530c4a4bdc55'}, manager)
+
+        tag = manager.get_tag('TheTestTag')
+
+        assert tag.servers[0] is server
+        assert tag.servers[1].uuid == '00cc17bd-fe22-4305-a0d3-1b81da14de8a'
+        assert manager.get_tag('TheTestTag').servers[1] is tag.servers[1]
+
+    @responses.activate
+    def test_disabled_by_default(self):
+        manager = upcloud_api.CloudManager('testuser', 'mock-api-password')
+        Mock.mock_get(f'server/{HELSINKI}')
+
+        assert manager.identity_map is None
+        assert manager.get_server(HELSINKI) is not manager.get_server(HELSINKI)
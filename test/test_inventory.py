@@ -0,0 +1,173 @@
+import json
+import threading
+
+import pytest
+import responses
+from conftest import Mock
+
+import upcloud_api
+from upcloud_api import Inventory, Server
+
+HELSINKI = '00798b85-efdc-41ca-8021-f6ef457b8531'
+LONDON = '009d64ef-31d1-4684-a26b-c86c955cbf46'
+
+
+@pytest.fixture
+def manager():
+    # a manager of its own, as the inventory is attached to it
+    return upcloud_api.CloudManager('testuser', 'mock-api-password')
+
+
+def mock_json(target, data):
+    responses.add(responses.GET, f'{Mock.base_url}/{target}', json=data, status=200)
+
+
+def mock_lists(servers=None):
+    if servers is None:
+        Mock.mock_get('server')
+    else:
+        mock_json('server', {'servers': {'server': servers}})
+
+    mock_json(
+        'ip_address',
+        {
+            'ip_addresses': {
+                'ip_address': [
+                    {'access': 'public', 'address': '94.237.0.1', 'server': HELSINKI},
+                    {'access': 'public', 'address': '94.237.0.2', 'server': LONDON},
+                ]
+            }
+        },
+    )
+    mock_json(
+        'storage/normal',
+        {'storages': {'storage': [{'uuid': '012580a1', 'title': 'disk', 'size': 10}]}},
+    )
+    Mock.mock_get('tag')
+
+
+def list_servers():
+    return json.loads(Mock.read_from_file('server.json'))['servers']['server']
+
+
+class TestInventory:
+    @responses.activate
+    def test_lookups(self, manager):
+        mock_lists()
+
+        inventory = Inventory(manager)
+
+        assert len(responses.calls) == 4
+        assert list(inventory.servers) == [HELSINKI, LONDON]
+        assert all(isinstance(server, Server) for server in inventory.servers.values())
+        assert inventory.server_by_ip('94.237.0.2').uuid == LONDON
+        assert inventory.server_by_ip('10.0.0.1') is None
+        assert [server.uuid for server in inventory.servers_by_hostname('fi.example.com')] == [
+            HELSINKI
+        ]
+        assert [server.uuid for server in inventory.servers_by_tag(['web1', 'web2'])] == [
+            HELSINKI,
+            LONDON,
+        ]
+        assert inventory.servers_by_tag(tags_has_all=['web1', 'web2']) == []
+        assert [server.uuid for server in inventory.servers_by_label('test')] == [HELSINKI]
+        assert inventory.servers_by_label('test', 'other') == []
+        assert inventory.get_storage('012580a1').title == 'disk'
+        assert set(inventory.tags) == {'TheTestTag1', 'TheTestTag2'}
+        # storages are only indexed for populated servers
+        assert inventory.server_by_storage('012580a1') is None
+
+    @responses.activate
+    def test_attached_to_manager(self, manager):
+        mock_lists()
+        manager.inventory = Inventory(manager)
+        calls = len(responses.calls)
+
+        server = manager.get_server_by_ip('94.237.0.1')
+        tagged = manager.get_servers(tags_has_one=['web2'])
+
+        assert server is manager.inventory.servers[HELSINKI]
+        assert [server.uuid for server in tagged] == [LONDON]
+        assert tagged[0] is manager.inventory.servers[LONDON]
+        assert len(responses.calls) == calls
+
+        # unknown IPs are looked up from the API
+        Mock.mock_get('ip_address/10.1.0.101')
+        responses.add(
+            responses.GET,
+            f'{Mock.base_url}/server/008c365d-d307-4501-8efc-cd6d3bb0e494',
+            body=Mock.read_from_file(f'server_{HELSINKI}.json'),
+            status=200,
+        )
+        assert manager.get_server_by_ip('10.1.0.101').populated
+
+    @responses.activate
+    def test_incremental_refresh(self, manager):
+        servers = list_servers()
+        mock_lists(servers)
+        inventory = Inventory(manager)
+        helsinki = inventory.servers[HELSINKI]
+        london = inventory.servers[LONDON]
+
+        responses.reset()
+        changed = dict(servers[0], state='stopped', tags={'tag': ['web2']})
+        added = dict(servers[1], uuid='new-server', hostname='new.example.com')
+        mock_lists([changed, added])
+
+        changes = inventory.refresh()
+
+        assert changes == {'added': ['new-server'], 'updated': [HELSINKI], 'removed': [LONDON]}
+        assert inventory.servers[HELSINKI] is helsinki
+        assert helsinki.state == 'stopped'
+        assert LONDON not in inventory.servers
+        assert london.uuid == LONDON
+        assert [server.uuid for server in inventory.servers_by_tag(['web2'])] == [
+            HELSINKI,
+            'new-server',
+        ]
+        assert inventory.servers_by_tag(['web1']) == []
+        assert inventory.servers_by_hostname('uk.example.com') == []
+        assert inventory.server_by_ip('94.237.0.2') is None
+
+        responses.reset()
+        mock_lists([changed, added])
+        assert inventory.refresh() == {'added': [], 'updated': [], 'removed': []}
+
+    @responses.activate
+    def test_populate(self, manager):
+        mock_lists()
+        Mock.mock_get(f'server/{HELSINKI}')
+        Mock.mock_get(f'server/{LONDON}')
+
+        inventory = Inventory(manager, populate=True)
+
+        assert all(server.populated for server in inventory.servers.values())
+        assert inventory.server_by_storage('012580a1-32a1-466e-a323-689ca16f2d43').uuid == HELSINKI
+        assert inventory.server_by_ip('10.0.0.0').uuid == HELSINKI
+
+        manager.inventory = inventory
+        calls = len(responses.calls)
+        assert manager.get_servers(populate=True, tags_has_one=['web1']).ok
+        assert len(responses.calls) == calls
+
+    @responses.activate
+    def test_periodic_refresh(self, manager):
+        mock_lists()
+        inventory = Inventory(manager)
+        refreshed = threading.Event()
+
+        def refresh():
+            refreshed.set()
+            raise upcloud_api.UpCloudClientError('refresh failed')
+
+        inventory.refresh = refresh
+        inventory.start(0.01)
+        try:
+            assert refreshed.wait(5)
+            with pytest.raises(upcloud_api.UpCloudClientError):
+                inventory.start(0.01)
+        finally:
+            inventory.stop()
+
+        assert isinstance(inventory.last_error, upcloud_api.UpCloudClientError)
+        assert list(inventory.servers) == [HELSINKI, LONDON]
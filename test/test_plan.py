@@ -0,0 +1,409 @@
+import itertools
+import json
+import re
+import threading
+import time
+
+import pytest
+import responses
+from conftest import Mock
+
+import upcloud_api
+from upcloud_api import (
+    FirewallRule,
+    IpNetwork,
+    Network,
+    Plan,
+    Router,
+    Server,
+    ServerGroup,
+    Spec,
+    Storage,
+    Tag,
+)
+from upcloud_api.polling import Poller
+
+
+@pytest.fixture
+def manager():
+    return upcloud_api.CloudManager('testuser', 'mock-api-password')
+
+
+def make_plan(manager, spec, **kwargs):
+    # servers are waited for without sleeping between polls
+    return Plan(manager, spec, poller=Poller(initial_interval=0, jitter=0), **kwargs)
+
+
+class FakeCloud:
+    """
+    Stateful stand-in for the parts of the API used by Plan, served through responses.
+    """
+
+    def __init__(self):
+        self.servers = {}
+        self.routers = {}
+        self.networks = {}
+        self.server_groups = {}
+        self.storages = {}
+        self.tags = {}
+        self.firewall_rules = {}
+        self.failing = set()
+        # (method, path suffix): error codes returned by the next matching requests
+        self.fail_next = {}
+        self.requests = []
+        self.delay = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        for method in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE'):
+            responses.add_callback(
+                method, re.compile(re.escape(Mock.base_url) + '/.*'), callback=self.callback
+            )
+
+    def callback(self, request):
+        path = request.url.replace(Mock.base_url, '', 1)
+        self.requests.append((request.method, path))
+        if (request.method, path) in self.failing:
+            error = {'error': {'error_code': 'FAILED', 'error_message': path}}
+            return 500, {}, json.dumps(error)
+        for (method, suffix), codes in self.fail_next.items():
+            if request.method == method and path.endswith(suffix) and codes:
+                error = {'error': {'error_code': codes.pop(0), 'error_message': path}}
+                return 409, {}, json.dumps(error)
+
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            body = json.loads(request.body) if request.body else {}
+            with self._lock:
+                return 200, {}, json.dumps(self.handle(request.method, path, body))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def uuid(self):
+        return f'00000000-0000-4000-8000-{next(self._ids):012d}'
+
+    def handle(self, method, path, body):
+        parts = path.strip('/').split('/')
+        if method == 'GET':
+            return self.list(parts)
+
+        if method == 'POST' and parts == ['router']:
+            router = dict(body['router'], uuid=self.uuid(), type='normal')
+            self.routers[router['uuid']] = router
+            return {'router': router}
+        if method == 'POST' and parts == ['network']:
+            network = dict(body['network'], uuid=self.uuid(), type='private')
+            network['ip_networks'] = {'ip_network': [network['ip_networks']['ip_network']]}
+            self.networks[network['uuid']] = network
+            return {'network': network}
+        if parts[0] == 'network':
+            self.networks[parts[1]]['router'] = body['network']['router']
+            return {'network': self.networks[parts[1]]}
+        if method == 'POST' and parts == ['server-group']:
+            group = dict(body['server_group'], uuid=self.uuid())
+            self.server_groups[group['uuid']] = group
+            return {'server_group': group}
+        if parts[0] == 'server-group':
+            self.server_groups[parts[1]].update(body['server_group'])
+            return {'server_group': self.server_groups[parts[1]]}
+        if method == 'POST' and parts == ['server']:
+            server = {key: value for key, value in body['server'].items() if key != 'networking'}
+            server.update(uuid=self.uuid(), state='maintenance')
+            self.servers[server['uuid']] = server
+            if 'server_group' in server:
+                group = self.server_groups[server['server_group']]
+                group.setdefault('servers', {'server': []})['server'].append(server['uuid'])
+            return {'server': server}
+        if method == 'POST' and parts[2:] == ['firewall_rule']:
+            rules = self.firewall_rules.setdefault(parts[1], [])
+            rules.append(dict(body['firewall_rule'], position=str(len(rules) + 1)))
+            return {'firewall_rule': rules[-1]}
+        if method == 'PUT' and parts[2:] == ['firewall_rule']:
+            rules = body['firewall_rules']['firewall_rule']
+            self.firewall_rules[parts[1]] = rules
+            return {'firewall_rules': {'firewall_rule': rules}}
+        if method == 'DELETE' and parts[2] == 'firewall_rule':
+            del self.firewall_rules[parts[1]][int(parts[3]) - 1]
+            return {}
+        if method == 'POST' and parts[2:] in (['stop'], ['start']):
+            self.servers[parts[1]]['state'] = 'stopped' if parts[2] == 'stop' else 'started'
+            return {'server': self.servers[parts[1]]}
+        if method == 'PUT' and parts[0] == 'server':
+            self.servers[parts[1]].update(body['server'])
+            return {'server': self.servers[parts[1]]}
+        if method == 'POST' and parts == ['storage']:
+            storage = dict(body['storage'], uuid=self.uuid())
+            self.storages[storage['uuid']] = storage
+            return {'storage': storage}
+        if method == 'POST' and parts[2:] == ['storage', 'attach']:
+            self.storages[body['storage_device']['storage']]['server'] = parts[1]
+            return {'server': {'storage_devices': {'storage_device': []}}}
+        if method == 'POST' and parts == ['tag']:
+            self.tags[body['tag']['name']] = body['tag']
+            return {'tag': body['tag']}
+        if method == 'PUT' and parts[0] == 'tag':
+            self.tags[parts[1]] = body['tag']
+            return {'tag': body['tag']}
+        raise AssertionError(f'unexpected request {method} {path}')
+
+    def list(self, parts):
+        if parts == ['server']:
+            return {'servers': {'server': list(self.servers.values())}}
+        if parts[0] == 'server' and len(parts) == 2:
+            # new servers are started by the time their details are requested
+            server = self.servers[parts[1]]
+            if server['state'] == 'maintenance':
+                server['state'] = 'started'
+            return {'server': server}
+        if parts == ['router']:
+            return {'routers': {'router': list(self.routers.values())}}
+        if parts == ['network']:
+            return {'networks': {'network': list(self.networks.values())}}
+        if parts == ['server-group']:
+            return {'server_groups': {'server_group': list(self.server_groups.values())}}
+        if parts == ['storage', 'normal']:
+            return {'storages': {'storage': list(self.storages.values())}}
+        if parts == ['tag']:
+            return {'tags': {'tag': list(self.tags.values())}}
+        if parts[2:] == ['firewall_rule']:
+            rules = self.firewall_rules.get(parts[1], [])
+            return {'firewall_rules': {'firewall_rule': rules}}
+        raise AssertionError(f'unexpected request GET {"/".join(parts)}')
+
+
+def web_server(hostname, core_number=1, networking=None):
+    if networking is None:
+        networking = [{'type': 'private', 'network': 'private'}]
+    return Server(
+        hostname=hostname,
+        zone='uk-lon1',
+        core_number=core_number,
+        memory_amount=1024,
+        storage_devices=[Storage(os='01000000-0000-4000-8000-000030240200', size=10)],
+        networking=networking,
+    )
+
+
+def rules(*ports):
+    return [
+        FirewallRule(
+            direction='in',
+            family='IPv4',
+            protocol='tcp',
+            destination_port_start=str(port),
+            destination_port_end=str(port),
+            action='accept',
+        )
+        for port in ports
+    ]
+
+
+def cluster_spec(count=2, core_number=1, ports=(22,)):
+    hostnames = [f'web{i}.example.com' for i in range(1, count + 1)]
+    return Spec(
+        routers=[Router(name='main')],
+        networks=[
+            Network(
+                name='private',
+                zone='uk-lon1',
+                router='main',
+                ip_networks=[IpNetwork(address='10.0.0.0/24', dhcp='yes', family='IPv4')],
+            )
+        ],
+        server_groups=[ServerGroup(title='web', servers=hostnames, anti_affinity='yes')],
+        servers=[web_server(hostname, core_number) for hostname in hostnames],
+        storages=[Storage(title='data', zone='uk-lon1', size=20, server=hostnames[0])],
+        tags=[Tag('web', servers=hostnames)],
+        firewall_rules={hostname: rules(*ports) for hostname in hostnames},
+    )
+
+
+class TestPlan:
+    @responses.activate
+    def test_create(self, manager):
+        cloud = FakeCloud()
+
+        plan = make_plan(manager, cluster_spec())
+
+        assert [(action.operation, action.kind) for action in plan] == [
+            ('create', 'router'),
+            ('create', 'network'),
+            ('create', 'server_group'),
+            ('create', 'server'),
+            ('create', 'server'),
+            ('create', 'storage'),
+            ('create', 'tag'),
+            ('create', 'firewall'),
+            ('create', 'firewall'),
+        ]
+        rendered = plan.render()
+        assert rendered.startswith('Plan: 9 to create\n  + router main\n')
+        assert '+ server web1.example.com (after server_group web, network private)' in rendered
+
+        result = plan.apply()
+
+        assert result.ok, result.errors
+        network = next(iter(cloud.networks.values()))
+        assert network['router'] == plan.uuids[('router', 'main')]
+        group = next(iter(cloud.server_groups.values()))
+        assert sorted(group['servers']['server']) == sorted(cloud.servers)
+        assert [server['server_group'] for server in cloud.servers.values()] == [group['uuid']] * 2
+        storage = next(iter(cloud.storages.values()))
+        assert storage['server'] == plan.uuids[('server', 'web1.example.com')]
+        assert sorted(cloud.tags['web']['servers']['server']) == sorted(cloud.servers)
+        assert [len(server_rules) for server_rules in cloud.firewall_rules.values()] == [1, 1]
+
+        # applying again changes nothing
+        plan = make_plan(manager, cluster_spec())
+        assert len(plan) == 0
+        assert plan.render() == 'No changes.'
+
+    @responses.activate
+    def test_update(self, manager):
+        cloud = FakeCloud()
+        make_plan(manager, cluster_spec()).apply()
+
+        spec = cluster_spec(count=3, core_number=2, ports=(22, 443))
+        # the servers are started, and cores can only be changed while stopped
+        with pytest.raises(upcloud_api.UpCloudClientError) as exc:
+            make_plan(manager, spec)
+        assert 'web1.example.com must be stopped to change core_number' in str(exc.value)
+
+        plan = make_plan(manager, spec, restart=True)
+
+        assert [(action.operation, action.kind, action.name) for action in plan] == [
+            ('update', 'server', 'web1.example.com'),
+            ('update', 'server', 'web2.example.com'),
+            ('create', 'server', 'web3.example.com'),
+            ('update', 'tag', 'web'),
+            ('update', 'firewall', 'web1.example.com'),
+            ('update', 'firewall', 'web2.example.com'),
+            ('create', 'firewall', 'web3.example.com'),
+        ]
+        assert plan.actions[0].changes == {
+            'core_number': (1, 2),
+            'state': ('started', 'stopped, then started'),
+        }
+        assert '~ firewall web1.example.com (after server web1.example.com)' in plan.render()
+        assert '      rules: 1 -> 2' in plan.render()
+
+        del cloud.requests[:]
+        result = plan.apply()
+        assert result.ok, result.errors
+        assert [server['core_number'] for server in cloud.servers.values()] == [2, 2, 2]
+        uuid = plan.uuids[('server', 'web1.example.com')]
+        assert [
+            request for request in cloud.requests if request[0] != 'GET' and uuid in request[1]
+        ][:3] == [
+            ('POST', f'/server/{uuid}/stop'),
+            ('PUT', f'/server/{uuid}'),
+            ('POST', f'/server/{uuid}/start'),
+        ]
+        assert cloud.servers[uuid]['state'] == 'started'
+        assert len(cloud.tags['web']['servers']['server']) == 3
+        assert [
+            [rule['destination_port_start'] for rule in server_rules]
+            for server_rules in cloud.firewall_rules.values()
+        ] == [['22', '443']] * 3
+        assert len(make_plan(manager, cluster_spec(count=3, core_number=2, ports=(22, 443)))) == 0
+
+    @responses.activate
+    def test_compare_normalised_fields(self, manager):
+        cloud = FakeCloud()
+        make_plan(manager, Spec(servers=[web_server('web1.example.com', networking=[])])).apply()
+        server = next(iter(cloud.servers.values()))
+        # as listed by the API
+        server.update(core_number='1', memory_amount='1024', firewall='on', state='stopped')
+
+        spec = Spec(servers=[web_server('web1.example.com', networking=[])])
+        spec.servers['web1.example.com'].firewall = True
+        assert len(make_plan(manager, spec)) == 0
+
+        # fields that need a stopped server are changed in place on a stopped server
+        spec.servers['web1.example.com'].memory_amount = 2048
+        plan = make_plan(manager, spec)
+        assert plan.actions[0].changes == {'memory_amount': ('1024', 2048)}
+        assert plan.apply().ok
+        assert server['memory_amount'] == 2048
+        assert server['state'] == 'stopped'
+
+    @responses.activate
+    def test_created_servers_are_waited_for(self, manager):
+        cloud = FakeCloud()
+        spec = Spec(
+            servers=[web_server('web1.example.com', networking=[])],
+            firewall_rules={'web1.example.com': rules(22)},
+        )
+
+        assert make_plan(manager, spec).apply().ok
+
+        uuid = next(iter(cloud.servers))
+        paths = [path for _, path in cloud.requests]
+        assert paths.index(f'/server/{uuid}') < paths.index(f'/server/{uuid}/firewall_rule')
+
+    @responses.activate
+    def test_failed_action_skips_dependents(self, manager):
+        cloud = FakeCloud()
+        cloud.failing.add(('POST', '/router'))
+
+        plan = make_plan(manager, cluster_spec())
+        result = plan.apply()
+
+        failed = {str(action) for action in result.errors}
+        assert failed == {
+            'create router main',
+            'create network private',
+            'create server web1.example.com',
+            'create server web2.example.com',
+            'create storage data',
+            'create tag web',
+            'create firewall web1.example.com',
+            'create firewall web2.example.com',
+        }
+        assert 'not run: create router main failed' in str(result.errors[plan.actions[1]])
+        # the server group does not depend on the router
+        assert result[2] == next(iter(cloud.server_groups))
+
+    @responses.activate
+    def test_retry_attach_without_creating_again(self, manager, monkeypatch):
+        monkeypatch.setattr('upcloud_api.utils.sleep', lambda seconds: None)
+        cloud = FakeCloud()
+        # the new storage is still in maintenance when it is first attached
+        cloud.fail_next[('POST', '/storage/attach')] = ['STORAGE_STATE_ILLEGAL']
+
+        plan = make_plan(manager, cluster_spec())
+        result = plan.apply()
+
+        assert result.ok, result.errors
+        assert cloud.requests.count(('POST', '/storage')) == 1
+        assert len([request for request in cloud.requests if request[1].endswith('/attach')]) == 2
+        storage = next(iter(cloud.storages.values()))
+        assert plan.uuids[('storage', 'data')] == storage['uuid']
+        assert storage['server'] == plan.uuids[('server', 'web1.example.com')]
+
+    @responses.activate
+    def test_concurrency_limits(self, manager):
+        cloud = FakeCloud()
+        spec = Spec(servers=[web_server(f'web{i}.example.com', networking=[]) for i in range(8)])
+        cloud.delay = 0.02
+
+        result = make_plan(manager, spec).apply(max_parallel=8, limits={'server': 3})
+
+        assert result.ok
+        assert len(cloud.servers) == 8
+        assert 1 < cloud.max_in_flight <= 3
+
+    @responses.activate
+    def test_unknown_reference(self, manager):
+        FakeCloud()
+        spec = Spec(tags=[Tag('web', servers=['missing.example.com'])])
+
+        with pytest.raises(upcloud_api.UpCloudClientError) as exc:
+            make_plan(manager, spec)
+        assert "tag web refers to an unknown server 'missing.example.com'" in str(exc.value)
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from upcloud_api.errors import UpCloudCancelledError, UpCloudTimeoutError
+from upcloud_api.polling import Poller
+
+
+class TestPoller:
+    def test_intervals_back_off_to_max(self):
+        poller = Poller(initial_interval=1, max_interval=5, multiplier=2, jitter=0)
+        intervals = poller.intervals()
+
+        assert [next(intervals) for _ in range(5)] == [1, 2, 4, 5, 5]
+
+    def test_intervals_are_jittered(self):
+        poller = Poller(initial_interval=10, jitter=0.5)
+        interval = next(poller.intervals())
+
+        assert 5 <= interval <= 15
+
+    def test_wait_refreshes_until_done(self):
+        states = iter(['maintenance', 'maintenance', 'started'])
+        current = {'state': 'maintenance'}
+
+        def refresh():
+            current['state'] = next(states)
+
+        Poller(initial_interval=0).wait(lambda: current['state'] == 'started', refresh)
+
+        assert current['state'] == 'started'
+
+    def test_wait_does_not_refresh_when_already_done(self):
+        def refresh():
+            raise AssertionError('should not refresh')
+
+        Poller().wait(lambda: True, refresh)
+
+    def test_wait_timeout(self):
+        poller = Poller(initial_interval=0.01, timeout=0.05)
+
+        with pytest.raises(UpCloudTimeoutError):
+            poller.wait(lambda: False, lambda: None)
+
+    def test_wait_cancel(self):
+        cancel = threading.Event()
+        cancel.set()
+
+        with pytest.raises(UpCloudCancelledError):
+            Poller(cancel_event=cancel).wait(lambda: False, lambda: None)
@@ -0,0 +1,66 @@
+import responses
+from conftest import Mock
+
+from upcloud_api import CloudManager, RateLimiter
+from upcloud_api.rate_limit import TokenBucket
+
+
+class TestTokenBucket:
+    def test_burst_then_pacing(self):
+        bucket = TokenBucket(rate=2, burst=2)
+
+        assert bucket.take(0) == 0
+        assert bucket.take(0) == 0
+        # the next callers queue up behind each other instead of all waiting the same time
+        assert bucket.take(0) == 0.5
+        assert bucket.take(0) == 1.0
+
+    def test_refill_is_capped_at_burst(self):
+        bucket = TokenBucket(rate=1, burst=3)
+
+        for _ in range(3):
+            bucket.take(0)
+        assert bucket.take(100) == 0
+        assert bucket.tokens == 2
+
+
+class TestRateLimiter:
+    def test_read_and_write_buckets(self):
+        limiter = RateLimiter(read_rate=10, write_rate=1, write_burst=1)
+
+        assert limiter.reserve('POST') == 0
+        assert limiter.reserve('GET') == 0
+        assert 0.9 < limiter.reserve('DELETE') <= 1
+
+    def test_global_bucket_applies_to_all_methods(self):
+        limiter = RateLimiter(rate=1, burst=1, read_rate=100)
+
+        assert limiter.reserve('GET') == 0
+        assert limiter.reserve('PUT') > 0.9
+
+    def test_unlimited(self):
+        assert RateLimiter().reserve('GET') == 0
+
+    def test_shared_between_processes_through_file(self, tmp_path):
+        path = str(tmp_path / 'upcloud-rate')
+        first = RateLimiter(rate=1, burst=1, path=path)
+        second = RateLimiter(rate=1, burst=1, path=path)
+
+        assert first.reserve('GET') == 0
+        assert second.reserve('GET') > 0.9
+
+    @responses.activate
+    def test_shared_between_managers(self, monkeypatch):
+        delays = []
+        monkeypatch.setattr('upcloud_api.rate_limit.time.sleep', delays.append)
+        Mock.mock_get('zone')
+        limiter = RateLimiter(rate=1, burst=1)
+        managers = [
+            CloudManager('testuser', 'mock-api-password', rate_limiter=limiter) for _ in range(2)
+        ]
+
+        for manager in managers:
+            manager.get_zones()
+
+        assert len(delays) == 1
+        assert delays[0] > 0.9
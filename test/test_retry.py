@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+import responses
+from conftest import Mock
+
+from upcloud_api import CloudManager, RetryPolicy, UpCloudAPIError, UpCloudTimeoutError
+from upcloud_api.retry import parse_retry_after
+
+ERROR = {'error': {'error_code': 'SERVICE_UNAVAILABLE', 'error_message': 'try again'}}
+
+
+def manager_with(**policy):
+    policy.setdefault('base_delay', 0)
+    return CloudManager('testuser', 'mock-api-password', retry_policy=RetryPolicy(**policy))
+
+
+class TestRetryPolicy:
+    @responses.activate
+    def test_get_is_retried_on_5xx(self):
+        responses.add(responses.GET, Mock.base_url + '/zone', json=ERROR, status=503)
+        Mock.mock_get('zone')
+
+        zones = manager_with().get_zones()
+
+        assert zones['zones']['zone']
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_post_is_not_retried_on_5xx(self):
+        responses.add(responses.POST, Mock.base_url + '/server/uuid/stop', json=ERROR, status=502)
+
+        with pytest.raises(UpCloudAPIError):
+            manager_with().api.post_request('/server/uuid/stop')
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_rate_limited_post_is_retried_after_retry_after(self):
+        url = Mock.base_url + '/server/uuid/stop'
+        responses.add(responses.POST, url, json=ERROR, status=429, headers={'Retry-After': '0'})
+        responses.add(responses.POST, url, json={})
+
+        manager_with().api.post_request('/server/uuid/stop')
+
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_error_code_rules(self):
+        url = Mock.base_url + '/server/uuid/stop'
+        illegal = {'error': {'error_code': 'SERVER_STATE_ILLEGAL', 'error_message': 'busy'}}
+        responses.add(responses.POST, url, json=illegal, status=409)
+        responses.add(responses.POST, url, json={})
+
+        manager_with(error_codes={'SERVER_STATE_ILLEGAL': True}).api.post_request(
+            '/server/uuid/stop'
+        )
+        assert len(responses.calls) == 2
+
+        responses.add(responses.GET, Mock.base_url + '/zone', json=ERROR, status=503)
+        with pytest.raises(UpCloudAPIError):
+            manager_with(error_codes={'SERVICE_UNAVAILABLE': False}).get_zones()
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_gives_up_after_max_attempts(self):
+        responses.add(responses.GET, Mock.base_url + '/zone', body='<html>', status=502)
+
+        with pytest.raises(UpCloudAPIError) as exc:
+            manager_with(max_attempts=3).get_zones()
+
+        assert exc.value.status_code == 502
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_gives_up_at_deadline(self):
+        # Retry-After makes the delay deterministic; the jittered backoff alone may be short
+        responses.add(
+            responses.GET,
+            Mock.base_url + '/zone',
+            json=ERROR,
+            status=503,
+            headers={'Retry-After': '10'},
+        )
+
+        with pytest.raises(UpCloudAPIError):
+            manager_with(base_delay=10, deadline=1).get_zones()
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_connection_errors(self):
+        url = Mock.base_url + '/server/uuid/stop'
+        responses.add(responses.POST, url, body=requests.exceptions.ConnectTimeout())
+        responses.add(responses.POST, url, body=requests.exceptions.ReadTimeout())
+        manager = manager_with()
+
+        # the first attempt never reached the API, the second one may have
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            manager.api.post_request('/server/uuid/stop')
+        assert len(responses.calls) == 2
+
+    def test_attempt_timeout_is_capped_by_deadline(self):
+        policy = RetryPolicy(deadline=5)
+        deadline_at = policy.deadline_at()
+
+        assert policy.attempt_timeout(60, deadline_at) <= 5
+        assert policy.attempt_timeout(None, deadline_at) <= 5
+        assert policy.attempt_timeout(60, None) == 60
+
+    @responses.activate
+    def test_attempt_at_deadline(self):
+        Mock.mock_get('zone')
+        policy = RetryPolicy(deadline=5)
+
+        with pytest.raises(UpCloudTimeoutError):
+            policy.attempt_timeout(60, policy.deadline_at() - 5)
+
+        # the attempt is not sent with a zero timeout
+        with pytest.raises(UpCloudTimeoutError):
+            manager_with(deadline=0).get_zones()
+        assert len(responses.calls) == 0
+
+    def test_parse_retry_after(self):
+        later = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+        assert parse_retry_after('2') == 2
+        assert 25 < parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
@@ -1,7 +1,12 @@
+import json
+
 import pytest
 import responses
 from conftest import Mock
 
+from upcloud_api import UpCloudClientError
+from upcloud_api.polling import Poller
+
 
 class TestServer:
     @responses.activate
@@ -14,6 +19,32 @@ class TestServer:
         assert len(server.labels['label']) == 1
         assert server.labels['label'][0]['value'] == "example"
 
+    @responses.activate
+    def test_sub_objects_are_built_on_first_access(self, manager):
+        Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
+        server = manager.get_server('00798b85-efdc-41ca-8021-f6ef457b8531')
+
+        assert 'ip_addresses' not in vars(server)
+        assert 'storage_devices' not in vars(server)
+        assert server.state == 'started'
+
+        ips = server.ip_addresses
+        assert ips is server.ip_addresses
+        assert [type(ip).__name__ for ip in ips] == ['IPAddress', 'IPAddress']
+        assert ips[0].cloud_manager is manager
+        assert server.storage_devices[0].title == 'Storage for server1.example.com'
+
+    @responses.activate
+    def test_populate_resets_sub_objects(self, manager):
+        Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
+        server = manager.get_server('00798b85-efdc-41ca-8021-f6ef457b8531')
+        storages = server.storage_devices
+
+        server.populate()
+
+        assert server.storage_devices is not storages
+        assert [s.uuid for s in server.storage_devices] == [s.uuid for s in storages]
+
     @responses.activate
     def test_get_unpopulated_servers(self, manager):
         data = Mock.mock_get('server')
@@ -31,6 +62,112 @@ class TestServer:
 
         for server in servers:
             assert type(server).__name__ == 'Server'
+            assert server.populated
+        assert servers.ok
+
+    @responses.activate
+    def test_get_populated_servers_collects_errors(self, manager):
+        Mock.mock_get('server')
+        Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
+        responses.add(
+            responses.GET,
+            Mock.base_url + '/server/009d64ef-31d1-4684-a26b-c86c955cbf46',
+            json={'error': {'error_code': 'SERVER_NOT_FOUND', 'error_message': 'gone'}},
+            status=404,
+        )
+        servers = manager.get_servers(populate=True, max_workers=2)
+
+        assert [server.uuid for server in servers] == [
+            '00798b85-efdc-41ca-8021-f6ef457b8531',
+            '009d64ef-31d1-4684-a26b-c86c955cbf46',
+        ]
+        assert servers[0].populated
+        assert not servers[1].populated
+        assert list(servers.errors) == [servers[1]]
+        assert servers.errors[servers[1]].error_code == 'SERVER_NOT_FOUND'
+
+    @responses.activate
+    def test_ensure_started_polls_state(self, manager):
+        Mock.mock_get('server/009d64ef-31d1-4684-a26b-c86c955cbf46')
+        server = manager.get_server('009d64ef-31d1-4684-a26b-c86c955cbf46')
+        storages = server.storage_devices
+
+        Mock.mock_server_operation('server/009d64ef-31d1-4684-a26b-c86c955cbf46/start')
+        server.start()
+        object.__setattr__(server, 'state', 'maintenance')
+
+        Mock.mock_get('server/009d64ef-31d1-4684-a26b-c86c955cbf46')
+        server.ensure_started(poller=Poller(initial_interval=0))
+
+        # maintenance => stopped (polled) => start => started
+        assert server.state == 'started'
+        # only the state is refreshed while polling
+        assert server.uuid == '009d64ef-31d1-4684-a26b-c86c955cbf46'
+        assert server.storage_devices is storages
+
+    @responses.activate
+    def test_wait_for_servers(self, manager):
+        Mock.mock_get('server')
+        servers = manager.get_servers()
+        for server in servers:
+            object.__setattr__(server, 'state', 'maintenance')
+
+        data = json.loads(Mock.read_from_file('server.json'))
+        data['servers']['server'][1]['state'] = 'started'
+        responses.add(responses.GET, Mock.base_url + '/server', json=data, status=200)
+
+        stragglers = manager.wait_for_servers(
+            servers, ['started'], poller=Poller(initial_interval=0)
+        )
+
+        assert stragglers == []
+        assert [server.state for server in servers] == ['started', 'started']
+        # one list call to get the servers and a single one to refresh all of their states
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_wait_for_servers_returns_stragglers(self, manager):
+        Mock.mock_get('server')
+        servers = manager.get_servers()
+
+        stragglers = manager.wait_for_servers(
+            servers, ['started'], poller=Poller(initial_interval=0.01, timeout=0.05)
+        )
+
+        assert stragglers == [servers[1]]
+        assert servers[1].state == 'stopped'
+
+    @responses.activate
+    def test_destroy_servers(self, manager, monkeypatch):
+        monkeypatch.setattr('upcloud_api.utils.sleep', lambda seconds: None)
+        uuids = ['uuid-started', 'uuid-stopped', 'uuid-maintenance', 'uuid-stuck']
+
+        def server_list(*states):
+            servers = [
+                {'uuid': uuid, 'state': state} for uuid, state in zip(uuids, states, strict=False)
+            ]
+            return {'servers': {'server': servers}}
+
+        url = Mock.base_url + '/server'
+        responses.add(
+            responses.GET, url, json=server_list('started', 'stopped', 'maintenance', 'error')
+        )
+        responses.add(responses.GET, url, json=server_list('started', 'stopped', 'stopped'))
+        responses.add(responses.GET, url, json=server_list('stopped', 'stopped', 'stopped'))
+        responses.add(responses.POST, url + '/uuid-started/stop', json={})
+        for uuid in uuids[:3]:
+            responses.add(responses.DELETE, f'{url}/{uuid}', status=204)
+
+        result = manager.destroy_servers(uuids, poller=Poller(initial_interval=0))
+
+        assert [server.uuid for server in result] == uuids
+        assert list(result.errors) == [result[3]]
+        deletes = [call.request.url for call in responses.calls if call.request.method == 'DELETE']
+        assert sorted(deletes) == sorted(
+            f'{url}/{uuid}?storages=1&backups=keep' for uuid in uuids[:3]
+        )
+        stops = [call for call in responses.calls if call.request.url.endswith('/stop')]
+        assert len(stops) == 1
 
     @responses.activate
     def test_start_server(self, manager):
@@ -132,6 +269,47 @@ class TestServer:
         assert server.memory_amount == 1024
         assert server.title == 'Updated server'
 
+    @responses.activate
+    def test_update_server_sends_changed_fields(self, manager):
+        Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
+        server = manager.get_server('00798b85-efdc-41ca-8021-f6ef457b8531')
+
+        server.title = 'Updated server'
+        server.core_number = server.core_number
+
+        Mock.mock_put('server/00798b85-efdc-41ca-8021-f6ef457b8531')
+        server.save()
+
+        body = json.loads(responses.calls[-1].request.body)
+        assert body == {'server': {'title': 'Updated server'}}
+
+        # nothing changed since the last save
+        calls = len(responses.calls)
+        server.save()
+        server.hostname = server.hostname
+        server.save()
+        assert len(responses.calls) == calls
+
+    @responses.activate
+    def test_modify_server_rejects_other_fields(self, manager):
+        with pytest.raises(UpCloudClientError) as exc:
+            manager.modify_server('00798b85-efdc-41ca-8021-f6ef457b8531', state='stopped')
+
+        assert 'state is not an updateable field' in str(exc.value)
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_populate_discards_changed_fields(self, manager):
+        Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
+        server = manager.get_server('00798b85-efdc-41ca-8021-f6ef457b8531')
+
+        server.title = 'Updated server'
+        server.populate()
+        server.save()
+
+        assert server.title != 'Updated server'
+        assert len(responses.calls) == 2
+
     @responses.activate
     def test_update_server_non_updateable_fields(self, manager):
         data = Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
@@ -246,3 +246,57 @@ class TestCreateServer:
                 ],
             )
         )
+
+    @responses.activate
+    def test_create_servers(self, manager, monkeypatch):
+        monkeypatch.setattr('upcloud_api.utils.sleep', lambda seconds: None)
+        attempts = {}
+
+        def _create_callback(request):
+            hostname = json.loads(request.body)['server']['hostname']
+            attempts[hostname] = attempts.get(hostname, 0) + 1
+
+            if hostname == 'busy.example.com' and attempts[hostname] == 1:
+                error = {'error_code': 'SERVER_STATE_ILLEGAL', 'error_message': 'busy'}
+                return (409, {}, json.dumps({'error': error}))
+            if hostname == 'broken.example.com':
+                error = {'error_code': 'INVALID_ZONE', 'error_message': 'no such zone'}
+                return (400, {}, json.dumps({'error': error}))
+
+            data = json.loads(Mock.read_from_file('server_create.json'))
+            data['server']['uuid'] = hostname
+            data['server']['hostname'] = hostname
+            data['server']['state'] = 'maintenance'
+            return (202, {}, json.dumps(data))
+
+        responses.add_callback(
+            responses.POST,
+            Mock.base_url + '/server',
+            content_type='application/json',
+            callback=_create_callback,
+        )
+        responses.add(
+            responses.GET,
+            Mock.base_url + '/server',
+            json={
+                'servers': {
+                    'server': [
+                        {'uuid': 'ok.example.com', 'state': 'started'},
+                        {'uuid': 'busy.example.com', 'state': 'started'},
+                    ]
+                }
+            },
+        )
+
+        servers = [
+            Server(hostname=hostname, zone='fi-hel1', storage_devices=[Storage(size=10)])
+            for hostname in ['ok.example.com', 'busy.example.com', 'broken.example.com']
+        ]
+        result = manager.create_servers(servers, max_parallel=3)
+
+        assert list(result) == servers
+        assert attempts == {'ok.example.com': 1, 'busy.example.com': 2, 'broken.example.com': 1}
+        assert [server.state for server in result[:2]] == ['started', 'started']
+        assert list(result.errors) == [servers[2]]
+        assert result.errors[servers[2]].error_code == 'INVALID_ZONE'
+        assert result.errors[servers[2]].status_code == 400
@@ -1,3 +1,5 @@
+import json
+
 import responses
 from conftest import Mock
 
@@ -32,3 +34,38 @@ class TestServerGroup:
         Mock.mock_delete("server-group/0b5169fc-23aa-4ba7-aaab-f38868ce99cd")
         res = manager.delete_server_group("0b5169fc-23aa-4ba7-aaab-f38868ce99cd")
         assert res == {}
+
+    @responses.activate
+    def test_get_server_groups(self, manager):
+        Mock.mock_get("server-group")
+        server_groups = manager.get_server_groups()
+
+        assert [server_group.title for server_group in server_groups] == ["test group"]
+        assert server_groups[0].uuid == "0b5169fc-23aa-4ba7-aaab-f38868ce99cd"
+
+    @responses.activate
+    def test_modify_server_group(self, manager):
+        Mock.mock_patch(
+            "server-group/0b5169fc-23aa-4ba7-aaab-f38868ce99cd", ignore_data_field=True
+        )
+        server_group = manager.modify_server_group(
+            "0b5169fc-23aa-4ba7-aaab-f38868ce99cd",
+            title="renamed",
+            servers=["00798b85-efdc-41ca-8021-f6ef457b8531"],
+        )
+
+        body = json.loads(responses.calls[0].request.body)
+        assert body == {
+            "server_group": {
+                "title": "renamed",
+                "servers": {"server": ["00798b85-efdc-41ca-8021-f6ef457b8531"]},
+            }
+        }
+        assert server_group.uuid == "0b5169fc-23aa-4ba7-aaab-f38868ce99cd"
+
+    def test_server_group_to_dict_servers(self):
+        server_group = ServerGroup(title="web", servers=["00798b85-efdc-41ca-8021-f6ef457b8531"])
+
+        assert server_group.to_dict()["server_group"]["servers"] == {
+            "server": ["00798b85-efdc-41ca-8021-f6ef457b8531"]
+        }
@@ -0,0 +1,164 @@
+import json
+
+import pytest
+import responses
+from conftest import Mock
+
+from upcloud_api import Server, ServerTable, Tag, UpCloudClientError
+
+
+def make_servers(count):
+    zones = ['fi-hel1', 'de-fra1', 'uk-lon1']
+    return [
+        {
+            'uuid': f'uuid-{i}',
+            'hostname': f'host{i}.example.com',
+            'title': f'server {i}',
+            'zone': zones[i % 3],
+            'state': 'started' if i % 2 else 'stopped',
+            'plan': f'{1 + i % 4}xCPU-{2 * (1 + i % 4)}GB',
+            'core_number': str(1 + i % 8),
+            'memory_amount': str(1024 * (1 + i % 4)),
+            'tags': {'tag': ['web'] if i % 5 == 0 else ['db', 'backup']},
+            'labels': {'label': [{'key': 'env', 'value': 'prod' if i < 6 else 'dev'}]},
+        }
+        for i in range(count)
+    ]
+
+
+class TestServerTable:
+    def test_filter_matches_list_scan(self):
+        servers = make_servers(100)
+        table = ServerTable(servers)
+
+        result = table.filter(
+            zone='fi-hel1', state='started', tags='db', core_number=lambda n: n > 4
+        )
+
+        expected = [
+            server['uuid']
+            for server in servers
+            if server['zone'] == 'fi-hel1'
+            and server['state'] == 'started'
+            and 'db' in server['tags']['tag']
+            and int(server['core_number']) > 4
+        ]
+        assert expected
+        assert result.column('uuid') == expected
+        assert len(result) == len(expected)
+
+    def test_filter_conditions(self):
+        table = ServerTable(make_servers(12))
+
+        assert len(table.filter(zone=['fi-hel1', 'de-fra1'])) == 8
+        assert len(table.filter(zone='no-such-zone')) == 0
+        assert len(table.filter(tags=[Tag('db'), 'backup'])) == 9
+        assert len(table.filter(tags=['db', 'web'])) == 0
+        assert len(table.filter(tags_has_one=['db', 'web'])) == 12
+        assert table.filter(labels={'env': 'prod'}).column('uuid') == [
+            f'uuid-{i}' for i in range(6)
+        ]
+        assert len(table.filter(labels={'env': None})) == 12
+        assert len(table.filter(labels={'owner': None})) == 0
+
+        with pytest.raises(UpCloudClientError):
+            table.filter(colour='blue')
+
+    def test_derived_tables(self):
+        table = ServerTable(make_servers(12))
+        started = table.filter(state='started')
+        helsinki = table.filter(zone='fi-hel1')
+
+        assert (started & helsinki).column('uuid') == ['uuid-3', 'uuid-9']
+        assert len(started | helsinki) == 8
+        assert (helsinki - started).column('uuid') == ['uuid-0', 'uuid-6']
+        assert len(started.filter(zone='fi-hel1')) == 2
+        assert 'uuid-3' in started
+        assert 'uuid-0' not in started
+
+        with pytest.raises(UpCloudClientError):
+            started & ServerTable(make_servers(12))
+        with pytest.raises(UpCloudClientError):
+            started.append(make_servers(1)[0])
+
+    def test_group_and_count_by(self):
+        table = ServerTable(make_servers(12))
+
+        assert table.count_by('zone') == {'fi-hel1': 4, 'de-fra1': 4, 'uk-lon1': 4}
+        assert table.count_by('tags') == {'web': 3, 'db': 9, 'backup': 9}
+        assert table.filter(state='started').count_by('memory_amount') == {2048: 3, 4096: 3}
+
+        groups = table.group_by('zone')
+        assert groups['de-fra1'].column('uuid') == ['uuid-1', 'uuid-4', 'uuid-7', 'uuid-10']
+        assert {value: len(group) for value, group in table.group_by_label('env').items()} == {
+            'prod': 6,
+            'dev': 6,
+        }
+
+    def test_many_distinct_values(self):
+        servers = make_servers(300)
+        for i, server in enumerate(servers):
+            server['tags']['tag'].append(f'team{i}')
+        table = ServerTable(servers)
+
+        assert table.filter(uuid=['uuid-0', 'uuid-299']).column('hostname') == [
+            'host0.example.com',
+            'host299.example.com',
+        ]
+        assert table.filter(tags='team280').column('uuid') == ['uuid-280']
+        assert len(table.filter(tags='db', zone='fi-hel1')) == 80
+        assert 'uuid-299' in table
+
+    def test_rows(self):
+        table = ServerTable(make_servers(3))
+
+        row = next(iter(table.filter(uuid='uuid-1')))
+        assert row['core_number'] == 2
+        assert row['tags'] == ['db', 'backup']
+        assert row['labels'] == {'env': 'prod'}
+        assert len(list(table)) == 3
+
+    def test_servers(self):
+        table = ServerTable(make_servers(4), cloud_manager='manager')
+
+        servers = table.filter(tags='web').servers()
+
+        assert [type(server) for server in servers] == [Server]
+        server = servers[0]
+        assert server.uuid == 'uuid-0'
+        assert server.hostname == 'host0.example.com'
+        assert server.core_number == '1'
+        assert server.tags == ['web']
+        assert server.labels == {'label': [{'key': 'env', 'value': 'prod'}]}
+        assert server.cloud_manager == 'manager'
+        assert not server.populated
+
+    def test_empty(self):
+        table = ServerTable()
+
+        assert len(table) == 0
+        assert table.filter(zone='fi-hel1').column('uuid') == []
+        assert table.count_by('zone') == {}
+
+    @responses.activate
+    def test_get_server_table(self, manager):
+        Mock.mock_get('server')
+        data = json.loads(Mock.read_from_file('server.json'))
+
+        table = manager.get_server_table()
+
+        assert table.column('uuid') == [server['uuid'] for server in data['servers']['server']]
+        assert table.filter(tags='web1').column('zone') == ['fi-hel1']
+        assert table.filter(labels={'test': 'example'}).column('state') == ['started']
+        assert table.count_by('memory_amount') == {1024: 2}
+
+    @responses.activate
+    def test_populate_servers(self, manager):
+        Mock.mock_get('server')
+        Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
+
+        servers = manager.get_server_table().filter(zone='fi-hel1').servers(populate=True)
+
+        assert servers.ok
+        assert servers[0].populated
+        assert servers[0].storage_devices
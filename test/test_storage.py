@@ -1,6 +1,10 @@
+import json
+
 import responses
 from conftest import Mock
 
+from upcloud_api.polling import Poller
+
 
 class TestStorage:
     @responses.activate
@@ -161,6 +165,20 @@ class TestStorage:
         assert storage_import.state == "pending"
         assert storage_import.uuid == "07a6c9a3-300e-4d0e-b935-624f3dbdff3f"
 
+    @responses.activate
+    def test_wait_for_storage_import(self, manager):
+        target = "storage/01d4fcd4-e446-433b-8a9c-551a1284952e/import"
+        Mock.mock_get(target)
+        completed = json.loads(Mock.read_from_file(target + ".json"))
+        completed["storage_import"]["state"] = "completed"
+        responses.add(responses.GET, Mock.base_url + "/" + target, json=completed, status=200)
+
+        storage_import = manager.wait_for_storage_import(
+            "01d4fcd4-e446-433b-8a9c-551a1284952e", poller=Poller(initial_interval=0)
+        )
+        assert storage_import.state == "completed"
+        assert len(responses.calls) == 2
+
     @responses.activate
     def test_cancel_storage_import(self, manager):
         data = Mock.mock_post(
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+import responses
+from conftest import Mock
+
+from upcloud_api import IPAddress, Server, Storage, UpCloudAPIError
+from upcloud_api.streaming import JSONArrayParser, iter_json_array
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestJSONArrayParser:
+    @pytest.mark.parametrize('size', [1, 3, 64, 1 << 20])
+    @pytest.mark.parametrize(
+        'filename, path',
+        [
+            ('server.json', ('servers', 'server')),
+            ('storage_public.json', ('storages', 'storage')),
+            ('ip_address.json', ('ip_addresses', 'ip_address')),
+        ],
+    )
+    def test_matches_full_parse(self, filename, path, size):
+        raw = Mock.read_from_file(filename).encode()
+        expected = json.loads(raw)[path[0]][path[1]]
+
+        assert list(iter_json_array(chunked(raw, size), path)) == expected
+
+    @pytest.mark.parametrize('size', range(1, 8))
+    def test_strings_and_nesting(self, size):
+        doc = {
+            'note': 'not "the" [array], {really}\\',
+            'storages': {
+                'other': [{'storage': [0]}],
+                'storage': [{'title': 'a \\"]},'}, [1, [2]], 'x', 3.5, None, True],
+            },
+        }
+        raw = json.dumps(doc).encode()
+
+        elements = list(iter_json_array(chunked(raw, size), ('storages', 'storage')))
+
+        assert elements == doc['storages']['storage']
+
+    def test_yields_elements_as_they_complete(self):
+        parser = JSONArrayParser(('items',))
+
+        assert parser.feed(b'{"items": [{"a": 1}') == []
+        assert parser.feed(b', {"a": 2}, {"a"') == [{'a': 1}, {'a': 2}]
+        assert parser.feed(b': 3}]') == [{'a': 3}]
+        assert parser.done
+
+    def test_empty_array(self):
+        assert list(iter_json_array([b'{"items": [ ]}'], ('items',))) == []
+
+
+class TestIterators:
+    @responses.activate
+    def test_iter_servers(self, manager):
+        Mock.mock_get('server')
+
+        servers = list(manager.iter_servers())
+
+        assert [type(server) for server in servers] == [Server, Server]
+        assert [server.uuid for server in servers] == [
+            server.uuid for server in manager.get_servers()
+        ]
+
+    @responses.activate
+    def test_iter_storages(self, manager):
+        Mock.mock_get('storage/public')
+
+        storages = list(manager.iter_storages('public'))
+
+        assert all(isinstance(storage, Storage) for storage in storages)
+        assert len(storages) == len(manager.get_storages('public'))
+
+    @responses.activate
+    def test_iter_ips(self, manager):
+        Mock.mock_get('ip_address')
+
+        ips = list(manager.iter_ips())
+
+        assert all(isinstance(ip, IPAddress) for ip in ips)
+        assert len(ips) == len(manager.get_ips())
+
+    @responses.activate
+    def test_error_response(self, manager):
+        responses.add(
+            responses.GET,
+            Mock.base_url + '/ip_address',
+            json={'error': {'error_code': 'AUTHENTICATION_FAILED', 'error_message': 'no'}},
+            status=401,
+        )
+
+        with pytest.raises(UpCloudAPIError) as exc:
+            next(manager.iter_ips())
+        assert exc.value.error_code == 'AUTHENTICATION_FAILED'
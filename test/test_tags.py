@@ -86,6 +86,22 @@ class TestTags:
         assert tag.name == 'AnotherTestTag'
         assert tag._api_name == 'AnotherTestTag'
 
+    @responses.activate
+    def test_modify_tag(self, manager):
+        responses.add_callback(
+            responses.PUT,
+            Mock.base_url + '/tag/TheTestTag',
+            content_type='application/json',
+            callback=tag_post_callback,
+        )
+
+        tag = manager.modify_tag(
+            'TheTestTag', 'new description', ['00798b85-efdc-41ca-8021-f6ef457b8531'], 'TheTestTag'
+        )
+
+        assert tag.description == 'new description'
+        assert tag.server_uuids == ['00798b85-efdc-41ca-8021-f6ef457b8531']
+
     @responses.activate
     def test_assign_tags_to_server(self, manager):
         data = Mock.mock_get('server/00798b85-efdc-41ca-8021-f6ef457b8531')
@@ -0,0 +1,53 @@
+import copy
+import pickle
+import weakref
+
+import pytest
+
+from upcloud_api import IPAddress, Storage, Tag
+
+
+class TestSlottedResource:
+    def test_attributes_are_slots(self):
+        ip = IPAddress(address='10.0.0.1', family='IPv4')
+
+        assert not hasattr(ip, '__dict__')
+        assert set(IPAddress.ATTRIBUTES) <= set(IPAddress.__slots__)
+        assert ip.to_dict() == {'address': '10.0.0.1', 'family': 'IPv4'}
+
+    def test_unknown_fields_overflow(self):
+        ip = IPAddress(address='10.0.0.1', floating='no')
+
+        assert ip.floating == 'no'
+        assert ip._extra == {'floating': 'no'}
+        assert 'floating' not in ip.to_dict()
+
+        del ip.floating
+        assert not hasattr(ip, 'floating')
+        with pytest.raises(AttributeError):
+            _ = ip.mac
+
+    def test_reset_keeps_defaults_and_updates(self):
+        storage = Storage(uuid='01d4fcd4', title='disk', storage_size=20)
+        storage._reset(title='renamed', part_of_plan='yes')
+
+        assert storage.title == 'renamed'
+        assert storage.size == 20
+        assert storage.tier == 'maxiops'
+        assert storage.part_of_plan == 'yes'
+
+    def test_class_slots_are_kept(self):
+        tag = Tag('web')
+
+        assert tag._api_name == 'web'
+        assert '_api_name' in Tag.__slots__
+        assert not hasattr(tag, '_extra')
+
+    def test_copy_pickle_and_weakref(self):
+        ip = IPAddress(address='10.0.0.1', floating='no')
+
+        restored = pickle.loads(pickle.dumps(ip))  # noqa: S301
+        for clone in (copy.copy(ip), copy.deepcopy(ip), restored):
+            assert clone.address == '10.0.0.1'
+            assert clone.floating == 'no'
+        assert weakref.ref(ip)() is ip
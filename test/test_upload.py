@@ -0,0 +1,328 @@
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import responses
+from conftest import Mock
+
+from upcloud_api import ChunkedUpload, UpCloudAPIError, UpCloudClientError, UploadStream
+
+STORAGE = '01d4fcd4-e446-433b-8a9c-551a1284952e'
+
+
+class StandInUploader:
+    """
+    Local stand-in for the direct upload endpoint.
+
+    Ranged PUTs are chunks: read_bytes tracks the contiguous prefix of the file received so
+    far, and requests for a chunk fail with the statuses queued in failures[offset]. Other
+    PUTs upload the whole (possibly compressed) file, which is decompressed into data.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.content_type = None
+        self.checksums = {}
+        self.received = {}  # offset: end of the received chunks past read_bytes
+        self.read_bytes = 0
+        self.requests = []
+        self.failures = {}
+        self.lock = threading.Lock()
+
+        uploader = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _read_chunked(self):
+                body = b''
+                while True:
+                    size = int(self.rfile.readline().strip(), 16)
+                    body += self.rfile.read(size)
+                    self.rfile.readline()
+                    if not size:
+                        return body
+
+            def do_PUT(self):
+                if self.headers.get('Transfer-Encoding') == 'chunked':
+                    body = self._read_chunked()
+                else:
+                    body = self.rfile.read(int(self.headers['Content-Length']))
+
+                if 'Content-Range' in self.headers:
+                    status, response = uploader.put(self.headers['Content-Range'], body)
+                else:
+                    status, response = uploader.put_file(self.headers['Content-Type'], body)
+                data = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/uploader/session/1'
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True
+        ).start()
+
+    def put(self, content_range, body):
+        span, total = content_range.split(' ')[1].split('/')
+        start, end = (int(value) for value in span.split('-'))
+        with self.lock:
+            self.requests.append(start)
+            if self.failures.get(start):
+                return self.failures[start].pop(0), {'error': 'failed'}
+
+            self.data.extend(b'\0' * (int(total) - len(self.data)))
+            self.data[start : end + 1] = body
+            self.received[start] = end + 1
+            while self.read_bytes in self.received:
+                self.read_bytes = self.received.pop(self.read_bytes)
+
+            response = {'read_bytes': self.read_bytes, 'written_bytes': self.read_bytes}
+            if self.read_bytes == int(total):
+                response['md5sum'] = hashlib.md5(self.data).hexdigest()  # noqa: S324
+                response['sha256sum'] = hashlib.sha256(self.data).hexdigest()
+            return 200, response
+
+    def put_file(self, content_type, body):
+        self.content_type = content_type
+        if content_type == 'application/gzip':
+            self.data = bytearray(gzip.decompress(body))
+        elif content_type == 'application/x-xz':
+            self.data = bytearray(lzma.decompress(body))
+        elif content_type == 'application/zstd':
+            zstandard = pytest.importorskip('zstandard')
+            self.data = bytearray(zstandard.ZstdDecompressor().decompressobj().decompress(body))
+        else:
+            self.data = bytearray(body)
+        # the API reports the checksums of the transferred bytes
+        self.checksums = {
+            'md5sum': hashlib.md5(body).hexdigest(),  # noqa: S324
+            'sha256sum': hashlib.sha256(body).hexdigest(),
+        }
+        return 200, {'written_bytes': len(self.data), **self.checksums}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def uploader():
+    uploader = StandInUploader()
+    yield uploader
+    uploader.close()
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / 'storage.img'
+    path.write_bytes(bytes(range(256)) * 40 + b'tail')
+    return path
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr('upcloud_api.utils.sleep', lambda seconds: None)
+
+
+def mock_import_details(uploader, state='prepared'):
+    def _details(request):
+        details = json.loads(Mock.read_from_file(f'storage_{STORAGE}_import.json'))
+        details['storage_import'].update(
+            state=state,
+            direct_upload_url=uploader.url,
+            read_bytes=uploader.read_bytes,
+            **uploader.checksums,
+        )
+        return 200, {}, json.dumps(details)
+
+    responses.add_callback(
+        responses.GET, f'{Mock.base_url}/storage/{STORAGE}/import', callback=_details
+    )
+    responses.add_passthru(uploader.url)
+
+
+class TestChunkedUpload:
+    def test_upload_in_chunks(self, uploader, image):
+        with ChunkedUpload(image, chunk_size=1000) as upload:
+            response = upload.upload(uploader.url)
+
+        assert uploader.data == image.read_bytes()
+        assert uploader.requests == list(range(0, 10244, 1000))
+        assert response['read_bytes'] == 10244
+        assert response['sha256sum'] == hashlib.sha256(image.read_bytes()).hexdigest()
+
+    def test_parallel_file_object(self, uploader, image):
+        data = image.read_bytes()
+
+        with ChunkedUpload(io.BytesIO(data), chunk_size=512, max_parallel=4) as upload:
+            response = upload.upload(uploader.url)
+
+        assert uploader.data == data
+        assert sorted(uploader.requests) == list(range(0, 10244, 512))
+        assert response['read_bytes'] == 10244
+
+    def test_retry_failed_chunk(self, uploader, image):
+        uploader.failures[3000] = [503, 500]
+
+        with ChunkedUpload(image, chunk_size=1000) as upload:
+            upload.upload(uploader.url)
+
+        assert uploader.data == image.read_bytes()
+        assert uploader.requests.count(3000) == 3
+
+    def test_client_error_is_not_retried(self, uploader, image):
+        uploader.failures[0] = [400]
+
+        with ChunkedUpload(image, chunk_size=1000) as upload:
+            with pytest.raises(UpCloudAPIError) as exc:
+                upload.upload(uploader.url)
+
+        assert exc.value.status_code == 400
+        assert uploader.requests == [0]
+
+    def test_empty_file(self, uploader, tmp_path):
+        path = tmp_path / 'empty.img'
+        path.write_bytes(b'')
+
+        with ChunkedUpload(path) as upload:
+            assert upload.upload(uploader.url) == {}
+        assert uploader.requests == []
+
+
+class TestUploadStorageImport:
+    @responses.activate
+    def test_resume_from_confirmed_offset(self, manager, uploader, image):
+        mock_import_details(uploader)
+        # the chunk at 5000 fails all of its attempts in the first round
+        uploader.failures[5000] = [503] * 3
+
+        response = manager.upload_storage_import(STORAGE, image, chunk_size=1000, retries=3)
+
+        assert uploader.data == image.read_bytes()
+        assert response['md5sum'] == hashlib.md5(image.read_bytes()).hexdigest()  # noqa: S324
+        # chunks confirmed before the failure are not sent again
+        assert uploader.requests[:8] == [0, 1000, 2000, 3000, 4000, 5000, 5000, 5000]
+        assert uploader.requests[8:] == [5000, 6000, 7000, 8000, 9000, 10000]
+
+    @responses.activate
+    def test_resume_already_uploaded(self, manager, uploader, image):
+        mock_import_details(uploader)
+        uploader.read_bytes = 10244
+
+        assert manager.upload_storage_import(STORAGE, image, chunk_size=1000) == {}
+        assert uploader.requests == []
+
+    @responses.activate
+    def test_give_up_after_resumes(self, manager, uploader, image):
+        mock_import_details(uploader)
+        uploader.failures[0] = [503] * 4
+
+        with pytest.raises(UpCloudAPIError):
+            manager.upload_storage_import(STORAGE, image, chunk_size=1000, retries=2, resumes=1)
+        assert uploader.requests == [0] * 4
+
+    @responses.activate
+    def test_finished_import(self, manager, uploader, image):
+        mock_import_details(uploader, state='cancelled')
+
+        with pytest.raises(UpCloudClientError) as exc:
+            manager.upload_storage_import(STORAGE, image)
+        assert 'is cancelled' in str(exc.value)
+
+
+class TestUploadStream:
+    def test_digests_of_sent_bytes(self, uploader, image):
+        stream = UploadStream(image, block_size=1000)
+
+        response = stream.upload(uploader.url)
+
+        assert uploader.data == image.read_bytes()
+        assert uploader.content_type == 'application/octet-stream'
+        assert stream.sha256 == hashlib.sha256(image.read_bytes()).hexdigest()
+        assert stream.bytes_read == stream.bytes_sent == 10244
+        stream.verify(response)
+
+    @pytest.mark.parametrize(
+        'compression, content_type',
+        [('gzip', 'application/gzip'), ('xz', 'application/x-xz'), ('zstd', 'application/zstd')],
+    )
+    def test_compression(self, uploader, image, compression, content_type):
+        if compression == 'zstd':
+            pytest.importorskip('zstandard')
+        stream = UploadStream(image, compression=compression, block_size=1000)
+
+        response = stream.upload(uploader.url)
+
+        assert uploader.data == image.read_bytes()
+        assert uploader.content_type == content_type
+        assert stream.bytes_sent < stream.bytes_read
+        assert stream.md5 == response['md5sum']
+        stream.verify(response)
+
+    def test_verify_mismatch(self, image):
+        stream = UploadStream(io.BytesIO(image.read_bytes()))
+        for _ in stream:
+            pass
+
+        with pytest.raises(UpCloudClientError) as exc:
+            stream.verify({'sha256sum': '0' * 64, 'md5sum': stream.md5})
+        assert 'sha256sum mismatch' in str(exc.value)
+        with pytest.raises(UpCloudClientError):
+            stream.verify({'sha256sum': '', 'md5sum': ''})
+
+    def test_read_error(self):
+        class BrokenFile(io.RawIOBase):
+            def read(self, size=-1):
+                raise OSError('disk on fire')
+
+        with pytest.raises(OSError, match='disk on fire'):
+            list(UploadStream(BrokenFile()))
+
+    def test_invalid_compression(self, image):
+        with pytest.raises(UpCloudClientError):
+            UploadStream(image, compression='bzip2')
+
+
+class TestStreamStorageImport:
+    @responses.activate
+    def test_upload_and_verify(self, manager, uploader, image):
+        mock_import_details(uploader, state='completed')
+
+        details = manager.stream_storage_import(STORAGE, image, compression='gzip')
+
+        assert uploader.data == image.read_bytes()
+        assert details.sha256sum == uploader.checksums['sha256sum']
+        # one request for the upload URL, one for the final state
+        assert len([call for call in responses.calls if '/storage/' in call.request.url]) == 2
+
+    @responses.activate
+    def test_checksum_mismatch(self, manager, uploader, image):
+        mock_import_details(uploader, state='completed')
+        uploader.put_file = lambda content_type, body: (200, {})
+        uploader.checksums = {'sha256sum': 'abc', 'md5sum': 'def'}
+
+        with pytest.raises(UpCloudClientError) as exc:
+            manager.stream_storage_import(STORAGE, image)
+        assert 'mismatch' in str(exc.value)
+
+    @responses.activate
+    def test_failed_import(self, manager, uploader, image):
+        mock_import_details(uploader, state='failed')
+
+        with pytest.raises(UpCloudClientError) as exc:
+            manager.stream_storage_import(STORAGE, image)
+        assert 'is failed' in str(exc.value)
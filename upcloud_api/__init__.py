@@ -10,12 +10,21 @@ __maintainer_email__ = 'hello@upcloud.com'
 __license__ = 'MIT'
 __copyright__ = 'Copyright (c) 2015 UpCloud Oy'
 
+from upcloud_api.cache import ResponseCache
 from upcloud_api.cloud_manager import CloudManager
 from upcloud_api.credentials import Credentials
-from upcloud_api.errors import UpCloudAPIError, UpCloudClientError
+from upcloud_api.errors import (
+    UpCloudAPIError,
+    UpCloudCancelledError,
+    UpCloudClientError,
+    UpCloudTimeoutError,
+)
 from upcloud_api.firewall import FirewallRule
+from upcloud_api.firewall_matcher import FirewallMatcher
 from upcloud_api.host import Host
+from upcloud_api.identity_map import IdentityMap
 from upcloud_api.interface import Interface
+from upcloud_api.inventory import Inventory
 from upcloud_api.ip_address import IPAddress
 from upcloud_api.ip_network import IpNetwork
 from upcloud_api.label import Label
@@ -28,10 +37,16 @@ from upcloud_api.load_balancer import (
     LoadBalancerNetwork,
 )
 from upcloud_api.network import Network
+from upcloud_api.plan import Plan, PlanAction, Spec
+from upcloud_api.polling import Poller
+from upcloud_api.rate_limit import RateLimiter
+from upcloud_api.retry import RetryPolicy
 from upcloud_api.router import Router
 from upcloud_api.server import Server, ServerNetworkInterface, login_user_block
 from upcloud_api.server_group import ServerGroup, ServerGroupAffinityPolicy
+from upcloud_api.server_table import ServerTable
 from upcloud_api.storage import Storage
 from upcloud_api.storage_import import StorageImport
 from upcloud_api.tag import Tag
 from upcloud_api.upcloud_resource import UpCloudResource
+from upcloud_api.upload import ChunkedUpload, UploadStream
@@ -0,0 +1,10 @@
+"""
+Asyncio interface to UpCloud's API.
+
+Requires the optional `httpx` dependency: `pip install upcloud-api[async]`.
+"""
+
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.aio.cloud_manager import AsyncCloudManager
+from upcloud_api.aio.server import AsyncServer
+from upcloud_api.aio.server_table import AsyncServerTable
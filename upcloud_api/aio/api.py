@@ -0,0 +1,192 @@
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+import asyncio
+import itertools
+
+from upcloud_api.api import API
+from upcloud_api.errors import UpCloudAPIError, UpCloudClientError
+
+
+class AsyncAPI(API):
+    """
+    Handles basic asynchronous HTTP communication with API.
+
+    Shares request building and error handling with API, but sends requests through an
+    `httpx.AsyncClient` so that many calls can run concurrently on one event loop.
+    """
+
+    transport_errors = (httpx.TransportError,) if httpx else ()
+    connect_errors = (httpx.ConnectError, httpx.ConnectTimeout) if httpx else ()
+
+    def __init__(
+        self,
+        token,
+        timeout=None,
+        pool_size=100,
+        keep_alive=True,
+        pool_idle_timeout=5.0,
+        transport=None,
+        cache=None,
+        retry_policy=None,
+        rate_limiter=None,
+        json_codec=None,
+    ):
+        """
+        Initialize the API with a given Authorization token and default timeout.
+
+        - pool_size: maximum number of concurrent connections
+        - keep_alive: set to False to close the connection after each request
+        - pool_idle_timeout: close idle keep-alive connections after this many seconds
+        - transport: optional custom httpx transport (e.g. httpx.MockTransport)
+        - cache: optional ResponseCache for GET responses
+        - retry_policy: optional RetryPolicy for failed requests
+        - rate_limiter: optional RateLimiter pacing requests
+        - json_codec: optional JSONCodec or codec name
+        """
+        if httpx is None:
+            raise UpCloudClientError(
+                "AsyncAPI requires httpx. Install it with `pip install upcloud-api[async]`."
+            )
+
+        super().__init__(
+            token,
+            timeout=timeout,
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            pool_idle_timeout=pool_idle_timeout,
+            cache=cache,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
+        )
+        self.transport = transport
+        self._client = None
+
+    @property
+    def client(self):
+        """
+        The pooled `httpx.AsyncClient` used for API calls. Created on first use.
+        """
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size if self.keep_alive else 0,
+                keepalive_expiry=self.pool_idle_timeout,
+            )
+            self._client = httpx.AsyncClient(limits=limits, transport=self.transport)
+        return self._client
+
+    async def close(self):
+        """
+        Close all pooled connections. The pool is recreated on the next request.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _wait_for_rate_limiter(self, method):
+        for rate_limiter in self._rate_limiters():
+            if rate_limiter.path is not None:
+                # the buckets shared through a file are read and written under flock
+                delay = await asyncio.to_thread(rate_limiter.reserve, method)
+            else:
+                delay = rate_limiter.reserve(method)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def _send(self, method, url, data, params, headers, timeout):
+        """
+        Send a request through the pooled client, waiting for the rate limiter first.
+        """
+        await self._wait_for_rate_limiter(method)
+        return await self.client.request(
+            method,
+            url,
+            content=data,
+            params=params,
+            headers=headers,
+            timeout=timeout,
+        )
+
+    async def api_request(
+        self, method, endpoint, body=None, params=None, timeout=-1, no_cache=False
+    ):
+        """
+        Perform a request with a given JSON body to a given endpoint in UpCloud's API.
+
+        Cached GET responses are returned without a request while fresh, and revalidated with
+        a conditional request once expired (see: ResponseCache). With no_cache=True a cached
+        response is always revalidated first, e.g. when polling for a state change. Failed
+        requests are retried if a retry policy is set (see: RetryPolicy).
+
+        Handles errors with _error_middleware.
+        """
+        url, data, headers, call_timeout = self._prepare_request(method, endpoint, body, timeout)
+
+        cache_key = self._cache_key(method, endpoint, params)
+        if cache_key is not None and not no_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        policy = self.retry_policy
+        if policy is None:
+            return await self._request(method, endpoint, url, data, params, headers, call_timeout)
+
+        deadline_at = policy.deadline_at()
+        for attempt in itertools.count(1):
+            try:
+                attempt_timeout = policy.attempt_timeout(call_timeout, deadline_at)
+                return await self._request(
+                    method, endpoint, url, data, params, headers, attempt_timeout
+                )
+            except (UpCloudAPIError, *self.transport_errors) as e:
+                sent = not isinstance(e, self.connect_errors)
+                delay = policy.next_delay(method, e, attempt, deadline_at, sent)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def _request(self, method, endpoint, url, data, params, headers, timeout):
+        """
+        Send a single attempt of a request and return its parsed JSON body.
+        """
+        cache_key = self._cache_key(method, endpoint, params)
+        if cache_key is not None:
+            conditional_headers = {**headers, **self.cache.validators(cache_key)}
+        else:
+            conditional_headers = headers
+
+        res = await self._send(method, url, data, params, conditional_headers, timeout)
+
+        if res.status_code == 304 and cache_key is not None:
+            cached = self.cache.revalidate(cache_key, self.cache.ttl_for(endpoint))
+            if cached is not None:
+                return cached
+            # evicted while the request was in flight
+            res = await self._send(method, url, data, params, headers, timeout)
+
+        res_json = self._parse(res, res.content)
+        self._update_cache(method, endpoint, cache_key, res, res_json)
+        return res_json
+
+    async def get_stream(self, endpoint, params=None, timeout=-1, chunk_size=65536):
+        """
+        Perform a GET request to a given endpoint and yield the raw response body in chunks.
+
+        The body is not cached and the request is not retried. Error responses raise
+        UpCloudAPIError before anything is yielded.
+        """
+        url, _, headers, call_timeout = self._prepare_request('GET', endpoint, timeout=timeout)
+
+        await self._wait_for_rate_limiter('GET')
+        async with self.client.stream(
+            'GET', url, params=params, headers=headers, timeout=call_timeout
+        ) as res:
+            if res.status_code >= 400:
+                self._parse(res, await res.aread())
+            async for chunk in res.aiter_bytes(chunk_size):
+                yield chunk
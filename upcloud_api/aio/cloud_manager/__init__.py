@@ -0,0 +1,139 @@
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.aio.cloud_manager.firewall_mixin import AsyncFirewallManager
+from upcloud_api.aio.cloud_manager.host_mixin import AsyncHostManager
+from upcloud_api.aio.cloud_manager.ip_address_mixin import AsyncIPManager
+from upcloud_api.aio.cloud_manager.lb_mixin import AsyncLoadBalancerManager
+from upcloud_api.aio.cloud_manager.network_mixin import AsyncNetworkManager
+from upcloud_api.aio.cloud_manager.server_mixin import AsyncServerManager
+from upcloud_api.aio.cloud_manager.storage_mixin import AsyncStorageManager
+from upcloud_api.aio.cloud_manager.tag_mixin import AsyncTagManager
+from upcloud_api.aio.server import AsyncServer
+from upcloud_api.cache import ResponseCache
+from upcloud_api.codec import JSONCodec
+from upcloud_api.credentials import Credentials
+from upcloud_api.errors import UpCloudClientError
+from upcloud_api.identity_map import IdentityMap
+from upcloud_api.rate_limit import RateLimiter
+from upcloud_api.retry import RetryPolicy
+
+
+class AsyncCloudManager(
+    AsyncFirewallManager,
+    AsyncHostManager,
+    AsyncIPManager,
+    AsyncLoadBalancerManager,
+    AsyncNetworkManager,
+    AsyncServerManager,
+    AsyncStorageManager,
+    AsyncTagManager,
+):
+    """
+    AsyncCloudManager is the asyncio counterpart of CloudManager.
+
+    All API methods are coroutines and share one pooled async HTTP client, so many calls
+    can run concurrently on a single event loop. Can be used as an async context manager
+    to close the pool on exit.
+    """
+
+    api: AsyncAPI
+
+    # class of the server objects built for this manager, e.g. by Tag
+    server_class = AsyncServer
+
+    def __init__(
+        self,
+        username: str = None,
+        password: str = None,
+        timeout: int = 60,
+        token: str = None,
+        pool_size: int = 100,
+        keep_alive: bool = True,
+        pool_idle_timeout: float | None = 5.0,
+        transport=None,
+        cache: 'bool | ResponseCache' = False,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        json_codec: str | JSONCodec | None = None,
+        identity_map: 'bool | IdentityMap' = False,
+    ) -> None:
+        """
+        Initiates AsyncCloudManager that handles all HTTP connections with UpCloud's API.
+
+        Optionally determine a timeout for API connections (in seconds). A timeout with the value
+        `None` means that there is no timeout. See AsyncAPI for the connection pool parameters.
+        See CloudManager for `cache`, `retry_policy`, `rate_limiter`, `json_codec` and
+        `identity_map`.
+        """
+        credentials = Credentials(username, password, token)
+        if not credentials.is_defined:
+            raise UpCloudClientError(
+                "Credentials are not defined. Please provide username and password or an API token."
+            )
+
+        self.api = AsyncAPI(
+            token=credentials.authorization,
+            timeout=timeout,
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            pool_idle_timeout=pool_idle_timeout,
+            transport=transport,
+            cache=ResponseCache() if cache is True else cache or None,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
+        )
+        self.identity_map = IdentityMap() if identity_map is True else identity_map or None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Close all pooled HTTP connections.
+        """
+        await self.api.close()
+
+    async def authenticate(self):
+        """
+        Authenticate.
+        """
+        return await self.get_account()
+
+    async def get_account(self):
+        """
+        Returns information on the user's account and resource limits.
+        """
+        return await self.api.get_request('/account')
+
+    async def get_zones(self):
+        """
+        Returns a list of available zones.
+        """
+        return await self.api.get_request('/zone')
+
+    async def get_timezones(self):
+        """
+        Returns a list of available timezones.
+        """
+        return await self.api.get_request('/timezone')
+
+    async def get_prices(self):
+        """
+        Returns a list of resource prices.
+        """
+        return await self.api.get_request('/price')
+
+    async def get_server_sizes(self):
+        """
+        Returns a list of available server configurations.
+        """
+        return await self.api.get_request('/server_size')
+
+    async def get_server_plans(self):
+        """
+        Returns a list of available server plans
+        """
+        return await self.api.get_request('/plan')
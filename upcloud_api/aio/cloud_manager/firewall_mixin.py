@@ -0,0 +1,110 @@
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.cloud_manager.firewall_mixin import FirewallManager, uuid_and_instance
+from upcloud_api.firewall import FirewallRule
+
+
+class AsyncFirewallManager:
+    """
+    Provides async get / list / create / delete functionality for firewall rules.
+
+    Mirrors upcloud_api.cloud_manager.firewall_mixin.FirewallManager.
+    """
+
+    api: AsyncAPI
+
+    async def get_firewall_rule(self, server_uuid, firewall_rule_position, server_instance=None):
+        """
+        Return a FirewallRule object based on server uuid and rule position.
+        """
+        url = f'/server/{server_uuid}/firewall_rule/{firewall_rule_position}'
+        res = await self.api.get_request(url)
+        return FirewallRule(**res['firewall_rule'])
+
+    async def get_firewall_rules(self, server):
+        """
+        Return all FirewallRule objects based on a server instance or uuid.
+        """
+        server_uuid, server_instance = uuid_and_instance(server)
+
+        url = f'/server/{server_uuid}/firewall_rule'
+        res = await self.api.get_request(url)
+        return FirewallManager._firewall_rules_from_api(res, server_instance)
+
+    async def create_firewall_rule(self, server, firewall_rule_body):
+        """
+        Create a new firewall rule for a given server uuid.
+
+        The rule can be given as a dict or with FirewallRule.prepare_post_body().
+        Returns a FirewallRule object.
+        """
+        server_uuid, server_instance = uuid_and_instance(server)
+
+        url = f'/server/{server_uuid}/firewall_rule'
+        body = {'firewall_rule': firewall_rule_body}
+        res = await self.api.post_request(url, body)
+
+        return FirewallRule(server=server_instance, **res['firewall_rule'])
+
+    async def delete_firewall_rule(self, server_uuid, firewall_rule_position):
+        """
+        Delete a firewall rule based on a server uuid and rule position.
+        """
+        url = f'/server/{server_uuid}/firewall_rule/{firewall_rule_position}'
+        return await self.api.delete_request(url)
+
+    async def configure_firewall(self, server, firewall_rule_bodies):
+        """
+        Helper for calling create_firewall_rule in series for a list of firewall_rule_bodies.
+
+        Rules are created one after another as their positions depend on each other.
+        """
+        server_uuid, server_instance = uuid_and_instance(server)
+
+        return [
+            await self.create_firewall_rule(server_uuid, rule) for rule in firewall_rule_bodies
+        ]
+
+    async def replace_firewall_rules(self, server, firewall_rule_bodies):
+        """
+        Replace all firewall rules of a server with firewall_rule_bodies in one request.
+
+        The rules are numbered in the given order. Returns the new FirewallRule objects.
+        """
+        server_uuid, server_instance = uuid_and_instance(server)
+
+        url = f'/server/{server_uuid}/firewall_rule'
+        body = FirewallManager._replace_firewall_rules_body(firewall_rule_bodies)
+        res = await self.api.put_request(url, body)
+        return FirewallManager._firewall_rules_from_api(res, server_instance)
+
+    async def sync_firewall(self, server, firewall_rules, current_rules=None, replace=True):
+        """
+        Make the firewall rules of a server equal firewall_rules with as few requests as possible.
+
+        The current rules are fetched once (or given as current_rules) and compared with the
+        desired ones position by position (see: diff_firewall_rules); matching rules are left
+        alone. A single missing or extra rule is inserted or deleted with one request and
+        larger changes replace the whole rule set with one request, or are applied as
+        individual inserts and deletes if replace=False.
+
+        Returns the numbers of 'inserted', 'deleted' and 'unchanged' rules, whether the rule
+        set was 'replaced' and how many 'requests' were made to change it.
+        """
+        server_uuid, _ = uuid_and_instance(server)
+        if current_rules is None:
+            current_rules = await self.get_firewall_rules(server_uuid)
+
+        edits, summary = FirewallManager._sync_firewall_edits(current_rules, firewall_rules)
+        if replace and len(edits) > 1:
+            bodies = FirewallManager._firewall_rule_bodies(firewall_rules)
+            await self.replace_firewall_rules(server_uuid, bodies)
+            summary.update(replaced=True, requests=1)
+            return summary
+
+        for operation, position, body in edits:
+            if operation == 'delete':
+                await self.delete_firewall_rule(server_uuid, position)
+            else:
+                await self.create_firewall_rule(server_uuid, body)
+        summary['requests'] = len(edits)
+        return summary
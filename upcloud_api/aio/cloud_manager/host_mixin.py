@@ -0,0 +1,37 @@
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.host import Host
+
+
+class AsyncHostManager:
+    """
+    Async functions for managing hosts. Intended to be used as a mixin for AsyncCloudManager.
+
+    Mirrors upcloud_api.cloud_manager.host_mixin.HostManager.
+    """
+
+    api: AsyncAPI
+
+    async def get_hosts(self):
+        """
+        Returns a list of available hosts, along with basic statistics of them when available.
+        """
+        url = '/host'
+        res = await self.api.get_request(url)
+        return [Host(**host) for host in res['hosts']['host']]
+
+    async def get_host(self, id: str) -> Host:
+        """
+        Returns detailed information about a specific host.
+        """
+        url = f'/host/{id}'
+        res = await self.api.get_request(url)
+        return Host(**res['host'])
+
+    async def modify_host(self, host: str, description: str) -> Host:
+        """
+        Modifies description of a specific host.
+        """
+        url = f'/host/{host}'
+        body = {'host': {'description': description}}
+        res = await self.api.patch_request(url, body)
+        return Host(**res['host'])
@@ -0,0 +1,84 @@
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.cloud_manager.ip_address_mixin import IPManager
+from upcloud_api.ip_address import IPAddress
+from upcloud_api.streaming import aiter_json_array
+
+
+class AsyncIPManager:
+    """
+    Async functions for managing IP-addresses. Intended to be used as a mixin for AsyncCloudManager.
+
+    Mirrors upcloud_api.cloud_manager.ip_address_mixin.IPManager.
+    """
+
+    api: AsyncAPI
+
+    async def get_ip(self, address: str) -> IPAddress:
+        """
+        Get an IPAddress object with the IP address (string) from the API.
+        """
+        res = await self.api.get_request('/ip_address/' + address)
+        return IPAddress(cloud_manager=self, **res['ip_address'])
+
+    async def get_ips(self, ignore_ips_without_server=False):
+        """
+        Get all IPAddress objects from the API.
+        """
+        res = await self.api.get_request('/ip_address')
+        IPs = IPAddress._create_ip_address_objs(
+            res['ip_addresses'], self, ignore_ips_without_server
+        )
+        return IPs
+
+    async def iter_ips(self, ignore_ips_without_server=False):
+        """
+        Asynchronously yield IPAddress objects from the API as they are received.
+
+        See IPManager.iter_ips.
+        """
+        chunks = self.api.get_stream('/ip_address')
+        path = ('ip_addresses', 'ip_address')
+        async for ip_addr in aiter_json_array(chunks, path, self.api.json_codec.loads):
+            if ignore_ips_without_server and not ip_addr.get('server'):
+                continue
+            yield IPAddress(cloud_manager=self, **ip_addr)
+
+    async def attach_ip(self, server: str, family: str = 'IPv4') -> IPAddress:
+        """
+        Attach a new (random) IPAddress to the given server (object or UUID).
+        """
+        body = {'ip_address': {'server': str(server), 'family': family}}
+
+        res = await self.api.post_request('/ip_address', body)
+        return IPAddress(cloud_manager=self, **res['ip_address'])
+
+    async def modify_ip(self, ip_addr: str, ptr_record: str) -> IPAddress:
+        """
+        Modify an IP address' ptr-record (Reverse DNS).
+
+        Accepts an IPAddress instance (object) or its address (string).
+        """
+        body = {'ip_address': {'ptr_record': ptr_record}}
+
+        res = await self.api.put_request('/ip_address/' + str(ip_addr), body)
+        return IPAddress(cloud_manager=self, **res['ip_address'])
+
+    async def release_ip(self, ip_addr):
+        """
+        Destroy an IPAddress. Returns an empty object.
+
+        Accepts an IPAddress instance (object) or its address (string).
+        """
+        return await self.api.delete_request('/ip_address/' + str(ip_addr))
+
+    async def create_floating_ip(
+        self, zone: str, mac: str = '', family: str = 'IPv4'
+    ) -> IPAddress:
+        """
+        Create a floating IP and returns an IPAddress object.
+        Specify MAC address of network interface to attach the floating IP when it is created
+        """
+        body = IPManager._floating_ip_body(zone, mac, family)
+
+        res = await self.api.post_request('/ip_address', body)
+        return IPAddress(cloud_manager=self, **res['ip_address'])
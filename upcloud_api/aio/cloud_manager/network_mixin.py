@@ -0,0 +1,203 @@
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.cloud_manager.network_mixin import NetworkManager
+from upcloud_api.interface import Interface
+from upcloud_api.network import Network
+from upcloud_api.router import Router
+
+
+class AsyncNetworkManager:
+    """
+    Async functions for managing networks. Intended to be used as a mixin for AsyncCloudManager.
+
+    Mirrors upcloud_api.cloud_manager.network_mixin.NetworkManager, whose static methods build
+    the requests.
+    """
+
+    api: AsyncAPI
+
+    async def get_networks(self, zone=None):
+        """
+        Get a list of all networks.
+        Zone can be passed to return networks in a specific zone
+        """
+        url = f'/network/?zone={zone}' if zone else '/network'
+        res = await self.api.get_request(url)
+        return [
+            NetworkManager._network_from_api(network) for network in res['networks']['network']
+        ]
+
+    async def get_network(self, uuid: str) -> Network:
+        """
+        Retrieves the details of a specific network.
+        """
+        url = f'/network/{uuid}'
+        res = await self.api.get_request(url)
+        return NetworkManager._network_from_api(res['network'])
+
+    async def create_network(
+        self,
+        name,
+        zone,
+        address,
+        dhcp,
+        family,
+        router=None,
+        dhcp_default_route=None,
+        dhcp_dns=None,
+        dhcp_bootfile_url=None,
+        gateway=None,
+    ):
+        """
+        Creates a new SDN private network that cloud servers from the same zone can be attached to.
+        """
+        url = '/network'
+        body = NetworkManager._create_network_body(
+            name,
+            zone,
+            address,
+            dhcp,
+            family,
+            router,
+            dhcp_default_route,
+            dhcp_dns,
+            dhcp_bootfile_url,
+            gateway,
+        )
+        res = await self.api.post_request(url, body)
+        return NetworkManager._network_from_api(res['network'])
+
+    async def modify_network(
+        self,
+        network,
+        dhcp,
+        family,
+        name=None,
+        router=None,
+        dhcp_default_route=None,
+        dhcp_dns=None,
+        dhcp_bootfile_url=None,
+        gateway=None,
+    ):
+        """
+        Modifies the details of a specific SDN private network. The Utility and public networks cannot be modified.
+        """
+        url = f'/network/{network}'
+        body = NetworkManager._modify_network_body(
+            dhcp,
+            family,
+            name,
+            router,
+            dhcp_default_route,
+            dhcp_dns,
+            dhcp_bootfile_url,
+            gateway,
+        )
+        res = await self.api.put_request(url, body)
+        return NetworkManager._network_from_api(res['network'])
+
+    async def delete_network(self, network):
+        """
+        Deletes an SDN private network. All attached cloud servers must first be detached before SDN private networks can be deleted.
+        """
+        url = f'/network/{network}'
+        res = await self.api.delete_request(url)
+        return res
+
+    async def get_server_networks(self, server):
+        """
+        List all networks the specific cloud server is connected to.
+        """
+        url = f'/server/{server}/networking'
+        res = await self.api.get_request(url)
+        return [
+            Interface(**interface) for interface in res['networking']['interfaces']['interface']
+        ]
+
+    async def create_network_interface(
+        self,
+        server,
+        network,
+        type,
+        ip_addresses,
+        index=None,
+        source_ip_filtering=None,
+        bootable=None,
+    ):
+        """
+        Creates a new network interface on the specific cloud server and attaches the specified SDN private network to the new interface.
+        """
+        url = f'/server/{server}/networking/interface'
+        body = NetworkManager._create_network_interface_body(
+            network, type, ip_addresses, index, source_ip_filtering, bootable
+        )
+        res = await self.api.post_request(url, body)
+        return Interface(**res['interface'])
+
+    async def modify_network_interface(
+        self,
+        server,
+        index_in_path,
+        index_in_body=None,
+        ip_addresses=None,
+        source_ip_filtering=None,
+        bootable=None,
+    ):
+        """
+        Modifies the network interface at the selected index on the specific cloud server.
+        """
+        url = f'/server/{server}/networking/interface/{str(index_in_path)}'
+        body = NetworkManager._modify_network_interface_body(
+            index_in_body, ip_addresses, source_ip_filtering, bootable
+        )
+        res = await self.api.put_request(url, body)
+        return Interface(**res['interface'])
+
+    async def delete_network_interface(self, server, index):
+        """
+        Detaches an SDN private network from a cloud server by deleting the network interface at the selected index on the specific cloud server.
+        """
+        url = f'/server/{server}/networking/interface/{str(index)}'
+        res = await self.api.delete_request(url)
+        return res
+
+    async def get_routers(self):
+        """
+        Returns a list of all available routers associated with the current account.
+        """
+        url = '/router'
+        res = await self.api.get_request(url)
+        return [Router(**router) for router in res['routers']['router']]
+
+    async def get_router(self, uuid: str) -> Router:
+        """
+        Returns detailed information about a specific router.
+        """
+        url = f'/router/{uuid}'
+        res = await self.api.get_request(url)
+        return Router(**res['router'])
+
+    async def create_router(self, name: str) -> Router:
+        """
+        Creates a new router.
+        """
+        url = '/router'
+        body = {'router': {'name': name}}
+        res = await self.api.post_request(url, body)
+        return Router(**res['router'])
+
+    async def modify_router(self, router: str, name: str) -> Router:
+        """
+        Modify an existing router.
+        """
+        url = f'/router/{router}'
+        body = {'router': {'name': name}}
+        res = await self.api.patch_request(url, body)
+        return Router(**res['router'])
+
+    async def delete_router(self, router):
+        """
+        Delete an existing router.
+        """
+        url = f'/router/{router}'
+        res = await self.api.delete_request(url)
+        return res
@@ -0,0 +1,230 @@
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.aio.server import AsyncServer
+from upcloud_api.aio.server_table import AsyncServerTable
+from upcloud_api.aio.utils import run_concurrently
+from upcloud_api.cloud_manager.server_mixin import ServerManager
+from upcloud_api.errors import UpCloudTimeoutError
+from upcloud_api.polling import Poller
+from upcloud_api.server import Server
+from upcloud_api.server_group import ServerGroup
+from upcloud_api.storage import BackupDeletionPolicy
+from upcloud_api.streaming import aiter_json_array
+from upcloud_api.utils import BulkResult
+
+
+class AsyncServerManager:
+    """
+    Async functions for managing servers. Intended to be used as a mixin for AsyncCloudManager.
+
+    Mirrors upcloud_api.cloud_manager.server_mixin.ServerManager.
+    """
+
+    api: AsyncAPI
+
+    async def get_servers(
+        self, populate=False, tags_has_one=None, tags_has_all=None, max_concurrency=50
+    ):
+        """
+        Return a list of (populated or unpopulated) AsyncServer instances.
+
+        With populate=True at most `max_concurrency` server details are fetched at a time.
+        Failures are collected in `.errors` of the returned BulkResult as in
+        ServerManager.get_servers, which also documents tag filtering.
+        """
+        request = ServerManager._servers_endpoint(tags_has_one, tags_has_all)
+        servers = (await self.api.get_request(request))['servers']['server']
+
+        server_list = BulkResult()
+        for server in servers:
+            server_list.append(AsyncServer._from_api(server, self))
+
+        if populate:
+            results = await run_concurrently(
+                lambda server_instance: server_instance.populate(), server_list, max_concurrency
+            )
+            for server_instance, (_, error) in zip(server_list, results, strict=True):
+                if error is not None:
+                    server_list.errors[server_instance] = error
+
+        return server_list
+
+    async def iter_servers(self, tags_has_one=None, tags_has_all=None):
+        """
+        Asynchronously yield unpopulated AsyncServer instances as they are received.
+
+        See ServerManager.iter_servers.
+        """
+        endpoint = ServerManager._servers_endpoint(tags_has_one, tags_has_all)
+        chunks = self.api.get_stream(endpoint)
+        path = ('servers', 'server')
+        async for server in aiter_json_array(chunks, path, self.api.json_codec.loads):
+            yield AsyncServer._from_api(server, self)
+
+    async def get_server_table(self, tags_has_one=None, tags_has_all=None) -> AsyncServerTable:
+        """
+        Return an AsyncServerTable of all servers, or those matching the given tags.
+
+        See ServerManager.get_server_table. The table's servers() are AsyncServer instances;
+        `await table.populate_servers()` returns them populated.
+        """
+        table = AsyncServerTable(cloud_manager=self)
+        endpoint = ServerManager._servers_endpoint(tags_has_one, tags_has_all)
+        chunks = self.api.get_stream(endpoint)
+        async for server in aiter_json_array(
+            chunks, ('servers', 'server'), self.api.json_codec.loads
+        ):
+            table.append(server)
+        return table
+
+    async def get_server(self, uuid: str) -> AsyncServer:
+        """
+        Return a (populated) AsyncServer instance.
+        """
+        data = await self.api.get_request(f'/server/{uuid}')
+        return AsyncServer._from_api(data['server'], self, populated=True)
+
+    async def get_server_by_ip(self, ip_address: str):
+        """
+        Return a (populated) AsyncServer instance by its IP.
+        """
+        data = await self.api.get_request(f'/ip_address/{ip_address}')
+        UUID = data['ip_address']['server']
+        return await self.get_server(UUID)
+
+    async def create_server(self, server: Server) -> AsyncServer:
+        """
+        Create a server and its storages based on a (locally created) Server object.
+
+        Populates the given Server instance with the API response.
+        See ServerManager.create_server.
+        """
+        if isinstance(server, Server):
+            body = server.prepare_post_body()
+        else:
+            server = AsyncServer._create_server_obj(server, cloud_manager=self)
+            body = server.prepare_post_body()
+
+        res = await self.api.post_request('/server', body)
+
+        server_to_return = server
+        server_to_return._reset(res['server'], cloud_manager=self, populated=True)
+        return server_to_return
+
+    async def _modify_server(self, uuid: str, **kwargs) -> dict:
+        """
+        PUT /server/uuid. Returns a dict that can be used to create an AsyncServer object.
+
+        Private method used by the AsyncServer class and AsyncServerManager.modify_server.
+        """
+        body = ServerManager._modify_server_body(**kwargs)
+        res = await self.api.put_request(f'/server/{uuid}', body)
+        return res['server']
+
+    async def modify_server(self, uuid: str, **kwargs) -> AsyncServer:
+        """
+        modify_server allows updating the server's updateable_fields.
+        """
+        return AsyncServer._from_api(
+            await self._modify_server(uuid, **kwargs), self, populated=True
+        )
+
+    async def delete_server(
+        self,
+        uuid: str,
+        delete_storages: bool = False,
+        backups: BackupDeletionPolicy = BackupDeletionPolicy.KEEP,
+    ):
+        """
+        DELETE '/server/UUID'. Permanently destroys the virtual machine.
+        """
+        return await self.api.delete_request(
+            ServerManager._delete_server_endpoint(uuid, delete_storages, backups)
+        )
+
+    async def get_server_data(self, uuid: str):
+        """
+        Return '/server/uuid' data in Python dict.
+
+        Creates object representations of any IP-address and Storage.
+        """
+        data = await self.api.get_request(f'/server/{uuid}')
+        return ServerManager._server_data_from_api(data, self)
+
+    async def get_server_state(self, uuid: str) -> str:
+        """
+        Return the state of a server from '/server/uuid' without building sub-objects.
+
+        A cached response is revalidated, as in ServerManager.get_server_state.
+        """
+        data = await self.api.get_request(f'/server/{uuid}', no_cache=True)
+        return data['server']['state']
+
+    async def wait_for_servers(
+        self, servers, target_states, timeout: float | None = None, poller: Poller | None = None
+    ) -> list:
+        """
+        Wait until all given servers are in one of target_states, polling one '/server' list
+        per interval. Returns the stragglers, see ServerManager.wait_for_servers.
+        """
+        poller = poller or Poller(timeout=timeout)
+        pending = {server.uuid: server for server in servers}
+        failed = []
+
+        async def _refresh():
+            data = await self.api.get_request('/server', no_cache=True)
+            ServerManager._update_server_states(data, pending, failed, target_states)
+
+        if not pending:
+            return []
+
+        await _refresh()
+        try:
+            await poller.async_wait(lambda: not pending, _refresh)
+        except UpCloudTimeoutError:
+            pass
+
+        return failed + list(pending.values())
+
+    async def create_server_group(self, server_group: ServerGroup) -> ServerGroup:
+        """
+        Creates a new server group. Allows including servers and defining labels.
+        """
+        body = server_group.to_dict()
+
+        res = await self.api.post_request('/server-group', body)
+        return ServerGroup(cloud_manager=self, **res['server_group'])
+
+    async def get_server_groups(self) -> list:
+        """
+        Returns a list of all server groups of the account as ServerGroup objects.
+        """
+        data = await self.api.get_request('/server-group')
+        return [
+            ServerGroup(cloud_manager=self, **server_group)
+            for server_group in data['server_groups']['server_group']
+        ]
+
+    async def get_server_group(self, uuid: str) -> ServerGroup:
+        """
+        Fetches server group details and returns a ServerGroup object.
+        """
+        data = await self.api.get_request(f'/server-group/{uuid}')
+        return ServerGroup(cloud_manager=self, **data['server_group'])
+
+    async def modify_server_group(
+        self, uuid: str, title=None, anti_affinity=None, servers=None
+    ) -> ServerGroup:
+        """
+        Modifies the title, anti-affinity policy or servers of a server group.
+
+        servers replaces the group's servers and is given as Server objects or UUIDs.
+        """
+        body = ServerManager._modify_server_group_body(title, anti_affinity, servers)
+        res = await self.api.patch_request(f'/server-group/{uuid}', body)
+        return ServerGroup(cloud_manager=self, **res['server_group'])
+
+    async def delete_server_group(self, uuid: str):
+        """
+        DELETE '/server-group/UUID'. Destroys the server group, but not attached servers.
+        """
+        return await self.api.delete_request(f'/server-group/{uuid}')
@@ -0,0 +1,295 @@
+import asyncio
+import os
+from os import PathLike
+from typing import BinaryIO
+
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.cloud_manager.storage_mixin import StorageManager
+from upcloud_api.polling import Poller
+from upcloud_api.storage import BackupDeletionPolicy, Storage
+from upcloud_api.storage_import import STORAGE_IMPORT_FINAL_STATES, StorageImport
+from upcloud_api.streaming import aiter_json_array
+
+# bytes read from the file per chunk by upload_file_for_storage_import
+UPLOAD_READ_SIZE = 1024 * 1024
+
+
+class AsyncStorageManager:
+    """
+    Async functions for managing Storage disks. Intended to be used as a mixin for AsyncCloudManager.
+
+    Mirrors upcloud_api.cloud_manager.storage_mixin.StorageManager.
+    """
+
+    api: AsyncAPI
+
+    async def get_storages(self, storage_type='normal'):
+        """
+        Return a list of Storage objects from the API.
+
+        Storage types: public, private, normal, backup, cdrom, template, favorite
+        """
+        res = await self.api.get_request('/storage/' + storage_type)
+        return [Storage._from_api(storage, self) for storage in res['storages']['storage']]
+
+    async def iter_storages(self, storage_type='normal'):
+        """
+        Asynchronously yield Storage objects from the API as they are received.
+
+        See StorageManager.iter_storages.
+        """
+        chunks = self.api.get_stream('/storage/' + storage_type)
+        path = ('storages', 'storage')
+        async for storage in aiter_json_array(chunks, path, self.api.json_codec.loads):
+            yield Storage._from_api(storage, self)
+
+    async def get_templates(self):
+        """
+        Return a list of Storages that are templates in a dict with title as key and uuid as value.
+        """
+        res = await self.api.get_request('/storage/template')
+        return StorageManager._templates_from_api(res)
+
+    async def get_storage(self, storage: str) -> Storage:
+        """
+        Return a Storage object from the API.
+        """
+        res = await self.api.get_request('/storage/' + str(storage))
+        return Storage._from_api(res['storage'], self)
+
+    async def get_storage_state(self, storage: str) -> str:
+        """
+        Return the state of a storage from '/storage/uuid' without building a Storage object.
+
+        A cached response is revalidated (see: ResponseCache), as the state is polled.
+        """
+        res = await self.api.get_request('/storage/' + str(storage), no_cache=True)
+        return res['storage']['state']
+
+    async def wait_for_storage_state(
+        self, storage: Storage | str, target_states, poller: Poller | None = None
+    ) -> str:
+        """
+        Wait until the storage reaches one of target_states. Returns the state.
+        """
+        state = await self.get_storage_state(storage)
+
+        def _is_done():
+            if state == 'error':
+                raise Exception('storage is in error state')
+            return state in target_states
+
+        async def _refresh():
+            nonlocal state
+            state = await self.get_storage_state(storage)
+
+        await (poller or Poller()).async_wait(_is_done, _refresh)
+
+        if isinstance(storage, Storage):
+            storage.state = state
+        return state
+
+    async def create_storage(
+        self,
+        zone: str,
+        size: int = 10,
+        tier: str = 'maxiops',
+        title: str = 'Storage disk',
+        encrypted: bool = False,
+        *,
+        backup_rule: dict | None = None,
+    ) -> Storage:
+        """
+        Create a Storage object. Returns an object based on the API's response.
+        """
+        body = StorageManager._create_storage_body(zone, size, tier, title, encrypted, backup_rule)
+        res = await self.api.post_request('/storage', body)
+        return Storage._from_api(res['storage'], self)
+
+    async def _modify_storage(self, storage, size, title, backup_rule: dict | None = None):
+        body = StorageManager._modify_storage_body(size, title, backup_rule)
+        return await self.api.put_request('/storage/' + str(storage), body)
+
+    async def modify_storage(
+        self, storage: str, size: int, title: str, backup_rule: dict | None = None
+    ) -> Storage:
+        """
+        Modify a Storage object. Returns an object based on the API's response.
+        """
+        res = await self._modify_storage(str(storage), size, title, backup_rule)
+        return Storage._from_api(res['storage'], self)
+
+    async def delete_storage(
+        self, uuid: str, backups: BackupDeletionPolicy = BackupDeletionPolicy.KEEP
+    ):
+        """
+        Destroy a Storage object, and possibly some or all of its backups.
+        """
+        return await self.api.delete_request(f'/storage/{uuid}?backups={backups.value}')
+
+    async def clone_storage(
+        self, storage: Storage | str, title: str, zone: str, tier=None
+    ) -> Storage:
+        """
+        Clones a Storage object. Returns an object based on the API's response.
+        """
+        body = StorageManager._clone_storage_body(title, zone, tier)
+        res = await self.api.post_request(f'/storage/{str(storage)}/clone', body)
+        return Storage._from_api(res['storage'], self)
+
+    async def cancel_clone_storage(self, storage):
+        """
+        Cancels a running cloning operation and deletes the incomplete copy.
+        """
+        return await self.api.post_request(f'/storage/{str(storage)}/cancel')
+
+    async def attach_storage(self, server, storage, storage_type, address):
+        """
+        Attach a Storage object to a Server. Return a list of the server's storages.
+        """
+        body = StorageManager._attach_storage_body(storage, storage_type, address)
+        url = f'/server/{server}/storage/attach'
+        res = await self.api.post_request(url, body)
+        return Storage._create_storage_objs(res['server']['storage_devices'], cloud_manager=self)
+
+    async def detach_storage(self, server, address):
+        """
+        Detach a Storage object to a Server. Return a list of the server's storages.
+        """
+        body = {'storage_device': {'address': address}}
+        url = f'/server/{server}/storage/detach'
+        res = await self.api.post_request(url, body)
+        return Storage._create_storage_objs(res['server']['storage_devices'], cloud_manager=self)
+
+    async def load_cd_rom(self, server, address):
+        """
+        Loads a storage as a CD-ROM in the CD-ROM device of a server.
+        """
+        body = {'storage_device': {'storage': address}}
+        url = f'/server/{server}/cdrom/load'
+        res = await self.api.post_request(url, body)
+        return Storage._create_storage_objs(res['server']['storage_devices'], cloud_manager=self)
+
+    async def eject_cd_rom(self, server):
+        """
+        Ejects the storage from the CD-ROM device of a server.
+        """
+        url = f'/server/{server}/cdrom/eject'
+        res = await self.api.post_request(url)
+        return Storage._create_storage_objs(res['server']['storage_devices'], cloud_manager=self)
+
+    async def create_storage_backup(self, storage: str, title: str) -> Storage:
+        """
+        Creates a point-in-time backup of a storage resource.
+        """
+        url = f'/storage/{storage}/backup'
+        body = {'storage': {'title': title}}
+        res = await self.api.post_request(url, body)
+        return Storage._from_api(res['storage'], self)
+
+    async def restore_storage_backup(self, storage):
+        """
+        Restores the origin storage with data from the specified backup storage.
+        """
+        url = f'/storage/{storage}/restore'
+        return await self.api.post_request(url)
+
+    async def templatize_storage(self, storage: str, title: str) -> Storage:
+        """
+        Creates an exact copy of an existing storage resource which can be used as a template for creating new servers.
+        """
+        url = f'/storage/{storage}/templatize'
+        body = {'storage': {'title': title}}
+        res = await self.api.post_request(url, body)
+        return Storage._from_api(res['storage'], self)
+
+    async def create_storage_import(
+        self, storage: str, source: str, source_location=None
+    ) -> StorageImport:
+        """
+        Creates an import task to import data into an existing storage.
+        Source types: http_import or direct_upload.
+        """
+        body = StorageManager._storage_import_body(source, source_location)
+        url = f'/storage/{storage}/import'
+        res = await self.api.post_request(url, body)
+        return StorageImport(**res['storage_import'])
+
+    async def upload_file_for_storage_import(
+        self,
+        storage_import: StorageImport,
+        file: str | PathLike | BinaryIO,
+        timeout: int = 30,
+        content_type: str = 'application/octet-stream',
+    ):
+        """
+        Uploads a file directly to UpCloud's uploader session.
+
+        The file is read in a worker thread one chunk at a time and sent through the pooled
+        client, so the event loop is not blocked.
+        """
+        f = file
+        needs_closing = False
+        if not hasattr(file, 'read'):
+            f = await asyncio.to_thread(open, file, 'rb')
+            needs_closing = True
+
+        async def _chunks():
+            while chunk := await asyncio.to_thread(f.read, UPLOAD_READ_SIZE):
+                yield chunk
+
+        headers = {'Content-type': content_type}
+        try:
+            # sent with a length like the sync upload when the file size is known
+            headers['Content-Length'] = str(os.fstat(f.fileno()).st_size - f.tell())
+        except (AttributeError, OSError, ValueError):
+            pass
+
+        try:
+            resp = await self.api.client.put(
+                storage_import.direct_upload_url,
+                content=_chunks(),
+                headers=headers,
+                timeout=timeout,
+            )
+
+            resp.raise_for_status()
+            return resp.json()
+        finally:
+            if needs_closing:
+                f.close()
+
+    async def get_storage_import_details(self, storage: str) -> StorageImport:
+        """
+        Returns detailed information of an ongoing or finished import task.
+
+        A cached response is revalidated, as the progress is polled.
+        """
+        url = f'/storage/{storage}/import'
+        res = await self.api.get_request(url, no_cache=True)
+        return StorageImport(**res['storage_import'])
+
+    async def wait_for_storage_import(
+        self, storage: str, poller: Poller | None = None
+    ) -> StorageImport:
+        """
+        Wait until an import task is completed, failed or cancelled. Returns the final details.
+        """
+        details = await self.get_storage_import_details(storage)
+
+        async def _refresh():
+            nonlocal details
+            details = await self.get_storage_import_details(storage)
+
+        await (poller or Poller()).async_wait(
+            lambda: details.state in STORAGE_IMPORT_FINAL_STATES, _refresh
+        )
+        return details
+
+    async def cancel_storage_import(self, storage: str) -> StorageImport:
+        """
+        Cancels an ongoing import task.
+        """
+        url = f'/storage/{storage}/import/cancel'
+        res = await self.api.post_request(url)
+        return StorageImport(**res['storage_import'])
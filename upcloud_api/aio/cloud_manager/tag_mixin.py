@@ -0,0 +1,76 @@
+from upcloud_api.aio.api import AsyncAPI
+from upcloud_api.cloud_manager.tag_mixin import TagManager
+from upcloud_api.tag import Tag
+
+
+class AsyncTagManager:
+    """
+    Async functions for managing Tags.
+
+    Intended to be used as a mixin for AsyncCloudManager.
+    Mirrors upcloud_api.cloud_manager.tag_mixin.TagManager.
+    """
+
+    api: AsyncAPI
+
+    async def get_tags(self):
+        """List all tags as Tag objects."""
+        res = await self.api.get_request('/tag')
+        return [Tag(cloud_manager=self, **tag) for tag in res['tags']['tag']]
+
+    async def get_tag(self, name: str) -> Tag:
+        """Return the tag as Tag object."""
+        res = await self.api.get_request('/tag/' + name)
+        return Tag(cloud_manager=self, **res['tag'])
+
+    async def create_tag(
+        self, name: str, description: str | None = None, servers: list | None = None
+    ) -> Tag:
+        """
+        Create a new Tag. Only name is mandatory.
+
+        Returns the created Tag object.
+        """
+        body = TagManager._create_tag_body(name, description, servers)
+        res = await self.api.post_request('/tag', body)
+
+        return Tag(cloud_manager=self, **res['tag'])
+
+    async def _modify_tag(self, name, description, servers, new_name):
+        """
+        PUT /tag/name. Returns a dict that can be used to create a Tag object.
+        """
+        body = {'tag': Tag(new_name, description, servers).to_dict()}
+        res = await self.api.put_request('/tag/' + name, body)
+        return res['tag']
+
+    async def modify_tag(self, name, description=None, servers=None, new_name=None):
+        """
+        PUT /tag/name. Returns a new Tag object based on the API response.
+        """
+        res = await self._modify_tag(name, description, servers, new_name)
+        return Tag(cloud_manager=self, **res)
+
+    async def assign_tags(self, server, tags):
+        """
+        Assign tags to a server.
+
+        - server: Server object or UUID string
+        - tags: list of Tag objects or strings
+        """
+        url = TagManager._server_tags_endpoint(server, tags, 'tag')
+        return await self.api.post_request(url)
+
+    async def remove_tags(self, server, tags):
+        """
+        Remove tags from a server.
+
+        - server: Server object or UUID string
+        - tags: list of Tag objects or strings
+        """
+        url = TagManager._server_tags_endpoint(server, tags, 'untag')
+        return await self.api.post_request(url)
+
+    async def delete_tag(self, tag):
+        """Delete the Tag. Returns and empty object."""
+        return await self.api.delete_request('/tag/' + str(tag))
@@ -0,0 +1,265 @@
+from typing import TYPE_CHECKING
+
+from upcloud_api.aio.utils import try_it_n_times
+from upcloud_api.firewall import FirewallRule
+from upcloud_api.ip_address import IPAddress
+from upcloud_api.polling import Poller
+from upcloud_api.server import Server
+from upcloud_api.storage import Storage
+
+if TYPE_CHECKING:
+    from upcloud_api.aio import AsyncCloudManager
+
+
+class AsyncServer(Server):
+    """
+    Class representation of UpCloud Server instance for use with AsyncCloudManager.
+
+    Every method that talks to the API is a coroutine; local helpers such as
+    prepare_post_body, to_dict and get_ip are inherited from Server as is.
+    """
+
+    cloud_manager: 'AsyncCloudManager'
+
+    async def populate(self) -> 'AsyncServer':
+        """
+        Sync changes from the API to the local object.
+
+        Note: syncs ip_addresses and storage_devices too (/server/uuid endpoint)
+        """
+        data = await self.cloud_manager.api.get_request(f'/server/{self.uuid}')
+        self._reset(data['server'], cloud_manager=self.cloud_manager, populated=True)
+        return self
+
+    async def save(self) -> None:
+        """
+        Sync local changes in server's attributes to the API. See Server.save.
+        """
+        kwargs = self._changed_kwargs()
+        if not kwargs:
+            return
+
+        await self.cloud_manager._modify_server(self.uuid, **kwargs)
+        self._reset(kwargs)
+
+    async def destroy(self, delete_storages=False):
+        """
+        Destroy the server.
+        """
+        await self.cloud_manager.delete_server(self.uuid, delete_storages=delete_storages)
+
+    async def shutdown(self, hard: bool = False, timeout: int = 30) -> None:
+        """
+        Shutdown/stop the server. See Server.shutdown.
+        """
+        body = dict()
+        body['stop_server'] = {'stop_type': 'hard' if hard else 'soft', 'timeout': f'{timeout}'}
+
+        path = f'/server/{self.uuid}/stop'
+        await self.cloud_manager.api.post_request(path, body)
+        object.__setattr__(self, 'state', 'maintenance')
+
+    async def stop(self) -> None:
+        """
+        Alias for shutdown.
+        """
+        await self.shutdown()
+
+    async def start(self, timeout: int = 120) -> None:
+        """
+        Start the server. See Server.start.
+        """
+        path = f'/server/{self.uuid}/start'
+        await self.cloud_manager.api.post_request(path, timeout=timeout)
+        object.__setattr__(self, 'state', 'started')
+
+    async def restart(self, hard: bool = False, timeout: int = 30, force: bool = True) -> None:
+        """
+        Restart the server. See Server.restart.
+        """
+        body = dict()
+        body['restart_server'] = {
+            'stop_type': 'hard' if hard else 'soft',
+            'timeout': f'{timeout}',
+            'timeout_action': 'destroy' if force else 'ignore',
+        }
+
+        path = f'/server/{self.uuid}/restart'
+        await self.cloud_manager.api.post_request(path, body)
+        object.__setattr__(self, 'state', 'maintenance')
+
+    async def add_ip(self, family: str = 'IPv4') -> IPAddress:
+        """
+        Allocate a new (random) IP-address to the Server.
+        """
+        IP = await self.cloud_manager.attach_ip(self.uuid, family)
+        self.ip_addresses.append(IP)
+        return IP
+
+    async def remove_ip(self, ip_address: IPAddress) -> None:
+        """
+        Release the specified IP-address from the server.
+        """
+        await self.cloud_manager.release_ip(ip_address.address)
+        self.ip_addresses.remove(ip_address)
+
+    async def add_storage(
+        self,
+        storage: Storage | None = None,
+        type: str = 'disk',
+        address=None,
+    ) -> None:
+        """
+        Attach the given storage to the Server.
+
+        Default address is next available.
+        """
+        await self.cloud_manager.attach_storage(
+            server=self.uuid, storage=storage.uuid, storage_type=type, address=address
+        )
+        storage.address = address
+        storage.type = type
+        self.storage_devices.append(storage)
+
+    async def remove_storage(self, storage: Storage) -> None:
+        """
+        Remove Storage from a Server. See Server.remove_storage.
+        """
+        if not hasattr(storage, 'address'):
+            raise Exception(
+                'Storage does not have an address. '
+                'Access the Storage via Server.storage_devices '
+                'so they include an address. '
+                '(This is due how the API handles Storages)'
+            )
+
+        await self.cloud_manager.detach_storage(server=self.uuid, address=storage.address)
+        self.storage_devices.remove(storage)
+
+    async def add_firewall_rule(self, firewall_rule: FirewallRule) -> FirewallRule:
+        """
+        Add the specified FirewallRule to this server.
+        """
+        return await self.cloud_manager.create_firewall_rule(self, firewall_rule.to_dict())
+
+    async def remove_firewall_rule(self, firewall_rule):
+        """
+        Remove a firewall rule.
+        """
+        return await firewall_rule.destroy()
+
+    async def get_firewall_rules(self):
+        """
+        Return all FirewallRule instances that are associated with this server instance.
+        """
+        return await self.cloud_manager.get_firewall_rules(self)
+
+    async def add_tags(self, tags):
+        """
+        Add tags to a server. Accepts tags as strings or Tag objects.
+        """
+        if await self.cloud_manager.assign_tags(self.uuid, tags):
+            tags = self.tags + [str(tag) for tag in tags]
+            object.__setattr__(self, 'tags', tags)
+
+    async def remove_tags(self, tags):
+        """
+        Remove tags from a server. Accepts tags as strings or Tag objects.
+        """
+        if await self.cloud_manager.remove_tags(self, tags):
+            new_tags = [tag for tag in self.tags if tag not in tags]
+            object.__setattr__(self, 'tags', new_tags)
+
+    async def configure_firewall(self, FirewallRules):
+        """
+        Helper function for automatically adding several FirewallRules in series.
+        """
+        firewall_rule_bodies = [FirewallRule.to_dict() for FirewallRule in FirewallRules]
+        return await self.cloud_manager.configure_firewall(self, firewall_rule_bodies)
+
+    async def sync_firewall(self, FirewallRules, replace=True):
+        """
+        Make the server's firewall rules equal FirewallRules with as few requests as possible.
+
+        See: AsyncCloudManager.sync_firewall
+        """
+        return await self.cloud_manager.sync_firewall(self, FirewallRules, replace=replace)
+
+    async def _refresh_state(self) -> None:
+        """
+        Update only the state field from the API without rebuilding the rest of the object.
+        """
+        object.__setattr__(self, 'state', await self.cloud_manager.get_server_state(self.uuid))
+
+    async def _wait_for_state_change(self, target_states, poller: Poller | None = None):
+        """
+        Wait until target_state reached without blocking the event loop (see: Poller).
+
+        Warning: state change must begin before calling this method.
+        """
+        poller = poller or Poller()
+        await poller.async_wait(lambda: self._is_in_state(target_states), self._refresh_state)
+
+    async def ensure_started(self, poller: Poller | None = None):
+        """
+        Start a server and wait until it is fully started.
+        """
+        # server is either starting or stopping (or error)
+        if self.state in ['maintenance', 'error']:
+            await self._wait_for_state_change(['stopped', 'started'], poller)
+
+        if self.state == 'stopped':
+            await self.start()
+            await self._wait_for_state_change(['started'], poller)
+
+        if self.state == 'started':
+            return True
+        else:
+            # something went wrong, fail explicitly
+            raise Exception('unknown server state: ' + self.state)
+
+    async def stop_and_destroy(self, sync=True, poller: Poller | None = None):
+        """
+        Destroy a server and its storages. Stops the server before destroying.
+
+        Syncs the server state from the API, use sync=False to disable.
+        """
+
+        async def _self_destruct():
+            """destroy the server and all storages attached to it."""
+            await try_it_n_times(
+                operation=self.destroy,
+                expected_error_codes=['SERVER_STATE_ILLEGAL'],
+                custom_error='destroying server failed',
+            )
+
+            # storages may be deleted instantly after server DELETE
+            for storage in self.storage_devices:
+                await try_it_n_times(
+                    operation=lambda storage=storage: self.cloud_manager.delete_storage(
+                        storage.uuid
+                    ),
+                    expected_error_codes=['STORAGE_STATE_ILLEGAL'],
+                    custom_error='destroying storage failed',
+                )
+
+        if sync:
+            await self.populate()
+
+        # server is either starting or stopping (or error)
+        if self.state in ['maintenance', 'error']:
+            await self._wait_for_state_change(['stopped', 'started'], poller)
+
+        if self.state == 'started':
+            await try_it_n_times(
+                operation=self.stop,
+                expected_error_codes=['SERVER_STATE_ILLEGAL'],
+                custom_error='stopping server failed',
+            )
+
+            await self._wait_for_state_change(['stopped'], poller)
+
+        if self.state == 'stopped':
+            await _self_destruct()
+        else:
+            raise Exception('unknown server state: ' + self.state)
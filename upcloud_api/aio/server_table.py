@@ -0,0 +1,35 @@
+from upcloud_api.aio.server import AsyncServer
+from upcloud_api.aio.utils import run_concurrently
+from upcloud_api.server_table import ServerTable
+from upcloud_api.utils import BulkResult
+
+
+class AsyncServerTable(ServerTable):
+    """
+    ServerTable of AsyncServers, as returned by AsyncCloudManager.get_server_table.
+
+    Filtering, grouping and servers() work as in ServerTable; the servers are populated
+    with `await table.populate_servers()`.
+    """
+
+    def __init__(self, servers=(), cloud_manager=None, server_class=AsyncServer) -> None:
+        """
+        Initialize a table from an iterable of server dicts as returned by the API.
+        """
+        super().__init__(servers, cloud_manager, server_class)
+
+    async def populate_servers(self, max_concurrency: int = 50) -> BulkResult:
+        """
+        Return populated AsyncServer instances for the rows.
+
+        At most `max_concurrency` server details are fetched at a time. Failures are
+        collected in `.errors` of the returned BulkResult as in get_servers.
+        """
+        server_list = self._instances()
+        results = await run_concurrently(
+            lambda server_instance: server_instance.populate(), server_list, max_concurrency
+        )
+        for server_instance, (_, error) in zip(server_list, results, strict=True):
+            if error is not None:
+                server_list.errors[server_instance] = error
+        return server_list
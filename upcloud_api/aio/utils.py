@@ -0,0 +1,42 @@
+import asyncio
+import itertools
+
+from upcloud_api.errors import UpCloudAPIError, UpCloudClientError
+
+
+async def try_it_n_times(operation, expected_error_codes, custom_error='operation failed', n=10):
+    """
+    Try a given awaitable operation (API call) n times.
+
+    Async counterpart of upcloud_api.utils.try_it_n_times.
+    Waits 3 seconds between each attempt without blocking the event loop.
+    """
+    for i in itertools.count():
+        try:
+            await operation()
+            break
+        except UpCloudAPIError as e:
+            if e.error_code not in expected_error_codes:
+                raise e
+            await asyncio.sleep(3)
+        if i >= n - 1:
+            raise UpCloudClientError(custom_error)
+
+
+async def run_concurrently(operation, items, max_concurrency: int = 50) -> list:
+    """
+    Await operation(item) for every item with at most max_concurrency running at a time.
+
+    Async counterpart of upcloud_api.utils.run_in_parallel: returns a list of
+    (result, exception) tuples in the same order as items.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _run(item):
+        async with semaphore:
+            return await operation(item)
+
+    results = await asyncio.gather(*[_run(item) for item in items], return_exceptions=True)
+    return [
+        (None, result) if isinstance(result, Exception) else (result, None) for result in results
+    ]
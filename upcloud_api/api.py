@@ -1,9 +1,17 @@
+import contextlib
+import contextvars
+import itertools
 import json
+import threading
+import time
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from upcloud_api import __version__
+from upcloud_api.codec import get_codec
 from upcloud_api.errors import UpCloudAPIError
+from upcloud_api.retry import parse_retry_after
 
 
 class API:
@@ -14,49 +22,301 @@ class API:
     api_root = 'https://api.upcloud.com/1.3'
     user_agent = f'upcloud-python-api/{__version__}'
 
-    def __init__(self, token, timeout=None):
+    # errors raised by the HTTP client for failed requests, and those raised before sending
+    transport_errors = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    connect_errors = (requests.exceptions.ConnectTimeout,)
+
+    def __init__(
+        self,
+        token,
+        timeout=None,
+        pool_size=10,
+        pool_block=False,
+        keep_alive=True,
+        pool_idle_timeout=None,
+        cache=None,
+        retry_policy=None,
+        rate_limiter=None,
+        json_codec=None,
+    ):
         """
         Initialize the API with a given Authorization token and default timeout.
+
+        Requests are sent through a long-lived `requests.Session` so that TCP and TLS
+        connections are reused between calls:
+        - pool_size: maximum number of pooled connections kept open per host
+        - pool_block: block (instead of opening a throwaway connection) when the pool is exhausted
+        - keep_alive: set to False to close the connection after each request
+        - pool_idle_timeout: drop all pooled connections after this many seconds without requests
+
+        GET responses are cached when a ResponseCache is given as `cache` (see: ResponseCache).
+        Failed requests are retried according to `retry_policy` (see: RetryPolicy).
+        Requests are paced by `rate_limiter` (see: RateLimiter).
+        Bodies are encoded and decoded with `json_codec`, a JSONCodec or the name of one;
+        by default the fastest installed JSON library is used (see: get_codec).
         """
         self.token = token
         self.timeout = timeout
+        self.pool_size = pool_size
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.pool_idle_timeout = pool_idle_timeout
+        self.cache = cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.json_codec = get_codec(json_codec)
+
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._in_flight = 0
+        self._last_used = time.monotonic()
+        self._paced_by = contextvars.ContextVar(f'paced_by_{id(self)}', default=None)
 
-    def api_request(self, method, endpoint, body=None, params=None, timeout=-1):
+    def _create_session(self):
         """
-        Perform a request with a given JSON body to a given endpoint in UpCloud's API.
+        Create a session with a connection pool mounted for HTTP and HTTPS.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            pool_block=self.pool_block,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _acquire_session(self):
+        """
+        Return the pooled session, replacing it first if it has been idle for too long.
+        """
+        with self._session_lock:
+            now = time.monotonic()
+            if (
+                self._session is not None
+                and self.pool_idle_timeout is not None
+                and self._in_flight == 0
+                and now - self._last_used > self.pool_idle_timeout
+            ):
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                self._session = self._create_session()
+
+            self._in_flight += 1
+            self._last_used = now
+            return self._session
+
+    def _release_session(self):
+        with self._session_lock:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+    @property
+    def session(self):
+        """
+        The pooled `requests.Session` used for API calls. Created on first use.
+        """
+        with self._session_lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
 
-        Handles errors with __error_middleware.
+    def close(self):
+        """
+        Close all pooled connections. The pool is recreated on the next request.
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _prepare_request(self, method, endpoint, body=None, timeout=-1):
+        """
+        Validate the method and build the url, encoded body, headers and timeout of a request.
         """
         if method not in {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}:
             raise Exception('Invalid/Forbidden HTTP method')
 
         url = f'{self.api_root}{endpoint}'
         headers = {'Authorization': self.token, 'User-Agent': self.user_agent}
+        if not self.keep_alive:
+            headers['Connection'] = 'close'
 
         if body:
-            data = json.dumps(body)
+            data = self.json_codec.dumps(body)
             headers['Content-Type'] = 'application/json'
         else:
             data = None
 
         call_timeout = timeout if timeout != -1 else self.timeout
 
-        res = requests.request(
-            method=method, url=url, data=data, params=params, headers=headers, timeout=call_timeout
-        )
+        return url, data, headers, call_timeout
+
+    def _cache_key(self, method, endpoint, params=None):
+        """
+        Return the cache key of a cacheable request, or None if it is not cached.
+        """
+        if self.cache is None or method != 'GET' or self.cache.ttl_for(endpoint) is None:
+            return None
+        return self.cache.key(endpoint, params)
 
-        if res.text:
-            res_json = res.json()
+    def _update_cache(self, method, endpoint, cache_key, res, res_json):
+        """
+        Store a successful GET response, or invalidate what a successful write changed.
+        """
+        if self.cache is None:
+            return
+
+        if cache_key is not None:
+            self.cache.set(
+                cache_key,
+                res_json,
+                self.cache.ttl_for(endpoint),
+                etag=res.headers.get('ETag'),
+                last_modified=res.headers.get('Last-Modified'),
+            )
+        elif method != 'GET':
+            self.cache.invalidate_write(method, endpoint)
+
+    @contextlib.contextmanager
+    def paced_by(self, rate_limiter):
+        """
+        Pace the requests sent inside the block by rate_limiter too.
+
+        The limiter applies in addition to `self.rate_limiter`, and only to the calling
+        thread or asyncio task, so that e.g. a rollout can be limited without slowing down
+        other callers.
+        """
+        token = self._paced_by.set(rate_limiter)
+        try:
+            yield
+        finally:
+            self._paced_by.reset(token)
+
+    def _rate_limiters(self):
+        return [
+            rate_limiter
+            for rate_limiter in (self.rate_limiter, self._paced_by.get())
+            if rate_limiter is not None
+        ]
+
+    def _send(self, method, url, data, params, headers, timeout, stream=False):
+        """
+        Send a request through the pooled session, waiting for the rate limiters first.
+        """
+        for rate_limiter in self._rate_limiters():
+            rate_limiter.acquire(method)
+
+        session = self._acquire_session()
+        try:
+            return session.request(
+                method=method,
+                url=url,
+                data=data,
+                params=params,
+                headers=headers,
+                timeout=timeout,
+                stream=stream,
+            )
+        finally:
+            self._release_session()
+
+    def api_request(self, method, endpoint, body=None, params=None, timeout=-1, no_cache=False):
+        """
+        Perform a request with a given JSON body to a given endpoint in UpCloud's API.
+
+        Cached GET responses are returned without a request while fresh, and revalidated with
+        a conditional request once expired (see: ResponseCache). With no_cache=True a cached
+        response is always revalidated first, e.g. when polling for a state change. Failed
+        requests are retried if a retry policy is set (see: RetryPolicy).
+
+        Handles errors with _error_middleware.
+        """
+        url, data, headers, call_timeout = self._prepare_request(method, endpoint, body, timeout)
+
+        cache_key = self._cache_key(method, endpoint, params)
+        if cache_key is not None and not no_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        policy = self.retry_policy
+        if policy is None:
+            return self._request(method, endpoint, url, data, params, headers, call_timeout)
+
+        deadline_at = policy.deadline_at()
+        for attempt in itertools.count(1):
+            try:
+                attempt_timeout = policy.attempt_timeout(call_timeout, deadline_at)
+                return self._request(method, endpoint, url, data, params, headers, attempt_timeout)
+            except (UpCloudAPIError, *self.transport_errors) as e:
+                sent = not isinstance(e, self.connect_errors)
+                delay = policy.next_delay(method, e, attempt, deadline_at, sent)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    def _request(self, method, endpoint, url, data, params, headers, timeout):
+        """
+        Send a single attempt of a request and return its parsed JSON body.
+        """
+        cache_key = self._cache_key(method, endpoint, params)
+        if cache_key is not None:
+            conditional_headers = {**headers, **self.cache.validators(cache_key)}
         else:
+            conditional_headers = headers
+
+        res = self._send(method, url, data, params, conditional_headers, timeout)
+
+        if res.status_code == 304 and cache_key is not None:
+            cached = self.cache.revalidate(cache_key, self.cache.ttl_for(endpoint))
+            if cached is not None:
+                return cached
+            # evicted while the request was in flight
+            res = self._send(method, url, data, params, headers, timeout)
+
+        res_json = self._parse(res, res.content)
+        self._update_cache(method, endpoint, cache_key, res, res_json)
+        return res_json
+
+    def _parse(self, res, content):
+        """
+        Decode the raw JSON body of a response and raise for HTTP error status codes.
+        """
+        try:
+            res_json = self.json_codec.loads(content) if content else {}
+        except ValueError:
+            # e.g. an HTML error page from a proxy in front of the API
+            if res.status_code < 400:
+                raise
             res_json = {}
 
-        return self.__error_middleware(res, res_json)
+        return self._error_middleware(res, res_json)
 
-    def get_request(self, endpoint, params=None, timeout=-1):
+    def get_request(self, endpoint, params=None, timeout=-1, no_cache=False):
         """
         Perform a GET request to a given endpoint in UpCloud's API.
+
+        Pass no_cache=True to revalidate a cached response instead of reusing it.
+        """
+        return self.api_request('GET', endpoint, params=params, timeout=timeout, no_cache=no_cache)
+
+    def get_stream(self, endpoint, params=None, timeout=-1, chunk_size=65536):
         """
-        return self.api_request('GET', endpoint, params=params, timeout=timeout)
+        Perform a GET request to a given endpoint and yield the raw response body in chunks.
+
+        The body is not cached and the request is not retried. Error responses raise
+        UpCloudAPIError before anything is yielded.
+        """
+        url, _, headers, call_timeout = self._prepare_request('GET', endpoint, timeout=timeout)
+
+        res = self._send('GET', url, None, params, headers, call_timeout, stream=True)
+        with res:
+            if res.status_code >= 400:
+                self._parse(res, res.content)
+            yield from res.iter_content(chunk_size)
 
     def post_request(self, endpoint, body=None, timeout=-1):
         """
@@ -82,7 +342,7 @@ class API:
         """
         return self.api_request('DELETE', endpoint, timeout=timeout)
 
-    def __error_middleware(self, res, res_json):
+    def _error_middleware(self, res, res_json):
         """
         Middleware that raises an exception when HTTP statuscode is an error code.
         """
@@ -91,11 +351,16 @@ class API:
                 raise UpCloudAPIError(
                     error_code=res_json.get('title'),
                     error_message=f'Details: {json.dumps(res_json)}',
+                    status_code=res.status_code,
+                    retry_after=parse_retry_after(res.headers.get('Retry-After')),
                 )
 
             err_dict = res_json.get('error', {})
             raise UpCloudAPIError(
-                error_code=err_dict.get('error_code'), error_message=err_dict.get('error_message')
+                error_code=err_dict.get('error_code'),
+                error_message=err_dict.get('error_message'),
+                status_code=res.status_code,
+                retry_after=parse_retry_after(res.headers.get('Retry-After')),
             )
 
         return res_json
@@ -0,0 +1,247 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Catalog endpoints whose data changes rarely are cached by default (TTL in seconds).
+DEFAULT_CACHE_TTLS = {
+    '/zone': 3600,
+    '/timezone': 3600,
+    '/price': 3600,
+    '/server_size': 3600,
+    '/plan': 3600,
+    '/storage/template': 300,
+}
+
+# Writes that change resources besides the one in their path, as a pattern of the request
+# ('METHOD /path', without the query string) and the resources they change as well.
+RELATED_RESOURCES = (
+    ('POST /server', ('/storage', '/ip_address', '/network', '/server-group', '/tag')),
+    ('DELETE /server/[^/]+', ('/storage', '/ip_address', '/network', '/server-group', '/tag')),
+    (r'\w+ /server/[^/]+/(storage|cdrom)/.*', ('/storage',)),
+    (r'\w+ /server/[^/]+/(tag|untag)/.*', ('/tag',)),
+    (r'\w+ /server/[^/]+/networking(/.*)?', ('/network', '/ip_address')),
+    (r'\w+ /ip_address(/.*)?', ('/server',)),
+    (r'\w+ /tag(/.*)?', ('/server',)),
+    (r'\w+ /server-group(/.*)?', ('/server',)),
+    (r'\w+ /network(/.*)?', ('/router', '/server')),
+    (r'\w+ /router(/.*)?', ('/network',)),
+)
+_RELATED_RESOURCES = [(re.compile(pattern), resources) for pattern, resources in RELATED_RESOURCES]
+
+
+def _copy_json(value):
+    """
+    Copy a parsed JSON document; faster than copy.deepcopy for plain dicts and lists.
+    """
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
+class CacheEntry:
+    """
+    A cached response body, the time (time.monotonic) it expires at and its validators.
+    """
+
+    __slots__ = ('value', 'expires', 'etag', 'last_modified')
+
+    def __init__(
+        self, value, expires: float, etag: str | None = None, last_modified: str | None = None
+    ) -> None:
+        """
+        Initialize an entry that expires at the given time.
+        """
+        self.value = value
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def is_fresh(self) -> bool:
+        """
+        True until the entry expires.
+        """
+        return time.monotonic() < self.expires
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache for parsed GET responses with per-endpoint TTLs.
+
+    - ttls: dict of endpoint: TTL in seconds, merged over DEFAULT_CACHE_TTLS. Keys are exact
+      endpoints ('/server') or prefixes ending in '*' ('/server/*'). Mutable resources are
+      only cached when added here; set a TTL to None to disable caching of an endpoint.
+      A TTL of 0 revalidates the body on every request (see below).
+      A successful write drops the cached bodies of the resource it touched and of the
+      related resources in RELATED_RESOURCES (see: invalidate_write). Other side effects,
+      and changes made outside this cache (other clients, the control panel, long-running
+      operations finishing), are only seen once the TTL expires.
+    - max_entries: least recently used entries are evicted beyond this size
+
+    Expired bodies that came with an ETag or Last-Modified header are kept and revalidated
+    with a conditional request; a 304 Not Modified response reuses the cached body.
+
+    Cached bodies are copied on the way in and out, so callers may modify what they get.
+    Hit, miss and revalidation counts are available in `hits`, `misses`, `revalidated`
+    and `stats`.
+    """
+
+    def __init__(self, ttls: dict | None = None, max_entries: int = 256) -> None:
+        """
+        Initialize an empty cache. See the class docstring for the parameters.
+        """
+        self.ttls = dict(DEFAULT_CACHE_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttl_for(self, endpoint: str) -> float | None:
+        """
+        Return the TTL for an endpoint, or None if it should not be cached.
+        """
+        endpoint = endpoint.split('?', 1)[0]
+        if endpoint in self.ttls:
+            return self.ttls[endpoint]
+
+        matches = [
+            pattern
+            for pattern in self.ttls
+            if pattern.endswith('*') and endpoint.startswith(pattern[:-1])
+        ]
+        if not matches:
+            return None
+        return self.ttls[max(matches, key=len)]
+
+    @staticmethod
+    def key(endpoint: str, params: dict | None = None) -> str:
+        """
+        Return the cache key of a GET request.
+        """
+        if not params:
+            return endpoint
+        query = '&'.join(f'{name}={value}' for name, value in sorted(params.items()))
+        return f'{endpoint}?{query}'
+
+    def get(self, key: str):
+        """
+        Return a copy of a fresh cached body, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.is_fresh:
+                if entry is not None and not (entry.etag or entry.last_modified):
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry.value
+
+        return _copy_json(value)
+
+    def validators(self, key: str) -> dict:
+        """
+        Return conditional request headers for a cached body, or an empty dict.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return {}
+
+            headers = {}
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+            return headers
+
+    def revalidate(self, key: str, ttl: float):
+        """
+        Mark a cached body fresh for another ttl seconds after a 304 Not Modified response.
+
+        Returns a copy of the body, or None if it was evicted in the meantime.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            entry.expires = time.monotonic() + ttl
+            self._entries.move_to_end(key)
+            self.revalidated += 1
+            value = entry.value
+
+        return _copy_json(value)
+
+    def set(
+        self,
+        key: str,
+        value,
+        ttl: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """
+        Store a copy of a body for ttl seconds, with its validators if the response had any.
+        """
+        if not ttl and not (etag or last_modified):
+            return
+
+        entry = CacheEntry(_copy_json(value), time.monotonic() + ttl, etag, last_modified)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint: str | None = None) -> None:
+        """
+        Drop cached bodies of an endpoint and everything below it, or all of them.
+        """
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                return
+
+            for key in list(self._entries):
+                path = key.split('?', 1)[0]
+                if path == endpoint or path.startswith(endpoint.rstrip('/') + '/'):
+                    del self._entries[key]
+
+    def invalidate_write(self, method: str, endpoint: str) -> None:
+        """
+        Drop the cached bodies that a successful write to endpoint may have changed.
+
+        e.g. POST /server/{uuid}/stop drops /server and /server/{uuid}, and
+        DELETE /server/{uuid} drops /storage too, see RELATED_RESOURCES.
+        """
+        path = '/' + endpoint.split('?', 1)[0].strip('/')
+        self.invalidate('/' + path.strip('/').split('/', 1)[0])
+
+        request = f'{method} {path}'
+        for pattern, resources in _RELATED_RESOURCES:
+            if pattern.fullmatch(request):
+                for resource in resources:
+                    self.invalidate(resource)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Return hit, miss and revalidation counts and the current number of entries.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'size': len(self._entries),
+            }
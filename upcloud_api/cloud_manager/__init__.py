@@ -1,4 +1,5 @@
 from upcloud_api.api import API
+from upcloud_api.cache import ResponseCache
 from upcloud_api.cloud_manager.firewall_mixin import FirewallManager
 from upcloud_api.cloud_manager.host_mixin import HostManager
 from upcloud_api.cloud_manager.ip_address_mixin import IPManager
@@ -7,8 +8,13 @@ from upcloud_api.cloud_manager.network_mixin import NetworkManager
 from upcloud_api.cloud_manager.server_mixin import ServerManager
 from upcloud_api.cloud_manager.storage_mixin import StorageManager
 from upcloud_api.cloud_manager.tag_mixin import TagManager
+from upcloud_api.codec import JSONCodec
 from upcloud_api.credentials import Credentials
 from upcloud_api.errors import UpCloudClientError
+from upcloud_api.identity_map import IdentityMap
+from upcloud_api.rate_limit import RateLimiter
+from upcloud_api.retry import RetryPolicy
+from upcloud_api.server import Server
 
 
 class CloudManager(
@@ -29,14 +35,48 @@ class CloudManager(
 
     api: API
 
+    # class of the server objects built for this manager, e.g. by Tag
+    server_class = Server
+
     def __init__(
-        self, username: str = None, password: str = None, timeout: int = 60, token: str = None
+        self,
+        username: str = None,
+        password: str = None,
+        timeout: int = 60,
+        token: str = None,
+        pool_size: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        pool_idle_timeout: float | None = None,
+        cache: 'bool | ResponseCache' = False,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        json_codec: str | JSONCodec | None = None,
+        identity_map: 'bool | IdentityMap' = False,
     ) -> None:
         """
         Initiates CloudManager that handles all HTTP connections with UpCloud's API.
 
         Optionally determine a timeout for API connections (in seconds). A timeout with the value
         `None` means that there is no timeout.
+
+        Connections are pooled and kept alive between requests. The pool can be tuned with
+        `pool_size`, `pool_block`, `keep_alive` and `pool_idle_timeout` (see: API).
+
+        Pass `cache=True` to cache catalog responses (zones, prices, plans, ...) in memory, or a
+        ResponseCache to tune TTLs, size and which endpoints are cached (see: ResponseCache).
+
+        Failed requests (connection errors, 429 and 5xx responses) are retried with backoff
+        when a `retry_policy` is given (see: RetryPolicy).
+
+        Requests are paced client-side by a `rate_limiter`, which may be shared between
+        CloudManager instances (see: RateLimiter).
+
+        JSON is encoded and decoded with orjson or ujson when installed; pass `json_codec`
+        ('orjson', 'ujson', 'json' or a JSONCodec) to choose explicitly.
+
+        Pass `identity_map=True` to get the same Server and Storage object for the same UUID
+        from every call, updated in place with new API data (see: IdentityMap).
         """
         credentials = Credentials(username, password, token)
         if not credentials.is_defined:
@@ -47,7 +87,22 @@ class CloudManager(
         self.api = API(
             token=credentials.authorization,
             timeout=timeout,
+            pool_size=pool_size,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+            pool_idle_timeout=pool_idle_timeout,
+            cache=ResponseCache() if cache is True else cache or None,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            json_codec=json_codec,
         )
+        self.identity_map = IdentityMap() if identity_map is True else identity_map or None
+
+    def close(self):
+        """
+        Close all pooled HTTP connections.
+        """
+        self.api.close()
 
     def authenticate(self):
         """
@@ -1,6 +1,7 @@
 from upcloud_api.api import API
-from upcloud_api.firewall import FirewallRule
+from upcloud_api.firewall import FirewallRule, diff_firewall_rules
 from upcloud_api.server import Server
+from upcloud_api.utils import BulkResult, retry_with_backoff, run_in_parallel
 
 
 def uuid_and_instance(server):
@@ -20,6 +21,52 @@ class FirewallManager:
 
     api: API
 
+    @staticmethod
+    def _firewall_rules_from_api(res: dict, server_instance=None) -> list:
+        """
+        Return FirewallRule objects from a firewall_rules response.
+        """
+        return [
+            FirewallRule(server=server_instance, **firewall_rule)
+            for firewall_rule in res['firewall_rules']['firewall_rule']
+        ]
+
+    @staticmethod
+    def _replace_firewall_rules_body(firewall_rule_bodies) -> dict:
+        """
+        Return the body of PUT /server/uuid/firewall_rule, numbering the rules in order.
+        """
+        bodies = [
+            dict(body, position=str(position))
+            for position, body in enumerate(firewall_rule_bodies, start=1)
+        ]
+        return {'firewall_rules': {'firewall_rule': bodies}}
+
+    @staticmethod
+    def _firewall_rule_bodies(firewall_rules) -> list:
+        """
+        Return the rules (FirewallRule objects or dicts) as dicts.
+        """
+        return [
+            rule.to_dict() if isinstance(rule, FirewallRule) else rule for rule in firewall_rules
+        ]
+
+    @staticmethod
+    def _sync_firewall_edits(current_rules, firewall_rules):
+        """
+        Return the edits from current_rules to firewall_rules and the initial sync summary.
+        """
+        edits = diff_firewall_rules(current_rules, firewall_rules)
+        inserted = sum(1 for operation, _, _ in edits if operation == 'insert')
+        summary = {
+            'inserted': inserted,
+            'deleted': len(edits) - inserted,
+            'unchanged': len(firewall_rules) - inserted,
+            'replaced': False,
+            'requests': 0,
+        }
+        return edits, summary
+
     # TODO: server_instance is unused?
     def get_firewall_rule(self, server_uuid, firewall_rule_position, server_instance=None):
         """
@@ -37,11 +84,7 @@ class FirewallManager:
 
         url = f'/server/{server_uuid}/firewall_rule'
         res = self.api.get_request(url)
-
-        return [
-            FirewallRule(server=server_instance, **firewall_rule)
-            for firewall_rule in res['firewall_rules']['firewall_rule']
-        ]
+        return self._firewall_rules_from_api(res, server_instance)
 
     def create_firewall_rule(self, server, firewall_rule_body):
         """
@@ -72,3 +115,89 @@ class FirewallManager:
         server_uuid, server_instance = uuid_and_instance(server)
 
         return [self.create_firewall_rule(server_uuid, rule) for rule in firewall_rule_bodies]
+
+    def replace_firewall_rules(self, server, firewall_rule_bodies):
+        """
+        Replace all firewall rules of a server with firewall_rule_bodies in one request.
+
+        The rules are numbered in the given order. Returns the new FirewallRule objects.
+        """
+        server_uuid, server_instance = uuid_and_instance(server)
+
+        url = f'/server/{server_uuid}/firewall_rule'
+        body = self._replace_firewall_rules_body(firewall_rule_bodies)
+        res = self.api.put_request(url, body)
+        return self._firewall_rules_from_api(res, server_instance)
+
+    def sync_firewall(self, server, firewall_rules, current_rules=None, replace=True):
+        """
+        Make the firewall rules of a server equal firewall_rules with as few requests as possible.
+
+        The current rules are fetched once (or given as current_rules) and compared with the
+        desired ones position by position (see: diff_firewall_rules); matching rules are left
+        alone. A single missing or extra rule is inserted or deleted with one request and
+        larger changes replace the whole rule set with one request, or are applied as
+        individual inserts and deletes if replace=False.
+
+        Returns the numbers of 'inserted', 'deleted' and 'unchanged' rules, whether the rule
+        set was 'replaced' and how many 'requests' were made to change it.
+        """
+        server_uuid, _ = uuid_and_instance(server)
+        if current_rules is None:
+            current_rules = self.get_firewall_rules(server_uuid)
+
+        edits, summary = self._sync_firewall_edits(current_rules, firewall_rules)
+        if replace and len(edits) > 1:
+            bodies = self._firewall_rule_bodies(firewall_rules)
+            self.replace_firewall_rules(server_uuid, bodies)
+            summary.update(replaced=True, requests=1)
+            return summary
+
+        for operation, position, body in edits:
+            if operation == 'delete':
+                self.delete_firewall_rule(server_uuid, position)
+            else:
+                self.create_firewall_rule(server_uuid, body)
+        summary['requests'] = len(edits)
+        return summary
+
+    def apply_firewall_to_servers(
+        self,
+        servers,
+        firewall_rules,
+        max_parallel=8,
+        retries=5,
+        replace=True,
+        rate_limiter=None,
+    ) -> BulkResult:
+        """
+        Sync the firewall rules of many servers (Server objects or UUIDs) concurrently.
+
+        Each server is brought in line with firewall_rules by sync_firewall, with at most
+        max_parallel servers in progress at a time. max_parallel only bounds concurrency:
+        the rollout's requests are paced by `rate_limiter` (a RateLimiter, e.g.
+        RateLimiter(rate=5)) on top of the API's own rate_limiter, and by neither if both
+        are None. Transient errors (illegal state, rate limiting) are retried with
+        exponential backoff, up to `retries` attempts per server.
+
+        Returns a BulkResult of the sync_firewall summaries in the given order. Servers that
+        failed have None as their result and their exception in `.errors`. As sync_firewall
+        only changes what differs, a partial rollout is resumed by calling this again with
+        the failed servers (or the whole fleet; finished servers then cost one request each).
+        """
+        servers = list(servers)
+        bodies = self._firewall_rule_bodies(firewall_rules)
+
+        def _apply(server):
+            with self.api.paced_by(rate_limiter):
+                return retry_with_backoff(
+                    lambda: self.sync_firewall(server, bodies, replace=replace), n=retries
+                )
+
+        results = run_in_parallel(_apply, servers, max_workers=max_parallel)
+
+        applied = BulkResult(summary for summary, _ in results)
+        for server, (_, error) in zip(servers, results, strict=True):
+            if error is not None:
+                applied.errors[server] = error
+        return applied
@@ -1,5 +1,6 @@
 from upcloud_api.api import API
 from upcloud_api.ip_address import IPAddress
+from upcloud_api.streaming import iter_json_array
 
 
 class IPManager:
@@ -9,6 +10,16 @@ class IPManager:
 
     api: API
 
+    @staticmethod
+    def _floating_ip_body(zone: str, mac: str, family: str) -> dict:
+        """
+        Return the body of POST /ip_address for a floating IP.
+        """
+        body = {'ip_address': {'family': family, 'floating': 'yes', 'zone': zone}}
+        if mac:
+            body['ip_address']['mac'] = mac
+        return body
+
     def get_ip(self, address: str) -> IPAddress:
         """
         Get an IPAddress object with the IP address (string) from the API.
@@ -28,6 +39,19 @@ class IPManager:
         )
         return IPs
 
+    def iter_ips(self, ignore_ips_without_server=False):
+        """
+        Yield IPAddress objects from the API as they are received.
+
+        Like get_ips, but the response is streamed and parsed one address at a time.
+        """
+        chunks = self.api.get_stream('/ip_address')
+        path = ('ip_addresses', 'ip_address')
+        for ip_addr in iter_json_array(chunks, path, self.api.json_codec.loads):
+            if ignore_ips_without_server and not ip_addr.get('server'):
+                continue
+            yield IPAddress(cloud_manager=self, **ip_addr)
+
     def attach_ip(self, server: str, family: str = 'IPv4') -> IPAddress:
         """
         Attach a new (random) IPAddress to the given server (object or UUID).
@@ -61,9 +85,7 @@ class IPManager:
         Create a floating IP and returns an IPAddress object.
         Specify MAC address of network interface to attach the floating IP when it is created
         """
-        body = {'ip_address': {'family': family, 'floating': 'yes', 'zone': zone}}
-        if mac:
-            body['ip_address']['mac'] = mac
+        body = self._floating_ip_body(zone, mac, family)
 
         res = self.api.post_request('/ip_address', body)
         return IPAddress(cloud_manager=self, **res['ip_address'])
@@ -12,6 +12,130 @@ class NetworkManager:
 
     api: API
 
+    @staticmethod
+    def _network_from_api(data: dict) -> Network:
+        """
+        Return a Network with IpNetwork objects from the API's network dict.
+        """
+        network = Network(**data)
+        network.ip_networks = [IpNetwork(**n) for n in network.ip_networks.get('ip_network')]
+        return network
+
+    @staticmethod
+    def _set_ip_network_options(
+        body, dhcp_default_route, dhcp_dns, dhcp_bootfile_url, gateway
+    ) -> None:
+        """
+        Set the given (truthy) options of the ip_network in a network body.
+        """
+        ip_network = body['network']['ip_networks']['ip_network']
+        if dhcp_default_route:
+            ip_network['dhcp_default_route'] = dhcp_default_route
+        if dhcp_dns:
+            ip_network['dhcp_dns'] = dhcp_dns
+        if dhcp_bootfile_url:
+            ip_network['dhcp_bootfile_url'] = dhcp_bootfile_url
+        if gateway:
+            ip_network['gateway'] = gateway
+
+    @staticmethod
+    def _create_network_body(
+        name,
+        zone,
+        address,
+        dhcp,
+        family,
+        router=None,
+        dhcp_default_route=None,
+        dhcp_dns=None,
+        dhcp_bootfile_url=None,
+        gateway=None,
+    ) -> dict:
+        """
+        Return the body of POST /network.
+        """
+        body = {
+            'network': {
+                'name': name,
+                'zone': zone,
+                'ip_networks': {
+                    'ip_network': {'address': address, 'dhcp': dhcp, 'family': family}
+                },
+            }
+        }
+        if router:
+            body['network']['router'] = router
+        NetworkManager._set_ip_network_options(
+            body, dhcp_default_route, dhcp_dns, dhcp_bootfile_url, gateway
+        )
+        return body
+
+    @staticmethod
+    def _modify_network_body(
+        dhcp,
+        family,
+        name=None,
+        router=None,
+        dhcp_default_route=None,
+        dhcp_dns=None,
+        dhcp_bootfile_url=None,
+        gateway=None,
+    ) -> dict:
+        """
+        Return the body of PUT /network/uuid.
+        """
+        body = {'network': {'ip_networks': {'ip_network': {'family': family}}}}
+        if name:
+            body['network']['name'] = name
+        if dhcp:
+            body['network']['ip_networks']['ip_network']['dhcp'] = dhcp
+        if router:
+            body['network']['router'] = router
+        NetworkManager._set_ip_network_options(
+            body, dhcp_default_route, dhcp_dns, dhcp_bootfile_url, gateway
+        )
+        return body
+
+    @staticmethod
+    def _create_network_interface_body(
+        network, type, ip_addresses, index=None, source_ip_filtering=None, bootable=None
+    ) -> dict:
+        """
+        Return the body of POST /server/uuid/networking/interface.
+        """
+        body = {
+            'interface': {
+                'network': network,
+                'type': type,
+                'ip_addresses': {'ip_address': ip_addresses},
+            }
+        }
+        if index:
+            body['interface']['index'] = index
+        if source_ip_filtering:
+            body['interface']['source_ip_filtering'] = source_ip_filtering
+        if bootable:
+            body['interface']['bootable'] = bootable
+        return body
+
+    @staticmethod
+    def _modify_network_interface_body(
+        index_in_body=None, ip_addresses=None, source_ip_filtering=None, bootable=None
+    ) -> dict:
+        """
+        Return the body of PUT /server/uuid/networking/interface/index.
+        """
+        body = {'interface': {'ip_addresses': {'ip_address': None}}}
+        if index_in_body:
+            body['interface']['index'] = index_in_body
+        if ip_addresses:
+            body['interface']['ip_addresses']['ip_address'] = ip_addresses
+        if source_ip_filtering:
+            body['interface']['source_ip_filtering'] = source_ip_filtering
+        if bootable:
+            body['interface']['bootable'] = bootable
+        return body
+
     def get_networks(self, zone=None):
         """
         Get a list of all networks.
@@ -19,10 +143,7 @@ class NetworkManager:
         """
         url = f'/network/?zone={zone}' if zone else '/network'
         res = self.api.get_request(url)
-        networks = [Network(**network) for network in res['networks']['network']]
-        for network in networks:
-            network.ip_networks = [IpNetwork(**n) for n in network.ip_networks.get('ip_network')]
-        return networks
+        return [self._network_from_api(network) for network in res['networks']['network']]
 
     def get_network(self, uuid: str) -> Network:
         """
@@ -30,9 +151,7 @@ class NetworkManager:
         """
         url = f'/network/{uuid}'
         res = self.api.get_request(url)
-        network = Network(**res['network'])
-        network.ip_networks = [IpNetwork(**n) for n in network.ip_networks.get('ip_network')]
-        return network
+        return self._network_from_api(res['network'])
 
     def create_network(
         self,
@@ -51,30 +170,20 @@ class NetworkManager:
         Creates a new SDN private network that cloud servers from the same zone can be attached to.
         """
         url = '/network'
-        body = {
-            'network': {
-                'name': name,
-                'zone': zone,
-                'ip_networks': {
-                    'ip_network': {'address': address, 'dhcp': dhcp, 'family': family}
-                },
-            }
-        }
-        # TODO: fix duplication c.f. modify_network
-        if router:
-            body['network']['router'] = router
-        if dhcp_default_route:
-            body['network']['ip_networks']['ip_network']['dhcp_default_route'] = dhcp_default_route
-        if dhcp_dns:
-            body['network']['ip_networks']['ip_network']['dhcp_dns'] = dhcp_dns
-        if dhcp_bootfile_url:
-            body['network']['ip_networks']['ip_network']['dhcp_bootfile_url'] = dhcp_bootfile_url
-        if gateway:
-            body['network']['ip_networks']['ip_network']['gateway'] = gateway
+        body = self._create_network_body(
+            name,
+            zone,
+            address,
+            dhcp,
+            family,
+            router,
+            dhcp_default_route,
+            dhcp_dns,
+            dhcp_bootfile_url,
+            gateway,
+        )
         res = self.api.post_request(url, body)
-        network = Network(**res['network'])
-        network.ip_networks = [IpNetwork(**n) for n in network.ip_networks.get('ip_network')]
-        return network
+        return self._network_from_api(res['network'])
 
     def modify_network(
         self,
@@ -92,25 +201,18 @@ class NetworkManager:
         Modifies the details of a specific SDN private network. The Utility and public networks cannot be modified.
         """
         url = f'/network/{network}'
-        body = {'network': {'ip_networks': {'ip_network': {'family': family}}}}
-        if name:
-            body['network']['name'] = name
-        if dhcp:
-            body['network']['ip_networks']['ip_network']['dhcp'] = dhcp
-        if router:
-            body['network']['router'] = router
-        if dhcp_default_route:
-            body['network']['ip_networks']['ip_network']['dhcp_default_route'] = dhcp_default_route
-        if dhcp_dns:
-            body['network']['ip_networks']['ip_network']['dhcp_dns'] = dhcp_dns
-        if dhcp_bootfile_url:
-            body['network']['ip_networks']['ip_network']['dhcp_bootfile_url'] = dhcp_bootfile_url
-        if gateway:
-            body['network']['ip_networks']['ip_network']['gateway'] = gateway
+        body = self._modify_network_body(
+            dhcp,
+            family,
+            name,
+            router,
+            dhcp_default_route,
+            dhcp_dns,
+            dhcp_bootfile_url,
+            gateway,
+        )
         res = self.api.put_request(url, body)
-        network = Network(**res['network'])
-        network.ip_networks = [IpNetwork(**n) for n in network.ip_networks.get('ip_network')]
-        return network
+        return self._network_from_api(res['network'])
 
     def delete_network(self, network):
         """
@@ -144,19 +246,9 @@ class NetworkManager:
         Creates a new network interface on the specific cloud server and attaches the specified SDN private network to the new interface.
         """
         url = f'/server/{server}/networking/interface'
-        body = {
-            'interface': {
-                'network': network,
-                'type': type,
-                'ip_addresses': {'ip_address': ip_addresses},
-            }
-        }
-        if index:
-            body['interface']['index'] = index
-        if source_ip_filtering:
-            body['interface']['source_ip_filtering'] = source_ip_filtering
-        if bootable:
-            body['interface']['bootable'] = bootable
+        body = self._create_network_interface_body(
+            network, type, ip_addresses, index, source_ip_filtering, bootable
+        )
         res = self.api.post_request(url, body)
         return Interface(**res['interface'])
 
@@ -173,15 +265,9 @@ class NetworkManager:
         Modifies the network interface at the selected index on the specific cloud server.
         """
         url = f'/server/{server}/networking/interface/{str(index_in_path)}'
-        body = {'interface': {'ip_addresses': {'ip_address': None}}}
-        if index_in_body:
-            body['interface']['index'] = index_in_body
-        if ip_addresses:
-            body['interface']['ip_addresses']['ip_address'] = ip_addresses
-        if source_ip_filtering:
-            body['interface']['source_ip_filtering'] = source_ip_filtering
-        if bootable:
-            body['interface']['bootable'] = bootable
+        body = self._modify_network_interface_body(
+            index_in_body, ip_addresses, source_ip_filtering, bootable
+        )
         res = self.api.put_request(url, body)
         return Interface(**res['interface'])
 
@@ -1,8 +1,18 @@
+from typing import TYPE_CHECKING
+
 from upcloud_api.api import API
+from upcloud_api.errors import UpCloudClientError, UpCloudTimeoutError
 from upcloud_api.ip_address import IPAddress
+from upcloud_api.polling import Poller
 from upcloud_api.server import Server
 from upcloud_api.server_group import ServerGroup
+from upcloud_api.server_table import ServerTable
 from upcloud_api.storage import BackupDeletionPolicy, Storage
+from upcloud_api.streaming import iter_json_array
+from upcloud_api.utils import BulkResult, retry_with_backoff, run_in_parallel
+
+if TYPE_CHECKING:
+    from upcloud_api.inventory import Inventory
 
 
 class ServerManager:
@@ -12,20 +22,13 @@ class ServerManager:
 
     api: API
 
-    def get_servers(self, populate=False, tags_has_one=None, tags_has_all=None):
-        """
-        Return a list of (populated or unpopulated) Server instances.
+    # when set, tag-filtered get_servers and get_server_by_ip are answered from it
+    inventory: 'Inventory | None' = None
 
-        - populate = False (default) => 1 API request, returns unpopulated Server instances.
-        - populate = True => Does 1 + n API requests (n = # of servers),
-                             returns populated Server instances.
-
-        New in 0.3.0: the list can be filtered with tags:
-        - tags_has_one: list of Tag objects or strings
-          returns servers that have at least one of the given tags
-
-        - tags_has_all: list of Tag objects or strings
-          returns servers that have all of the tags
+    @staticmethod
+    def _servers_endpoint(tags_has_one=None, tags_has_all=None) -> str:
+        """
+        Return the endpoint listing all servers, or those matching the given tags.
         """
         if tags_has_all and tags_has_one:
             raise Exception('only one of (tags_has_all, tags_has_one) is allowed.')
@@ -41,38 +44,174 @@ class ServerManager:
             tag_list = ','.join(tags_has_one)
             request = f'/server/tag/{tag_list}'
 
-        servers = self.api.get_request(request)['servers']['server']
+        return request
+
+    @staticmethod
+    def _modify_server_body(**kwargs) -> dict:
+        """
+        Return the body of PUT /server/uuid; only Server.updateable_fields are accepted.
+        """
+        for arg in kwargs:
+            if arg not in Server.updateable_fields:
+                raise UpCloudClientError(f'{arg} is not an updateable field')
+        return {'server': dict(kwargs)}
+
+    @staticmethod
+    def _delete_server_endpoint(
+        uuid: str, delete_storages: bool, backups: BackupDeletionPolicy
+    ) -> str:
+        """
+        Return the endpoint of DELETE /server/uuid with the storage and backup options.
+        """
+        storages = '1' if delete_storages else '0'
+        return f'/server/{uuid}?storages={storages}&backups={backups.value}'
 
-        server_list = list()
-        for server in servers:
-            server_list.append(Server(server, cloud_manager=self))
+    @staticmethod
+    def _server_data_from_api(data: dict, cloud_manager):
+        """
+        Split a '/server/uuid' response into the server dict, IPAddresses and Storages.
+        """
+        server = data['server']
+
+        # Populate subobjects
+        IPAddresses = IPAddress._create_ip_address_objs(
+            server.pop('ip_addresses'), cloud_manager=cloud_manager
+        )
+
+        storages = Storage._create_storage_objs(
+            server.pop('storage_devices'), cloud_manager=cloud_manager
+        )
+
+        return server, IPAddresses, storages
+
+    @staticmethod
+    def _update_server_states(data: dict, pending: dict, failed: list, target_states) -> None:
+        """
+        Update the state of the pending servers (uuid: Server) from a '/server' list.
+
+        Servers that reached a target state are removed from pending; those that entered the
+        error state or no longer exist are moved to failed.
+        """
+        states = {server['uuid']: server['state'] for server in data['servers']['server']}
+        for uuid, server in list(pending.items()):
+            if uuid not in states:
+                # the server has been deleted
+                failed.append(pending.pop(uuid))
+                continue
+            object.__setattr__(server, 'state', states[uuid])
+            if server.state == 'error':
+                failed.append(pending.pop(uuid))
+            elif server.state in target_states:
+                del pending[uuid]
+
+    @staticmethod
+    def _modify_server_group_body(title=None, anti_affinity=None, servers=None) -> dict:
+        """
+        Return the body of PATCH /server-group/uuid with the given fields.
+        """
+        body = {}
+        if title is not None:
+            body['title'] = title
+        if anti_affinity is not None:
+            body['anti_affinity'] = f'{anti_affinity}'
+        if servers is not None:
+            body['servers'] = {'server': [str(server) for server in servers]}
+        return {'server_group': body}
+
+    def get_servers(self, populate=False, tags_has_one=None, tags_has_all=None, max_workers=8):
+        """
+        Return a list of (populated or unpopulated) Server instances.
+
+        - populate = False (default) => 1 API request, returns unpopulated Server instances.
+        - populate = True => Does 1 + n API requests (n = # of servers),
+                             returns populated Server instances.
+
+        With populate=True the n requests are made concurrently by at most
+        `max_workers` threads. The returned list keeps the API's order. Servers that could
+        not be populated are left unpopulated in the list and their exceptions are available
+        in `.errors` of the returned BulkResult, keyed by the Server instance.
+
+        New in 0.3.0: the list can be filtered with tags:
+        - tags_has_one: list of Tag objects or strings
+          returns servers that have at least one of the given tags
+
+        - tags_has_all: list of Tag objects or strings
+          returns servers that have all of the tags
+
+        Tag-filtered lists are answered from the attached inventory, if any (see: Inventory);
+        with populate=True only its servers that are not populated yet are fetched.
+        """
+        request = self._servers_endpoint(tags_has_one, tags_has_all)
+        from_inventory = self.inventory is not None and request != '/server'
+        if from_inventory:
+            server_list = BulkResult(self.inventory.servers_by_tag(tags_has_one, tags_has_all))
+        else:
+            servers = self.api.get_request(request)['servers']['server']
+            server_list = BulkResult()
+            for server in servers:
+                server_list.append(Server._from_api(server, self))
 
         if populate:
-            for server_instance in server_list:
-                server_instance.populate()
+            # a populating inventory keeps its servers' details up to date itself; servers
+            # from the API are always populated again, as they may be (identity-mapped)
+            # objects populated by an earlier call
+            unpopulated = server_list
+            if from_inventory and self.inventory.populate:
+                unpopulated = [server for server in server_list if not server.populated]
+            results = run_in_parallel(
+                lambda server_instance: server_instance.populate(),
+                unpopulated,
+                max_workers=max_workers,
+            )
+            for server_instance, (_, error) in zip(unpopulated, results, strict=True):
+                if error is not None:
+                    server_list.errors[server_instance] = error
 
         return server_list
 
+    def iter_servers(self, tags_has_one=None, tags_has_all=None):
+        """
+        Yield unpopulated Server instances from the API as they are received.
+
+        Like get_servers(populate=False), but the response is streamed and parsed one
+        server at a time, so memory use stays flat for large accounts.
+        """
+        chunks = self.api.get_stream(self._servers_endpoint(tags_has_one, tags_has_all))
+        for server in iter_json_array(chunks, ('servers', 'server'), self.api.json_codec.loads):
+            yield Server._from_api(server, self)
+
+    def get_server_table(self, tags_has_one=None, tags_has_all=None) -> ServerTable:
+        """
+        Return a ServerTable of all servers, or those matching the given tags.
+
+        The server list is streamed into the table's columns one server at a time, so no
+        Server objects or full JSON document are kept in memory (see: ServerTable).
+        """
+        chunks = self.api.get_stream(self._servers_endpoint(tags_has_one, tags_has_all))
+        servers = iter_json_array(chunks, ('servers', 'server'), self.api.json_codec.loads)
+        return ServerTable(servers, cloud_manager=self)
+
     def get_server(self, uuid: str) -> Server:
         """
         Return a (populated) Server instance.
         """
-        server, ip_addresses, storages = self.get_server_data(uuid)
-
-        return Server(
-            server,
-            ip_addresses=ip_addresses,
-            storage_devices=storages,
-            populated=True,
-            cloud_manager=self,
-        )
+        data = self.api.get_request(f'/server/{uuid}')
+        return Server._from_api(data['server'], self, populated=True)
 
     def get_server_by_ip(self, ip_address: str):
         """
         Return a (populated) Server instance by its IP.
 
         Uses GET '/ip_address/x.x.x.x' to retrieve machine UUID using IP-address.
+
+        With an attached inventory, servers with a known IP are returned from it without
+        API requests; they are populated only if the inventory populates servers.
         """
+        if self.inventory is not None:
+            server = self.inventory.server_by_ip(ip_address)
+            if server is not None:
+                return server
+
         data = self.api.get_request(f'/ip_address/{ip_address}')
         UUID = data['ip_address']['server']
         return self.get_server(UUID)
@@ -126,36 +265,74 @@ class ServerManager:
         server_to_return._reset(res['server'], cloud_manager=self, populated=True)
         return server_to_return
 
-    def modify_server(self, uuid: str, **kwargs) -> Server:
+    def create_servers(
+        self,
+        servers: list,
+        max_parallel: int = 8,
+        wait: bool = True,
+        timeout: float | None = None,
+        retries: int = 5,
+        poller: Poller | None = None,
+    ) -> BulkResult:
         """
-        modify_server allows updating the server's updateable_fields.
+        Create many servers concurrently. Accepts Server objects or dicts like create_server.
 
-        Note: Server's IP-addresses and Storages are managed by their own add/remove methods.
+        - max_parallel: maximum number of concurrent create requests
+        - wait: wait until all created servers are started, with one shared poll of the
+          '/server' list (see: wait_for_servers)
+        - timeout: deadline in seconds for the wait
+        - retries: attempts per server for transient errors (illegal state, rate limiting),
+          retried with exponential backoff
+
+        Returns a BulkResult of Server instances in the given order. Servers that could not be
+        created, or did not start before the timeout, have their exception in `.errors`.
         """
-        body = dict()
-        body['server'] = {}
-        for arg in kwargs:
-            if arg not in Server.updateable_fields:
-                Exception(f'{arg} is not an updateable field')
-            body['server'][arg] = kwargs[arg]
+        servers = [
+            (
+                server
+                if isinstance(server, Server)
+                else Server._create_server_obj(server, cloud_manager=self)
+            )
+            for server in servers
+        ]
+
+        results = run_in_parallel(
+            lambda server: retry_with_backoff(lambda: self.create_server(server), n=retries),
+            servers,
+            max_workers=max_parallel,
+        )
 
-        res = self.api.put_request(f'/server/{uuid}', body)
-        server = res['server']
+        created = BulkResult(servers)
+        for server, (_, error) in zip(servers, results, strict=True):
+            if error is not None:
+                created.errors[server] = error
 
-        # Populate subobjects
-        IPAddresses = IPAddress._create_ip_address_objs(
-            server.pop('ip_addresses'), cloud_manager=self
-        )
+        if wait:
+            started = [server for server in servers if server not in created.errors]
+            for server in self.wait_for_servers(started, ['started'], timeout, poller):
+                created.errors[server] = UpCloudClientError(
+                    f'server {server.uuid} did not start, state: {server.state}'
+                )
 
-        storages = Storage._create_storage_objs(server.pop('storage_devices'), cloud_manager=self)
+        return created
 
-        return Server(
-            server,
-            ip_addresses=IPAddresses,
-            storage_devices=storages,
-            populated=True,
-            cloud_manager=self,
-        )
+    def _modify_server(self, uuid: str, **kwargs) -> dict:
+        """
+        PUT /server/uuid. Returns a dict that can be used to create a Server object.
+
+        Private method used by the Server class and ServerManager.modify_server.
+        """
+        body = self._modify_server_body(**kwargs)
+        res = self.api.put_request(f'/server/{uuid}', body)
+        return res['server']
+
+    def modify_server(self, uuid: str, **kwargs) -> Server:
+        """
+        modify_server allows updating the server's updateable_fields.
+
+        Note: Server's IP-addresses and Storages are managed by their own add/remove methods.
+        """
+        return Server._from_api(self._modify_server(uuid, **kwargs), self, populated=True)
 
     def delete_server(
         self,
@@ -172,12 +349,86 @@ class ServerManager:
 
         Returns an empty object.
         """
-        storages = '1' if delete_storages else '0'
-
         return self.api.delete_request(
-            f'/server/{uuid}?storages={storages}&backups={backups.value}'
+            self._delete_server_endpoint(uuid, delete_storages, backups)
+        )
+
+    def destroy_servers(
+        self,
+        servers: list,
+        delete_storages: bool = True,
+        backups: BackupDeletionPolicy = BackupDeletionPolicy.KEEP,
+        max_parallel: int = 8,
+        hard: bool = False,
+        timeout: float | None = None,
+        retries: int = 5,
+        poller: Poller | None = None,
+    ) -> BulkResult:
+        """
+        Stop and destroy many servers concurrently. Accepts Server objects or UUIDs.
+
+        1. waits for servers in maintenance to settle and stops all started servers
+           concurrently (hard stop if hard=True)
+        2. waits for all of them to stop with one shared poll (see: wait_for_servers)
+        3. deletes the servers concurrently; with delete_storages=True their storages are
+           deleted in the same request, according to the backups policy
+
+        Transient errors are retried with exponential backoff, up to `retries` attempts.
+        Returns a BulkResult of Server instances in the given order. Servers that could not be
+        destroyed have their exception in `.errors`.
+        """
+        servers = [
+            server if isinstance(server, Server) else Server(uuid=server, cloud_manager=self)
+            for server in servers
+        ]
+        destroyed = BulkResult(servers)
+
+        def _record_errors(items, results):
+            for server, (_, error) in zip(items, results, strict=True):
+                if error is not None:
+                    destroyed.errors[server] = error
+
+        def _record_stragglers(stragglers, action):
+            for server in stragglers:
+                destroyed.errors[server] = UpCloudClientError(
+                    f'server {server.uuid} did not {action}, state: {getattr(server, "state", None)}'
+                )
+
+        _record_stragglers(
+            self.wait_for_servers(servers, ['started', 'stopped'], timeout, poller), 'settle'
+        )
+
+        started = [
+            server
+            for server in servers
+            if server not in destroyed.errors and server.state == 'started'
+        ]
+        _record_errors(
+            started,
+            run_in_parallel(
+                lambda server: retry_with_backoff(lambda: server.shutdown(hard=hard), n=retries),
+                started,
+                max_workers=max_parallel,
+            ),
+        )
+
+        stopping = [server for server in started if server not in destroyed.errors]
+        _record_stragglers(self.wait_for_servers(stopping, ['stopped'], timeout, poller), 'stop')
+
+        stopped = [server for server in servers if server not in destroyed.errors]
+        _record_errors(
+            stopped,
+            run_in_parallel(
+                lambda server: retry_with_backoff(
+                    lambda: self.delete_server(server.uuid, delete_storages, backups), n=retries
+                ),
+                stopped,
+                max_workers=max_parallel,
+            ),
         )
 
+        return destroyed
+
     def get_server_data(self, uuid: str):
         """
         Return '/server/uuid' data in Python dict.
@@ -185,16 +436,48 @@ class ServerManager:
         Creates object representations of any IP-address and Storage.
         """
         data = self.api.get_request(f'/server/{uuid}')
-        server = data['server']
+        return self._server_data_from_api(data, self)
 
-        # Populate subobjects
-        IPAddresses = IPAddress._create_ip_address_objs(
-            server.pop('ip_addresses'), cloud_manager=self
-        )
+    def get_server_state(self, uuid: str) -> str:
+        """
+        Return the state of a server from '/server/uuid'.
 
-        storages = Storage._create_storage_objs(server.pop('storage_devices'), cloud_manager=self)
+        Skips building IP-address and Storage objects, which makes it cheap to poll.
+        A cached response is revalidated (see: ResponseCache), as the state is polled.
+        """
+        data = self.api.get_request(f'/server/{uuid}', no_cache=True)
+        return data['server']['state']
 
-        return server, IPAddresses, storages
+    def wait_for_servers(
+        self, servers, target_states, timeout: float | None = None, poller: Poller | None = None
+    ) -> list:
+        """
+        Blocking wait until all given servers are in one of target_states.
+
+        Polls the '/server' list once per interval and updates the state of every tracked
+        Server from that single response, instead of polling each server separately.
+
+        Returns the stragglers: servers that did not reach a target state before the timeout,
+        entered the error state or no longer exist. An empty list means all servers are done.
+        """
+        poller = poller or Poller(timeout=timeout)
+        pending = {server.uuid: server for server in servers}
+        failed = []
+
+        def _refresh():
+            data = self.api.get_request('/server', no_cache=True)
+            self._update_server_states(data, pending, failed, target_states)
+
+        if not pending:
+            return []
+
+        _refresh()
+        try:
+            poller.wait(lambda: not pending, _refresh)
+        except UpCloudTimeoutError:
+            pass
+
+        return failed + list(pending.values())
 
     def create_server_group(self, server_group: ServerGroup) -> ServerGroup:
         """
@@ -205,6 +488,16 @@ class ServerManager:
         res = self.api.post_request('/server-group', body)
         return ServerGroup(cloud_manager=self, **res['server_group'])
 
+    def get_server_groups(self) -> list:
+        """
+        Returns a list of all server groups of the account as ServerGroup objects.
+        """
+        data = self.api.get_request('/server-group')
+        return [
+            ServerGroup(cloud_manager=self, **server_group)
+            for server_group in data['server_groups']['server_group']
+        ]
+
     def get_server_group(self, uuid: str) -> ServerGroup:
         """
         Fetches server group details and returns a ServerGroup object.
@@ -212,6 +505,18 @@ class ServerManager:
         data = self.api.get_request(f'/server-group/{uuid}')
         return ServerGroup(cloud_manager=self, **data['server_group'])
 
+    def modify_server_group(
+        self, uuid: str, title=None, anti_affinity=None, servers=None
+    ) -> ServerGroup:
+        """
+        Modifies the title, anti-affinity policy or servers of a server group.
+
+        servers replaces the group's servers and is given as Server objects or UUIDs.
+        """
+        body = self._modify_server_group_body(title, anti_affinity, servers)
+        res = self.api.patch_request(f'/server-group/{uuid}', body)
+        return ServerGroup(cloud_manager=self, **res['server_group'])
+
     def delete_server_group(self, uuid: str):
         """
         DELETE '/server-group/UUID'. Destroys the server group, but not attached servers.
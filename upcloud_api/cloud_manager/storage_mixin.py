@@ -2,8 +2,12 @@ from os import PathLike
 from typing import BinaryIO
 
 from upcloud_api.api import API
+from upcloud_api.errors import UpCloudClientError
+from upcloud_api.polling import Poller
 from upcloud_api.storage import BackupDeletionPolicy, Storage
-from upcloud_api.storage_import import StorageImport
+from upcloud_api.storage_import import STORAGE_IMPORT_FINAL_STATES, StorageImport
+from upcloud_api.streaming import iter_json_array
+from upcloud_api.upload import DEFAULT_CHUNK_SIZE, ChunkedUpload, UploadStream
 
 
 class StorageManager:
@@ -13,6 +17,82 @@ class StorageManager:
 
     api: API
 
+    @staticmethod
+    def _templates_from_api(res: dict) -> list:
+        """
+        Return {title: uuid} dicts of the templates in a '/storage/template' response.
+        """
+        return [{item.get('title'): item.get('uuid')} for item in res['storages']['storage']]
+
+    @staticmethod
+    def _create_storage_body(zone, size, tier, title, encrypted, backup_rule) -> dict:
+        """
+        Return the body of POST /storage.
+        """
+        return {
+            'storage': {
+                'size': size,
+                'tier': tier,
+                'title': title,
+                'zone': zone,
+                'backup_rule': backup_rule or {},
+                'encrypted': 'yes' if encrypted else 'no',
+            }
+        }
+
+    @staticmethod
+    def _modify_storage_body(size, title, backup_rule) -> dict:
+        """
+        Return the body of PUT /storage/uuid with the given (truthy) fields.
+        """
+        body = {'storage': {}}
+        if size:
+            body['storage']['size'] = size
+        if title:
+            body['storage']['title'] = title
+        if backup_rule:
+            body['storage']['backup_rule'] = backup_rule
+        return body
+
+    @staticmethod
+    def _clone_storage_body(title, zone, tier) -> dict:
+        """
+        Return the body of POST /storage/uuid/clone.
+        """
+        body = {'storage': {'title': title, 'zone': zone}}
+        if tier:
+            body['storage']['tier'] = tier
+        return body
+
+    @staticmethod
+    def _attach_storage_body(storage, storage_type, address) -> dict:
+        """
+        Return the body of POST /server/uuid/storage/attach.
+        """
+        body = {'storage_device': {}}
+        if storage:
+            body['storage_device']['storage'] = str(storage)
+
+        if storage_type:
+            body['storage_device']['type'] = storage_type
+
+        if address:
+            body['storage_device']['address'] = address
+        return body
+
+    @staticmethod
+    def _storage_import_body(source, source_location) -> dict:
+        """
+        Return the body of POST /storage/uuid/import; source is validated.
+        """
+        if source not in ("http_import", "direct_upload"):
+            raise Exception(f"invalid storage import source: {source}")
+
+        body = {'storage_import': {'source': source}}
+        if source_location:
+            body['storage_import']['source_location'] = source_location
+        return body
+
     def get_storages(self, storage_type='normal'):
         """
         Return a list of Storage objects from the API.
@@ -20,24 +100,68 @@ class StorageManager:
         Storage types: public, private, normal, backup, cdrom, template, favorite
         """
         res = self.api.get_request('/storage/' + storage_type)
-        return Storage._create_storage_objs(res['storages'], cloud_manager=self)
+        return [Storage._from_api(storage, self) for storage in res['storages']['storage']]
+
+    def iter_storages(self, storage_type='normal'):
+        """
+        Yield Storage objects from the API as they are received.
+
+        Like get_storages, but the response is streamed and parsed one storage at a time,
+        so memory use stays flat for large accounts.
+        """
+        chunks = self.api.get_stream('/storage/' + storage_type)
+        path = ('storages', 'storage')
+        for storage in iter_json_array(chunks, path, self.api.json_codec.loads):
+            yield Storage._from_api(storage, self)
 
     def get_templates(self):
         """
         Return a list of Storages that are templates in a dict with title as key and uuid as value.
         """
-        templates = []
         res = self.api.get_request('/storage/template')
-        for item in res.get('storages').get('storage'):
-            templates.append({item.get('title'): item.get('uuid')})
-        return templates
+        return self._templates_from_api(res)
 
     def get_storage(self, storage: str) -> Storage:
         """
         Return a Storage object from the API.
         """
         res = self.api.get_request('/storage/' + str(storage))
-        return Storage(cloud_manager=self, **res['storage'])
+        return Storage._from_api(res['storage'], self)
+
+    def get_storage_state(self, storage: str) -> str:
+        """
+        Return the state of a storage from '/storage/uuid' without building a Storage object.
+
+        A cached response is revalidated (see: ResponseCache), as the state is polled.
+        """
+        res = self.api.get_request('/storage/' + str(storage), no_cache=True)
+        return res['storage']['state']
+
+    def wait_for_storage_state(
+        self, storage: Storage | str, target_states, poller: Poller | None = None
+    ) -> str:
+        """
+        Blocking wait until the storage reaches one of target_states. Returns the state.
+
+        Useful after cloning, backing up or resizing, when the storage is in maintenance.
+        Polls with fast initial polls and backoff; pass a poller to set a timeout.
+        """
+        state = self.get_storage_state(storage)
+
+        def _is_done():
+            if state == 'error':
+                raise Exception('storage is in error state')
+            return state in target_states
+
+        def _refresh():
+            nonlocal state
+            state = self.get_storage_state(storage)
+
+        (poller or Poller()).wait(_is_done, _refresh)
+
+        if isinstance(storage, Storage):
+            storage.state = state
+        return state
 
     def create_storage(
         self,
@@ -52,32 +176,12 @@ class StorageManager:
         """
         Create a Storage object. Returns an object based on the API's response.
         """
-        if backup_rule is None:
-            backup_rule = {}
-
-        encrypted_str = 'yes' if encrypted else 'no'
-
-        body = {
-            'storage': {
-                'size': size,
-                'tier': tier,
-                'title': title,
-                'zone': zone,
-                'backup_rule': backup_rule,
-                'encrypted': encrypted_str,
-            }
-        }
+        body = self._create_storage_body(zone, size, tier, title, encrypted, backup_rule)
         res = self.api.post_request('/storage', body)
-        return Storage(cloud_manager=self, **res['storage'])
+        return Storage._from_api(res['storage'], self)
 
     def _modify_storage(self, storage, size, title, backup_rule: dict | None = None):
-        body = {'storage': {}}
-        if size:
-            body['storage']['size'] = size
-        if title:
-            body['storage']['title'] = title
-        if backup_rule:
-            body['storage']['backup_rule'] = backup_rule
+        body = self._modify_storage_body(size, title, backup_rule)
         return self.api.put_request('/storage/' + str(storage), body)
 
     def modify_storage(
@@ -87,7 +191,7 @@ class StorageManager:
         Modify a Storage object. Returns an object based on the API's response.
         """
         res = self._modify_storage(str(storage), size, title, backup_rule)
-        return Storage(cloud_manager=self, **res['storage'])
+        return Storage._from_api(res['storage'], self)
 
     def delete_storage(self, uuid: str, backups: BackupDeletionPolicy = BackupDeletionPolicy.KEEP):
         """
@@ -99,12 +203,10 @@ class StorageManager:
         """
         Clones a Storage object. Returns an object based on the API's response.
         """
-        body = {'storage': {'title': title, 'zone': zone}}
-        if tier:
-            body['storage']['tier'] = tier
+        body = self._clone_storage_body(title, zone, tier)
         # TODO: `str(storage)` seems unsafe
         res = self.api.post_request(f'/storage/{str(storage)}/clone', body)
-        return Storage(cloud_manager=self, **res['storage'])
+        return Storage._from_api(res['storage'], self)
 
     def cancel_clone_storage(self, storage):
         """
@@ -116,16 +218,7 @@ class StorageManager:
         """
         Attach a Storage object to a Server. Return a list of the server's storages.
         """
-        body = {'storage_device': {}}
-        if storage:
-            body['storage_device']['storage'] = str(storage)
-
-        if storage_type:
-            body['storage_device']['type'] = storage_type
-
-        if address:
-            body['storage_device']['address'] = address
-
+        body = self._attach_storage_body(storage, storage_type, address)
         url = f'/server/{server}/storage/attach'
         res = self.api.post_request(url, body)
         return Storage._create_storage_objs(res['server']['storage_devices'], cloud_manager=self)
@@ -163,7 +256,7 @@ class StorageManager:
         url = f'/storage/{storage}/backup'
         body = {'storage': {'title': title}}
         res = self.api.post_request(url, body)
-        return Storage(cloud_manager=self, **res['storage'])
+        return Storage._from_api(res['storage'], self)
 
     def restore_storage_backup(self, storage):
         """
@@ -179,7 +272,7 @@ class StorageManager:
         url = f'/storage/{storage}/templatize'
         body = {'storage': {'title': title}}
         res = self.api.post_request(url, body)
-        return Storage(cloud_manager=self, **res['storage'])
+        return Storage._from_api(res['storage'], self)
 
     def create_storage_import(
         self, storage: str, source: str, source_location=None
@@ -188,13 +281,8 @@ class StorageManager:
         Creates an import task to import data into an existing storage.
         Source types: http_import or direct_upload.
         """
-        if source not in ("http_import", "direct_upload"):
-            raise Exception(f"invalid storage import source: {source}")
-
+        body = self._storage_import_body(source, source_location)
         url = f'/storage/{storage}/import'
-        body = {'storage_import': {'source': source}}
-        if source_location:
-            body['storage_import']['source_location'] = source_location
         res = self.api.post_request(url, body)
         return StorageImport(**res['storage_import'])
 
@@ -235,14 +323,107 @@ class StorageManager:
             if needs_closing:
                 f.close()
 
+    def upload_storage_import(
+        self,
+        storage: str,
+        file: str | PathLike | BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_parallel: int = 1,
+        retries: int = 5,
+        resumes: int = 3,
+        timeout: float = 60,
+        content_type: str = 'application/octet-stream',
+    ) -> dict:
+        """
+        Upload a file to the direct upload import of a storage in chunks, resuming on failure.
+
+        The upload URL and the offset to start from are taken from get_storage_import_details:
+        read_bytes is the number of bytes the uploader has confirmed, so an interrupted upload
+        continues where it stopped instead of starting from zero. Chunks of chunk_size bytes
+        are read from a memory map of the file (or its descriptor) and sent with at most
+        max_parallel in flight, so memory use does not grow with the file (see: ChunkedUpload).
+        Failed chunks are retried `retries` times with backoff; after that the upload is
+        resumed from the confirmed offset up to `resumes` times before the error is raised.
+
+        The uploader must accept ranged (Content-Range) PUTs; upload_file_for_storage_import
+        sends the file in a single request. Returns the uploader's last response.
+        """
+        with ChunkedUpload(
+            file, chunk_size, max_parallel, retries, timeout, content_type
+        ) as upload:
+            for attempt in range(resumes + 1):
+                details = self.get_storage_import_details(storage)
+                if details.state in STORAGE_IMPORT_FINAL_STATES:
+                    raise UpCloudClientError(
+                        f'storage import {details.uuid} is {details.state}: {details.error_message}'
+                    )
+                try:
+                    return upload.upload(details.direct_upload_url, int(details.read_bytes or 0))
+                except UpCloudClientError:
+                    if attempt >= resumes:
+                        raise
+
+    def stream_storage_import(
+        self,
+        storage: str,
+        file: str | PathLike | BinaryIO,
+        compression: str | None = None,
+        level: int | None = None,
+        verify: bool = True,
+        timeout: float | None = 60,
+        poller: Poller | None = None,
+    ) -> StorageImport:
+        """
+        Upload a file to the direct upload import of a storage in a single pass over the data.
+
+        The file is compressed on the fly with compression ('gzip', 'xz' or 'zstd', which
+        needs the zstandard package) if given, and the SHA-256 and MD5 digests of the sent
+        bytes are computed while sending (see: UploadStream). Then the import is waited for
+        and, with verify=True, its sha256sum and md5sum are checked against the computed
+        digests; a failed import or a mismatch raises UpCloudClientError. The file is not
+        read a second time, and it can be a pipe.
+
+        Returns the final import details.
+        """
+        details = self.get_storage_import_details(storage)
+        stream = UploadStream(file, compression, level)
+        response = stream.upload(details.direct_upload_url, timeout)
+
+        details = self.wait_for_storage_import(storage, poller)
+        if verify:
+            if details.state != 'completed':
+                raise UpCloudClientError(
+                    f'storage import {details.uuid} is {details.state}: {details.error_message}'
+                )
+            stream.verify(details if details.sha256sum or details.md5sum else response)
+        return details
+
     def get_storage_import_details(self, storage: str) -> StorageImport:
         """
         Returns detailed information of an ongoing or finished import task.
+
+        A cached response is revalidated, as the progress is polled.
         """
         url = f'/storage/{storage}/import'
-        res = self.api.get_request(url)
+        res = self.api.get_request(url, no_cache=True)
         return StorageImport(**res['storage_import'])
 
+    def wait_for_storage_import(self, storage: str, poller: Poller | None = None) -> StorageImport:
+        """
+        Blocking wait until an import task is completed, failed or cancelled.
+
+        Returns the final import details. Polls with fast initial polls and backoff;
+        pass a poller to set a timeout.
+        """
+        details = self.get_storage_import_details(storage)
+
+        def _refresh():
+            nonlocal details
+            details = self.get_storage_import_details(storage)
+
+        (poller or Poller()).wait(lambda: details.state in STORAGE_IMPORT_FINAL_STATES, _refresh)
+        return details
+
     def cancel_storage_import(self, storage: str) -> StorageImport:
         """
         Cancels an ongoing import task.
@@ -11,6 +11,22 @@ class TagManager:
 
     api: API
 
+    @staticmethod
+    def _create_tag_body(name, description, servers) -> dict:
+        """
+        Return the body of POST /tag; servers are Server objects or UUIDs.
+        """
+        servers = [str(server) for server in servers or []]
+        return {'tag': Tag(name, description, servers).to_dict()}
+
+    @staticmethod
+    def _server_tags_endpoint(server, tags, action: str) -> str:
+        """
+        Return the endpoint that tags ('tag') or untags ('untag') a server.
+        """
+        tags = [str(tag) for tag in tags]
+        return f"/server/{str(server)}/{action}/{','.join(tags)}"
+
     def get_tags(self):
         """List all tags as Tag objects."""
         res = self.api.get_request('/tag')
@@ -29,10 +45,7 @@ class TagManager:
 
         Returns the created Tag object.
         """
-        if servers is None:
-            servers = []
-        servers = [str(server) for server in servers]
-        body = {'tag': Tag(name, description, servers).to_dict()}
+        body = self._create_tag_body(name, description, servers)
         res = self.api.post_request('/tag', body)
 
         return Tag(cloud_manager=self, **res['tag'])
@@ -52,7 +65,7 @@ class TagManager:
         PUT /tag/name. Returns a new Tag object based on the API response.
         """
         res = self._modify_tag(name, description, servers, new_name)
-        return Tag(cloud_manager=self, **res['tag'])
+        return Tag(cloud_manager=self, **res)
 
     def assign_tags(self, server, tags):
         """
@@ -61,10 +74,7 @@ class TagManager:
         - server: Server object or UUID string
         - tags: list of Tag objects or strings
         """
-        uuid = str(server)
-        tags = [str(tag) for tag in tags]
-
-        url = f"/server/{uuid}/tag/{','.join(tags)}"
+        url = self._server_tags_endpoint(server, tags, 'tag')
         return self.api.post_request(url)
 
     def remove_tags(self, server, tags):
@@ -74,10 +84,7 @@ class TagManager:
         - server: Server object or UUID string
         - tags: list of Tag objects or strings
         """
-        uuid = str(server)
-        tags = [str(tag) for tag in tags]
-
-        url = f"/server/{uuid}/untag/{','.join(tags)}"
+        url = self._server_tags_endpoint(server, tags, 'untag')
         return self.api.post_request(url)
 
     def delete_tag(self, tag):
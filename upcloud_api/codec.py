@@ -0,0 +1,104 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+from upcloud_api.errors import UpCloudClientError
+
+
+class JSONCodec:
+    """
+    Encodes request bodies and decodes response bodies with the standard library json module.
+
+    Subclass and override dumps and loads to plug in another JSON library. loads is given
+    the raw response bytes and must raise ValueError for invalid documents.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj) -> str | bytes:
+        """
+        Encode obj as a JSON document.
+        """
+        return json.dumps(obj)
+
+    def loads(self, data: bytes):
+        """
+        Decode a JSON document.
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSONCodec using orjson.
+    """
+
+    name = 'orjson'
+
+    def dumps(self, obj) -> bytes:
+        """
+        Encode obj with orjson.
+        """
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes):
+        """
+        Decode a JSON document with orjson.
+        """
+        return orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    JSONCodec using ujson.
+    """
+
+    name = 'ujson'
+
+    def dumps(self, obj) -> str:
+        """
+        Encode obj with ujson.
+        """
+        return ujson.dumps(obj)
+
+    def loads(self, data: bytes):
+        """
+        Decode a JSON document with ujson.
+        """
+        return ujson.loads(data)
+
+
+CODECS = {
+    'orjson': (OrjsonCodec, lambda: orjson),
+    'ujson': (UjsonCodec, lambda: ujson),
+    'json': (JSONCodec, lambda: json),
+}
+
+
+def get_codec(codec: 'str | JSONCodec | None' = None) -> JSONCodec:
+    """
+    Return a JSONCodec by name, or the fastest installed one (orjson, ujson, json) for None.
+
+    JSONCodec instances are returned as is.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is None:
+        return next(cls() for cls, module in CODECS.values() if module() is not None)
+
+    if codec not in CODECS:
+        raise UpCloudClientError(f'Unknown JSON codec: {codec}')
+
+    cls, module = CODECS[codec]
+    if module() is None:
+        raise UpCloudClientError(f'JSON codec {codec} requires the {codec} package.')
+    return cls()
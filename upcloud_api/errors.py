@@ -15,14 +15,34 @@ class UpCloudAPIError(UpCloudClientError):
 
     Each API call returns an `error_code` and `error_message` that
     are available as attributes via instances of this class.
+    The HTTP status code of the response is available as `status_code`, and the delay
+    requested by a Retry-After header (in seconds) as `retry_after`.
     """
 
-    def __init__(self, error_code, error_message):
+    def __init__(self, error_code, error_message, status_code=None, retry_after=None):
         """
-        Initialize API error with an error code and message.
+        Initialize API error with an error code, message and optional HTTP status code.
         """
         self.error_code = error_code
         self.error_message = error_message
+        self.status_code = status_code
+        self.retry_after = retry_after
 
     def __str__(self):
         return f'{self.error_code} {self.error_message}'
+
+
+class UpCloudTimeoutError(UpCloudClientError):
+    """
+    Raised when a wait for a resource or a retried request does not finish before its deadline.
+    """
+
+    pass
+
+
+class UpCloudCancelledError(UpCloudClientError):
+    """
+    Raised when a wait for a resource is cancelled.
+    """
+
+    pass
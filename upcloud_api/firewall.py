@@ -39,3 +39,66 @@ class FirewallRule(UpCloudResource):
                 """
             )
         return self.server.cloud_manager.delete_firewall_rule(self.server.uuid, self.position)
+
+
+def rule_key(rule) -> tuple:
+    """
+    Return the fields of a firewall rule (dict or FirewallRule) that matter when comparing rules.
+
+    The position and empty fields are left out and values compared as strings, so that a rule
+    returned by the API equals the rule it was created from.
+    """
+    if isinstance(rule, FirewallRule):
+        rule = rule.to_dict()
+    return tuple(
+        sorted(
+            (field, str(value))
+            for field, value in rule.items()
+            if field != 'position' and value not in (None, '')
+        )
+    )
+
+
+def diff_firewall_rules(current_rules, desired_rules) -> list:
+    """
+    Return the shortest list of edits that turns current_rules into desired_rules.
+
+    The rules are compared by rule_key and the unchanged rules are the longest common
+    subsequence of the two lists. Each edit is ('delete', position, None) or
+    ('insert', position, rule_body); applied in the returned order, deletes go from the last
+    position to the first and inserts from the first to the last, so every position refers to
+    the rule list as it is at that point.
+    """
+    current = [rule_key(rule) for rule in current_rules]
+    desired = [rule_key(rule) for rule in desired_rules]
+
+    # lengths[i][j]: length of the longest common subsequence of current[i:] and desired[j:]
+    lengths = [[0] * (len(desired) + 1) for _ in range(len(current) + 1)]
+    for i in range(len(current) - 1, -1, -1):
+        for j in range(len(desired) - 1, -1, -1):
+            if current[i] == desired[j]:
+                lengths[i][j] = lengths[i + 1][j + 1] + 1
+            else:
+                lengths[i][j] = max(lengths[i + 1][j], lengths[i][j + 1])
+
+    kept = set()
+    matched = set()
+    i = j = 0
+    while i < len(current) and j < len(desired):
+        if current[i] == desired[j]:
+            kept.add(i)
+            matched.add(j)
+            i += 1
+            j += 1
+        elif lengths[i + 1][j] >= lengths[i][j + 1]:
+            i += 1
+        else:
+            j += 1
+
+    edits = [('delete', i + 1, None) for i in range(len(current) - 1, -1, -1) if i not in kept]
+    for j, rule in enumerate(desired_rules):
+        if j not in matched:
+            body = rule.to_dict() if isinstance(rule, FirewallRule) else dict(rule)
+            body['position'] = str(j + 1)
+            edits.append(('insert', j + 1, body))
+    return edits
@@ -0,0 +1,59 @@
+import threading
+import weakref
+
+
+class IdentityMap:
+    """
+    Weak-valued map of (resource class, UUID) to the one object representing that resource.
+
+    Used by CloudManager(identity_map=True): objects built from API data are looked up here
+    first, and an existing object is updated in place instead of allocating a new one. Every
+    get_server, get_servers, get_storage, ... call for a UUID then returns the same object
+    for as long as the application keeps a reference to it; unreferenced objects are dropped
+    by the garbage collector as usual.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty map.
+        """
+        self._objects = weakref.WeakValueDictionary()
+        # re-entrant, as creating an object may load its sub-objects
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def get(self, cls, uuid: str):
+        """
+        Return the object of the given class and UUID, or None.
+        """
+        return self._objects.get((cls, uuid))
+
+    def add(self, obj, uuid: str | None = None) -> None:
+        """
+        Add an object, replacing any other object with the same class and UUID.
+        """
+        with self._lock:
+            self._objects[(type(obj), uuid or obj.uuid)] = obj
+
+    def load(self, cls, uuid: str, create, update=None):
+        """
+        Return the object of the given class and UUID after calling update(obj) on it, or
+        the object returned by create() if there is none yet.
+        """
+        with self._lock:
+            obj = self._objects.get((cls, uuid))
+            if obj is None:
+                obj = create()
+                self._objects[(cls, uuid)] = obj
+            elif update is not None:
+                update(obj)
+            return obj
+
+    def clear(self) -> None:
+        """
+        Forget all objects.
+        """
+        with self._lock:
+            self._objects.clear()
@@ -0,0 +1,297 @@
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from upcloud_api.errors import UpCloudClientError
+from upcloud_api.server import Server
+from upcloud_api.utils import run_in_parallel
+
+if TYPE_CHECKING:
+    from upcloud_api import CloudManager
+
+INDEXES = ('hostname', 'tag', 'label', 'label_key', 'storage', 'ip')
+
+
+class Inventory:
+    """
+    Local index of an account's servers, IP-addresses, storages and tags.
+
+    Loads everything with one list request per resource type and answers lookups by IP,
+    hostname, tag, label and storage UUID from hash indexes without API requests:
+
+        manager.inventory = Inventory(manager)
+        manager.get_server_by_ip('94.237.0.207')         # answered locally
+        manager.get_servers(tags_has_one=['web'])        # answered locally
+        manager.inventory.servers_by_label('env', 'prod')
+
+    - populate: also fetch the details of each server, which adds its storages (for
+      server_by_storage) and its IP-addresses to the indexes; with max_workers threads
+    - refresh_interval: refresh in a background thread every this many seconds (see: start)
+
+    refresh() is incremental: the Server objects of unchanged servers are kept, changed
+    servers are updated in place and only new or changed servers are re-populated. The
+    returned Server objects are shared by all lookups, so treat them as read-only snapshots.
+    """
+
+    def __init__(
+        self,
+        cloud_manager: 'CloudManager',
+        populate: bool = False,
+        refresh_interval: float | None = None,
+        max_workers: int = 8,
+    ) -> None:
+        """
+        Load the inventory and start refreshing it if a refresh_interval is given.
+        """
+        self.cloud_manager = cloud_manager
+        self.populate = populate
+        self.max_workers = max_workers
+
+        self.servers = {}  # uuid: Server, in the API's order
+        self.ips = {}  # address: IPAddress
+        self.storages = {}  # uuid: Storage
+        self.tags = {}  # name: Tag
+        self.refreshed_at = None
+        self.last_error = None
+
+        self._raw = {}  # uuid: server dict of the last list response
+        self._keys = {}  # uuid: index keys of the server
+        self._order = {}  # uuid: position in servers
+        self._indexes = {name: {} for name in INDEXES}
+        self._lock = threading.RLock()
+        self._stop_event = None
+        self._thread = None
+
+        self.refresh()
+        if refresh_interval:
+            self.start(refresh_interval)
+
+    #
+    # Loading
+    #
+
+    def refresh(self, full: bool = False) -> dict:
+        """
+        Reload the inventory from the API and update the indexes.
+
+        Returns the UUIDs of the servers that were added, updated or removed. With
+        full=True every server is updated (and re-populated) as if it had changed.
+        """
+        api = self.cloud_manager.api
+        servers = api.get_request('/server')['servers']['server']
+        ips = self.cloud_manager.get_ips()
+        storages = self.cloud_manager.get_storages()
+        tags = self.cloud_manager.get_tags()
+
+        with self._lock:
+            changed = [
+                server for server in servers if full or self._raw.get(server['uuid']) != server
+            ]
+        details = self._fetch_details(changed) if self.populate else {}
+
+        with self._lock:
+            changes = self._update_servers(servers, changed, details)
+            self.ips = {ip.address: ip for ip in ips}
+            self.storages = {storage.uuid: storage for storage in storages}
+            for tag in tags:
+                tag.servers = [self.servers.get(server.uuid, server) for server in tag.servers]
+            self.tags = {tag.name: tag for tag in tags}
+            self.refreshed_at = time.monotonic()
+
+        return changes
+
+    def _fetch_details(self, servers: list) -> dict:
+        """
+        Return uuid: server details of the given servers, fetched concurrently.
+
+        Servers whose details could not be fetched are left out and stay unpopulated.
+        """
+        api = self.cloud_manager.api
+        results = run_in_parallel(
+            lambda server: api.get_request(f'/server/{server["uuid"]}')['server'],
+            servers,
+            max_workers=self.max_workers,
+        )
+        return {
+            server['uuid']: data
+            for server, (data, error) in zip(servers, results, strict=True)
+            if error is None
+        }
+
+    def _update_servers(self, servers: list, changed: list, details: dict) -> dict:
+        uuids = [server['uuid'] for server in servers]
+        listed = set(uuids)
+        removed = [uuid for uuid in self.servers if uuid not in listed]
+        added = []
+        updated = []
+
+        for uuid in removed:
+            self._unindex(uuid)
+            del self._raw[uuid]
+            del self.servers[uuid]
+
+        for server in changed:
+            uuid = server['uuid']
+            data = details.get(uuid, server)
+            self._unindex(uuid)
+            self._index(uuid, server, data)
+
+            # servers that could not be populated are retried on the next refresh
+            populated = uuid in details
+            self._raw[uuid] = server if populated or not self.populate else None
+
+            # list data leaves the flag alone: identity-mapped servers stay populated
+            flags = {'populated': True} if populated else {}
+
+            # _reset consumes the sub-objects of the dict it is given
+            if uuid in self.servers:
+                self.servers[uuid]._reset(dict(data), cloud_manager=self.cloud_manager, **flags)
+                updated.append(uuid)
+            else:
+                self.servers[uuid] = Server._from_api(dict(data), self.cloud_manager, **flags)
+                added.append(uuid)
+
+        self.servers = {uuid: self.servers[uuid] for uuid in uuids}
+        self._order = {uuid: position for position, uuid in enumerate(uuids)}
+        return {'added': added, 'updated': updated, 'removed': removed}
+
+    def _index(self, uuid: str, server: dict, data: dict) -> None:
+        keys = [('hostname', server.get('hostname'))]
+        keys += [('tag', tag) for tag in (server.get('tags') or {}).get('tag', [])]
+        for label in (server.get('labels') or {}).get('label', []):
+            keys += [('label', (label['key'], label['value'])), ('label_key', label['key'])]
+
+        storage_devices = (data.get('storage_devices') or {}).get('storage_device', [])
+        keys += [('storage', storage['storage']) for storage in storage_devices]
+        keys += [
+            ('ip', ip['address']) for ip in (data.get('ip_addresses') or {}).get('ip_address', [])
+        ]
+
+        keys = list(dict.fromkeys(keys))
+        for index, key in keys:
+            self._indexes[index].setdefault(key, set()).add(uuid)
+        self._keys[uuid] = keys
+
+    def _unindex(self, uuid: str) -> None:
+        for index, key in self._keys.pop(uuid, ()):
+            uuids = self._indexes[index][key]
+            uuids.discard(uuid)
+            if not uuids:
+                del self._indexes[index][key]
+
+    #
+    # Periodic refresh
+    #
+
+    def start(self, interval: float) -> None:
+        """
+        Refresh the inventory every interval seconds in a daemon thread until stop().
+
+        A failed refresh keeps the previous state; its exception is stored in last_error.
+        """
+        if self._thread is not None:
+            raise UpCloudClientError('The inventory is already being refreshed.')
+
+        self._stop_event = threading.Event()
+
+        def _refresh_periodically(stop_event):
+            while not stop_event.wait(interval):
+                try:
+                    self.refresh()
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = e
+
+        self._thread = threading.Thread(
+            target=_refresh_periodically,
+            args=(self._stop_event,),
+            name='upcloud-inventory-refresh',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop refreshing the inventory periodically.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    #
+    # Lookups
+    #
+
+    def _servers_of(self, uuids) -> list:
+        return [self.servers[uuid] for uuid in sorted(uuids, key=self._order.__getitem__)]
+
+    def _lookup(self, index: str, key) -> set:
+        return set(self._indexes[index].get(key, ()))
+
+    def get_server(self, uuid: str) -> Server | None:
+        """
+        Return the Server with the given UUID, or None.
+        """
+        return self.servers.get(uuid)
+
+    def server_by_ip(self, address: str) -> Server | None:
+        """
+        Return the Server an IP-address is attached to, or None.
+        """
+        with self._lock:
+            ip = self.ips.get(address)
+            if ip is not None and ip.server:
+                return self.servers.get(ip.server)
+            uuids = self._lookup('ip', address)
+            return self._servers_of(uuids)[0] if uuids else None
+
+    def server_by_storage(self, storage_uuid: str) -> Server | None:
+        """
+        Return the Server a storage is attached to, or None. Requires populate=True.
+        """
+        with self._lock:
+            uuids = self._lookup('storage', storage_uuid)
+            return self._servers_of(uuids)[0] if uuids else None
+
+    def servers_by_hostname(self, hostname: str) -> list:
+        """
+        Return the Servers with the given hostname.
+        """
+        with self._lock:
+            return self._servers_of(self._lookup('hostname', hostname))
+
+    def servers_by_tag(self, tags_has_one=None, tags_has_all=None) -> list:
+        """
+        Return the Servers that have at least one of tags_has_one or all of tags_has_all.
+
+        Tags are given as Tag objects or strings, as in CloudManager.get_servers.
+        """
+        if tags_has_all and tags_has_one:
+            raise UpCloudClientError('only one of (tags_has_all, tags_has_one) is allowed.')
+
+        with self._lock:
+            if tags_has_all:
+                sets = [self._lookup('tag', str(tag)) for tag in tags_has_all]
+                uuids = set.intersection(*sets)
+            else:
+                uuids = set()
+                for tag in tags_has_one or ():
+                    uuids |= self._lookup('tag', str(tag))
+            return self._servers_of(uuids)
+
+    def servers_by_label(self, key: str, value: str | None = None) -> list:
+        """
+        Return the Servers that have a label with the given key (and value, if given).
+        """
+        with self._lock:
+            if value is None:
+                return self._servers_of(self._lookup('label_key', key))
+            return self._servers_of(self._lookup('label', (key, value)))
+
+    def get_storage(self, uuid: str):
+        """
+        Return the Storage with the given UUID, or None.
+        """
+        return self.storages.get(uuid)
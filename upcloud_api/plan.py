@@ -0,0 +1,698 @@
+import threading
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING
+
+from upcloud_api.errors import UpCloudClientError
+from upcloud_api.firewall import diff_firewall_rules
+from upcloud_api.polling import Poller
+from upcloud_api.server import Server
+from upcloud_api.server_group import ServerGroup
+from upcloud_api.utils import BulkResult, retry_with_backoff, run_in_parallel
+
+if TYPE_CHECKING:
+    from upcloud_api import CloudManager
+
+# planning order; a resource may only refer to resources of earlier kinds
+KINDS = (
+    'router',
+    'network',
+    'server_group',
+    'server',
+    'storage',
+    'tag',
+    'firewall',
+    'load_balancer',
+)
+
+# updateable server fields that are compared to the /server list
+SERVER_FIELDS = [
+    field
+    for field in Server.updateable_fields
+    if field not in ('hostname', 'labels', 'vnc_password')
+]
+
+# server fields the API only changes while the server is stopped
+STOPPED_SERVER_FIELDS = ('core_number', 'memory_amount', 'plan')
+
+SYMBOLS = {'create': '+', 'update': '~'}
+
+
+def _server_field_value(field: str, value):
+    """
+    Return a server field value in a form that compares equal between the API and a spec.
+
+    e.g. the API lists core_number as '1' for a spec's 1, and firewall as 'on' for True.
+    """
+    if field in ('core_number', 'memory_amount'):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return value
+    if isinstance(value, bool):
+        if field in ('firewall', 'vnc'):
+            return 'on' if value else 'off'
+        return 'yes' if value else 'no'
+    if field == 'boot_order':
+        return ','.join(part.strip() for part in str(value).split(','))
+    return str(getattr(value, 'name', value))
+
+
+class Spec:
+    """
+    Declarative description of infrastructure, planned and applied with Plan.
+
+    Resources are given as the library's own objects and identified by their name: servers
+    by hostname, storages, server groups and tags by title/name and the rest by name.
+    They refer to each other by these names:
+
+    - Network.router: the name of a router
+    - Server.networking: interfaces whose `network` is the name of a network
+    - Storage.server: the hostname of the server to attach a new storage to
+    - ServerGroup.servers and Tag.servers: hostnames
+    - firewall_rules: hostname: list of FirewallRules
+    - LoadBalancer.networks: networks whose `uuid` is the name of a network
+
+    servers may also be a dict like the one given to create_servers, of which the values
+    are used. Networks of server interfaces and load balancers that are not named in the
+    spec or on the account are sent to the API as is, e.g. as UUIDs; other unknown names
+    raise UpCloudClientError when planning.
+    """
+
+    def __init__(
+        self,
+        servers=(),
+        storages=(),
+        networks=(),
+        routers=(),
+        server_groups=(),
+        tags=(),
+        firewall_rules=None,
+        load_balancers=(),
+    ) -> None:
+        """
+        Index the given resources by name; duplicate names raise UpCloudClientError.
+        """
+        if isinstance(servers, dict):
+            servers = servers.values()
+
+        self.routers = self._by_name('router', routers, 'name')
+        self.networks = self._by_name('network', networks, 'name')
+        self.server_groups = self._by_name('server_group', server_groups, 'title')
+        self.servers = self._by_name('server', servers, 'hostname')
+        self.storages = self._by_name('storage', storages, 'title')
+        self.tags = self._by_name('tag', tags, 'name')
+        self.firewall_rules = dict(firewall_rules or {})
+        self.load_balancers = self._by_name('load_balancer', load_balancers, 'name')
+
+    @staticmethod
+    def _by_name(kind: str, resources, attr: str) -> dict:
+        by_name = {}
+        for resource in resources:
+            name = getattr(resource, attr, None)
+            if not name:
+                raise UpCloudClientError(f'every {kind} in a Spec needs a {attr}')
+            if name in by_name:
+                raise UpCloudClientError(f"duplicate {kind} '{name}' in Spec")
+            by_name[name] = resource
+        return by_name
+
+    def resources(self, kind: str) -> dict:
+        """
+        Return name: resource of the given kind.
+        """
+        if kind == 'firewall':
+            return self.firewall_rules
+        return getattr(self, f'{kind}s')
+
+
+class PlanAction:
+    """
+    One step of a Plan: the creation or update of one resource.
+
+    - kind and name identify the resource, e.g. ('server', 'web1.example.com')
+    - operation is 'create' or 'update'
+    - changes: field: (current, desired) of the values that differ
+    - depends_on: the actions that have to succeed before this one runs
+    """
+
+    def __init__(self, kind, name, operation, run, changes=None, depends_on=()) -> None:
+        """
+        Initialize the action; run() performs it and returns the resource's UUID.
+        """
+        self.kind = kind
+        self.name = name
+        self.operation = operation
+        self.run = run
+        self.changes = changes or {}
+        self.depends_on = list(depends_on)
+
+    def __repr__(self) -> str:
+        return f'<PlanAction {self.operation} {self.kind} {self.name!r}>'
+
+    def __str__(self) -> str:
+        return f'{self.operation} {self.kind} {self.name}'
+
+
+class Plan:
+    """
+    The actions needed to bring an account to the state described by a Spec.
+
+    Live state is loaded with one list request per resource kind (and one firewall rule
+    request per existing server with rules in the spec) when the plan is made:
+
+        plan = Plan(manager, Spec(servers=CLUSTER, tags=[Tag('web', servers=[...])]))
+        print(plan.render())        # dry run
+        result = plan.apply(max_parallel=8, limits={'server': 4})
+
+    Missing resources are created and differing fields updated; firewall rules of a server
+    are brought in line with sync_firewall. New servers are waited for (with `poller`) until
+    they are started or stopped before the actions depending on them run. Changing the plan,
+    cores or memory of a server that is not stopped raises UpCloudClientError when planning,
+    unless restart=True, in which case the server is stopped, modified and started again. Resources on the account that are not in the
+    spec are never deleted, tag and server group memberships are only added to, and
+    existing storages and load balancers are only resized or left as they are.
+
+    The actions form a DAG by their references (e.g. a network depends on the creation of
+    its router), which apply() runs with independent actions in parallel.
+    """
+
+    def __init__(
+        self,
+        cloud_manager: 'CloudManager',
+        spec: Spec,
+        max_workers: int = 8,
+        restart: bool = False,
+        poller: Poller | None = None,
+    ) -> None:
+        """
+        Load the live state with max_workers threads and plan the actions.
+        """
+        self.cloud_manager = cloud_manager
+        self.spec = spec
+        self.max_workers = max_workers
+        self.restart = restart
+        self.poller = poller or Poller()
+
+        self.actions = []
+        # (kind, name): UUID of existing resources and, once applied, of created ones
+        self.uuids = {}
+        self._actions = {}
+        self._uuids_lock = threading.Lock()
+
+        live = self._load()
+        for kind in KINDS:
+            for name, resource in spec.resources(kind).items():
+                getattr(self, f'_plan_{kind}')(name, resource, live)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def __iter__(self):
+        return iter(self.actions)
+
+    #
+    # Live state
+    #
+
+    def _load(self) -> dict:
+        """
+        Return kind: name: live resource for the kinds in the spec.
+        """
+        manager = self.cloud_manager
+        spec = self.spec
+        loaders = {
+            'server': lambda: manager.api.get_request('/server')['servers']['server'],
+            'router': manager.get_routers,
+            'network': manager.get_networks,
+            'server_group': manager.get_server_groups,
+            'storage': manager.get_storages,
+            'tag': manager.get_tags,
+            'load_balancer': manager.get_loadbalancers,
+        }
+        names = {
+            'server': lambda server: server['hostname'],
+            'router': lambda router: router.name,
+            'network': lambda network: network.name,
+            'server_group': lambda group: group.title,
+            'storage': lambda storage: storage.title,
+            'tag': lambda tag: tag.name,
+            'load_balancer': lambda load_balancer: load_balancer['name'],
+        }
+        uuids = {
+            'server': lambda server: server['uuid'],
+            'tag': lambda tag: tag.name,
+            'load_balancer': lambda load_balancer: load_balancer['uuid'],
+        }
+
+        # routers and networks are also needed to resolve references from these kinds;
+        # servers are always loaded, as all other kinds may refer to them
+        referrers = {
+            'router': ('router', 'network'),
+            'network': ('network', 'server', 'load_balancer'),
+        }
+        kinds = [
+            kind
+            for kind in loaders
+            if kind == 'server' or any(spec.resources(k) for k in referrers.get(kind, (kind,)))
+        ]
+        results = run_in_parallel(
+            lambda kind: loaders[kind](), kinds, max_workers=self.max_workers
+        )
+
+        live = {kind: {} for kind in KINDS}
+        for kind, (resources, error) in zip(kinds, results, strict=True):
+            if error is not None:
+                raise error
+            for resource in resources:
+                name = names[kind](resource)
+                if name in live[kind] or (kind == 'network' and resource.type != 'private'):
+                    continue
+                live[kind][name] = resource
+                self.uuids[(kind, name)] = uuids.get(kind, lambda r: r.uuid)(resource)
+
+        servers = [
+            self.uuids[('server', hostname)]
+            for hostname in spec.firewall_rules
+            if ('server', hostname) in self.uuids
+        ]
+        results = run_in_parallel(
+            manager.get_firewall_rules, servers, max_workers=self.max_workers
+        )
+        for uuid, (rules, error) in zip(servers, results, strict=True):
+            if error is not None:
+                raise error
+            live['firewall'][uuid] = rules
+
+        return live
+
+    #
+    # Planning
+    #
+
+    def _add(self, kind, name, operation, run, changes=None, refs=()) -> None:
+        depends_on = [self._actions[ref] for ref in refs if ref in self._actions]
+        action = PlanAction(kind, name, operation, run, changes, depends_on)
+        self.actions.append(action)
+        self._actions[(kind, name)] = action
+
+    def _ref(self, kind, name, referrer) -> tuple:
+        """
+        Return the key of a referenced resource in the spec or on the account.
+        """
+        key = (kind, name)
+        if name in self.spec.resources(kind) or key in self.uuids:
+            return key
+        raise UpCloudClientError(f"{referrer} refers to an unknown {kind} '{name}'")
+
+    def _uuid(self, key) -> str:
+        with self._uuids_lock:
+            return self.uuids[key]
+
+    def _set_uuid(self, key, uuid) -> None:
+        with self._uuids_lock:
+            self.uuids[key] = uuid
+
+    def _resolve(self, kind, value):
+        """
+        Return the UUID of the resource named value, or value itself if there is none.
+        """
+        key = (kind, value)
+        if value in self.spec.resources(kind) or key in self.uuids:
+            return self._uuid(key)
+        return value
+
+    def _plan_router(self, name, router, live) -> None:
+        if name not in live['router']:
+            self._add(
+                'router', name, 'create', lambda: self.cloud_manager.create_router(name).uuid
+            )
+
+    def _plan_network(self, name, network, live) -> None:
+        manager = self.cloud_manager
+        router = getattr(network, 'router', None)
+        refs = [self._ref('router', router, f'network {name}')] if router else []
+        ip_network = network.ip_networks[0]
+        if not isinstance(ip_network, dict):
+            ip_network = ip_network.to_dict()
+
+        current = live['network'].get(name)
+        if current is None:
+
+            def create():
+                created = manager.create_network(
+                    name,
+                    network.zone,
+                    ip_network['address'],
+                    ip_network.get('dhcp'),
+                    ip_network['family'],
+                    router=self._uuid(refs[0]) if router else None,
+                    dhcp_default_route=ip_network.get('dhcp_default_route'),
+                    dhcp_dns=ip_network.get('dhcp_dns'),
+                    gateway=ip_network.get('gateway'),
+                )
+                return created.uuid
+
+            self._add('network', name, 'create', create, refs=refs)
+            return
+
+        current_router = getattr(current, 'router', None)
+        if router and self.uuids.get(refs[0]) != current_router:
+
+            def update():
+                manager.modify_network(
+                    current.uuid, None, ip_network['family'], router=self._uuid(refs[0])
+                )
+                return current.uuid
+
+            changes = {'router': (current_router, router)}
+            self._add('network', name, 'update', update, changes, refs)
+
+    def _plan_server_group(self, title, group, live) -> None:
+        manager = self.cloud_manager
+        hostnames = [str(server) for server in getattr(group, 'servers', None) or ()]
+        for hostname in hostnames:
+            self._ref('server', hostname, f'server group {title}')
+        # new servers join the group when they are created
+        existing = [
+            self.uuids[('server', hostname)]
+            for hostname in hostnames
+            if ('server', hostname) in self.uuids
+        ]
+
+        current = live['server_group'].get(title)
+        if current is None:
+
+            def create():
+                fields = {'title': title, 'servers': existing}
+                if hasattr(group, 'anti_affinity'):
+                    fields['anti_affinity'] = group.anti_affinity
+                if hasattr(group, 'labels'):
+                    fields['labels'] = group.labels
+                return manager.create_server_group(ServerGroup(**fields)).uuid
+
+            self._add('server_group', title, 'create', create)
+            return
+
+        members = (getattr(current, 'servers', None) or {}).get('server', [])
+        missing = [uuid for uuid in existing if uuid not in members]
+        if missing:
+
+            def update():
+                manager.modify_server_group(current.uuid, servers=members + missing)
+                return current.uuid
+
+            changes = {'servers': (len(members), len(members) + len(missing))}
+            self._add('server_group', title, 'update', update, changes)
+
+    def _plan_server(self, hostname, server, live) -> None:
+        manager = self.cloud_manager
+        groups = [
+            title
+            for title, group in self.spec.server_groups.items()
+            if hostname in [str(member) for member in getattr(group, 'servers', None) or ()]
+        ]
+        networks = [
+            interface.get('network')
+            for interface in self._interfaces(server)
+            if interface.get('network') in self.spec.networks
+            or ('network', interface.get('network')) in self.uuids
+        ]
+        refs = [('server_group', title) for title in groups[:1]]
+        refs += [('network', name) for name in networks]
+
+        current = live['server'].get(hostname)
+        if current is None:
+
+            def create():
+                # a retry after the server was created only waits for it again
+                key = ('server', hostname)
+                with self._uuids_lock:
+                    uuid = self.uuids.get(key)
+                if uuid is None:
+                    # a copy, as create_server populates the given server
+                    fields = server.to_dict()
+                    if isinstance(getattr(server, 'networking', None), list):
+                        fields['networking'] = [
+                            dict(interface, network=self._resolve('network', interface['network']))
+                            if 'network' in interface
+                            else interface
+                            for interface in self._interfaces(server)
+                        ]
+                    if groups:
+                        fields['server_group'] = self._uuid(('server_group', groups[0]))
+                    uuid = manager.create_server(Server(**fields)).uuid
+                    self._set_uuid(key, uuid)
+
+                # storages, tags and firewall rules are only changed once it is running
+                created = Server(uuid=uuid, state='maintenance', cloud_manager=manager)
+                created._wait_for_state_change(['started', 'stopped'], self.poller)
+                return uuid
+
+            self._add('server', hostname, 'create', create, refs=refs)
+            return
+
+        changes = {
+            field: (current[field], getattr(server, field))
+            for field in SERVER_FIELDS
+            if hasattr(server, field)
+            and field in current
+            and _server_field_value(field, current[field])
+            != _server_field_value(field, getattr(server, field))
+        }
+        stopped_fields = [field for field in STOPPED_SERVER_FIELDS if field in changes]
+        restart = bool(stopped_fields) and current.get('state') != 'stopped'
+        if restart and not self.restart:
+            raise UpCloudClientError(
+                f"server {hostname} must be stopped to change {', '.join(stopped_fields)}; "
+                'stop it first or plan with restart=True'
+            )
+        if changes:
+            fields = {field: desired for field, (_, desired) in changes.items()}
+
+            def update():
+                if not restart:
+                    manager._modify_server(current['uuid'], **fields)
+                    return current['uuid']
+
+                instance = manager.get_server(current['uuid'])
+                if instance.state != 'stopped':
+                    if instance.state == 'started':
+                        instance.stop()
+                    instance._wait_for_state_change(['stopped'], self.poller)
+                manager._modify_server(current['uuid'], **fields)
+                instance.start()
+                instance._wait_for_state_change(['started'], self.poller)
+                return current['uuid']
+
+            if restart:
+                changes['state'] = (current['state'], 'stopped, then started')
+            self._add('server', hostname, 'update', update, changes)
+
+    @staticmethod
+    def _interfaces(server) -> list:
+        interfaces = getattr(server, 'networking', None)
+        if not isinstance(interfaces, list):
+            return []
+        return [
+            interface if isinstance(interface, dict) else interface.to_dict()
+            for interface in interfaces
+        ]
+
+    def _plan_storage(self, title, storage, live) -> None:
+        manager = self.cloud_manager
+        hostname = getattr(storage, 'server', None)
+        refs = [self._ref('server', str(hostname), f'storage {title}')] if hostname else []
+
+        current = live['storage'].get(title)
+        if current is None:
+
+            def create():
+                # a new storage is in maintenance for a while, so attaching it may fail
+                # with STORAGE_STATE_ILLEGAL; only the attach is run again on a retry
+                key = ('storage', title)
+                with self._uuids_lock:
+                    uuid = self.uuids.get(key)
+                if uuid is None:
+                    uuid = manager.create_storage(
+                        storage.zone, storage.size, storage.tier, title, storage.encrypted
+                    ).uuid
+                    self._set_uuid(key, uuid)
+                if hostname:
+                    manager.attach_storage(self._uuid(refs[0]), uuid, 'disk', None)
+                return uuid
+
+            self._add('storage', title, 'create', create, refs=refs)
+            return
+
+        if int(storage.size) > int(current.size):
+
+            def update():
+                manager.modify_storage(current.uuid, storage.size, None)
+                return current.uuid
+
+            self._add('storage', title, 'update', update, {'size': (current.size, storage.size)})
+
+    def _plan_tag(self, name, tag, live) -> None:
+        manager = self.cloud_manager
+        # Tag turns the hostnames given as servers into Server(uuid=hostname)
+        hostnames = tag.server_uuids
+        refs = [self._ref('server', hostname, f'tag {name}') for hostname in hostnames]
+
+        current = live['tag'].get(name)
+        if current is None:
+
+            def create():
+                servers = [self._uuid(ref) for ref in refs]
+                manager.create_tag(name, tag.description, servers)
+                return name
+
+            self._add('tag', name, 'create', create, refs=refs)
+            return
+
+        members = current.server_uuids
+        # servers that do not exist yet are not in uuids until the plan is applied
+        missing = [ref for ref in refs if self.uuids.get(ref) not in members]
+        if missing:
+
+            def update():
+                servers = members + [self._uuid(ref) for ref in missing]
+                manager.modify_tag(name, current.description, servers, name)
+                return name
+
+            changes = {'servers': (len(members), len(members) + len(missing))}
+            self._add('tag', name, 'update', update, changes, refs)
+
+    def _plan_firewall(self, hostname, rules, live) -> None:
+        manager = self.cloud_manager
+        ref = self._ref('server', hostname, 'firewall rules')
+
+        current = live['firewall'].get(self.uuids.get(ref))
+        if current is None:
+            operation = 'create'
+            changes = {'rules': (0, len(rules))}
+        elif diff_firewall_rules(current, rules):
+            operation = 'update'
+            changes = {'rules': (len(current), len(rules))}
+        else:
+            return
+
+        def run():
+            uuid = self._uuid(ref)
+            manager.sync_firewall(uuid, rules, current_rules=current or [])
+            return uuid
+
+        self._add('firewall', hostname, operation, run, changes, [ref])
+
+    def _plan_load_balancer(self, name, load_balancer, live) -> None:
+        if name in live['load_balancer']:
+            return
+
+        body = load_balancer.to_dict()
+        refs = [
+            self._ref('network', network['uuid'], f'load balancer {name}')
+            for network in body['networks']
+            if network.get('uuid') in self.spec.networks
+        ]
+
+        def create():
+            for network in body['networks']:
+                if 'uuid' in network:
+                    network['uuid'] = self._resolve('network', network['uuid'])
+            return self.cloud_manager.api.post_request('/load-balancer', body)['uuid']
+
+        self._add('load_balancer', name, 'create', create, refs=refs)
+
+    #
+    # Output and execution
+    #
+
+    def render(self) -> str:
+        """
+        Return a human-readable description of the planned actions (a dry run).
+        """
+        if not self.actions:
+            return 'No changes.'
+
+        counts = Counter(action.operation for action in self.actions)
+        summary = ', '.join(
+            f'{counts[operation]} to {operation}' for operation in SYMBOLS if counts[operation]
+        )
+        lines = [f'Plan: {summary}']
+        for action in self.actions:
+            line = f'  {SYMBOLS[action.operation]} {action.kind} {action.name}'
+            if action.depends_on:
+                line += f" (after {', '.join(f'{a.kind} {a.name}' for a in action.depends_on)})"
+            lines.append(line)
+            for field, (current, desired) in action.changes.items():
+                lines.append(f'      {field}: {current} -> {desired}')
+        return '\n'.join(lines)
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def apply(self, max_parallel: int = 8, limits: dict | None = None, retries: int = 5):
+        """
+        Run the actions, starting each as soon as the actions it depends on have succeeded.
+
+        - max_parallel: maximum number of actions running at a time
+        - limits: kind: maximum number of running actions of that kind, e.g. {'server': 4}
+        - retries: attempts per action for transient API errors, see retry_with_backoff
+
+        Returns a BulkResult of the resources' UUIDs in the order of `actions`. A failed
+        action is in `.errors`, as is every action depending on it, which is not run; the
+        other actions are not affected. Make a new Plan to retry after a partial failure.
+        """
+        limits = limits or {}
+        dependents = {action: [] for action in self.actions}
+        pending = {}
+        for action in self.actions:
+            pending[action] = len(action.depends_on)
+            for dependency in action.depends_on:
+                dependents[dependency].append(action)
+
+        ready = deque(action for action in self.actions if not pending[action])
+        running = {}
+        running_kinds = Counter()
+        results = {}
+        errors = {}
+
+        def _skip(failed, action):
+            for dependent in dependents[action]:
+                if dependent not in errors:
+                    errors[dependent] = UpCloudClientError(f'not run: {failed} failed')
+                    _skip(failed, dependent)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            while ready or running:
+                deferred = []
+                while ready and len(running) < max_parallel:
+                    action = ready.popleft()
+                    if running_kinds[action.kind] >= limits.get(action.kind, max_parallel):
+                        deferred.append(action)
+                        continue
+                    running_kinds[action.kind] += 1
+                    future = executor.submit(retry_with_backoff, action.run, n=retries)
+                    running[future] = action
+                ready.extendleft(reversed(deferred))
+                if not running:
+                    raise UpCloudClientError('limits must allow at least one action per kind')
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    action = running.pop(future)
+                    running_kinds[action.kind] -= 1
+                    try:
+                        results[action] = future.result()
+                    except Exception as e:
+                        errors[action] = e
+                        _skip(action, action)
+                        continue
+
+                    self._set_uuid((action.kind, action.name), results[action])
+                    for dependent in dependents[action]:
+                        pending[dependent] -= 1
+                        if not pending[dependent]:
+                            ready.append(dependent)
+
+        return BulkResult([results.get(action) for action in self.actions], errors)
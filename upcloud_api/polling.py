@@ -0,0 +1,97 @@
+import asyncio
+import random
+import time
+
+from upcloud_api.errors import UpCloudCancelledError, UpCloudTimeoutError
+
+
+class Poller:
+    """
+    Waits until a condition holds by refreshing it at increasing intervals.
+
+    The first polls are fast (initial_interval) and the interval then grows by multiplier
+    up to max_interval. Each interval is randomised by +-jitter (a fraction) so that many
+    waiters do not poll the API in lockstep.
+
+    - timeout: overall deadline in seconds; UpCloudTimeoutError is raised when it passes
+    - cancel_event: a threading.Event; setting it aborts the wait with UpCloudCancelledError
+
+    A Poller holds no state between waits, so one instance can be shared.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float = 1.0,
+        max_interval: float = 10.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.2,
+        timeout: float | None = None,
+        cancel_event=None,
+    ) -> None:
+        """
+        Initialize the poller. See the class docstring for the parameters.
+        """
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.timeout = timeout
+        self.cancel_event = cancel_event
+
+    def intervals(self):
+        """
+        Yield the (jittered) sleep intervals between polls, forever.
+        """
+        interval = self.initial_interval
+        while True:
+            yield interval * random.uniform(1 - self.jitter, 1 + self.jitter)  # noqa: S311
+            interval = min(interval * self.multiplier, self.max_interval)
+
+    def _next_sleep(self, intervals, deadline):
+        """
+        Return the next sleep interval, shortened to the deadline, or raise if it has passed.
+        """
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise UpCloudCancelledError('wait was cancelled')
+
+        delay = next(intervals)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise UpCloudTimeoutError(f'condition not met within {self.timeout} seconds')
+            delay = min(delay, remaining)
+        return delay
+
+    def _deadline(self):
+        return time.monotonic() + self.timeout if self.timeout is not None else None
+
+    def wait(self, is_done, refresh) -> None:
+        """
+        Block until is_done() returns True, calling refresh() between checks.
+
+        is_done may raise to abort the wait (e.g. when a resource enters an error state).
+        """
+        intervals = self.intervals()
+        deadline = self._deadline()
+
+        while not is_done():
+            delay = self._next_sleep(intervals, deadline)
+            if self.cancel_event is not None:
+                if self.cancel_event.wait(delay):
+                    raise UpCloudCancelledError('wait was cancelled')
+            else:
+                time.sleep(delay)
+            refresh()
+
+    async def async_wait(self, is_done, refresh) -> None:
+        """
+        Await until is_done() returns True, awaiting refresh() between checks.
+
+        In addition to cancel_event, the wait can be cancelled by cancelling its task.
+        """
+        intervals = self.intervals()
+        deadline = self._deadline()
+
+        while not is_done():
+            await asyncio.sleep(self._next_sleep(intervals, deadline))
+            await refresh()
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from upcloud_api.errors import UpCloudClientError
+
+
+class TokenBucket:
+    """
+    Token bucket that refills at `rate` tokens per second up to `burst` tokens.
+
+    Taking a token never blocks: the bucket goes into debt instead and returns how long
+    the caller has to wait for its token, so that concurrent callers are paced one after
+    another instead of all retrying at once.
+    """
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float | None = None, now: float = 0.0) -> None:
+        """
+        Initialize a full bucket, last refilled at now.
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = now
+
+    def take(self, now: float, tokens: float = 1) -> float:
+        """
+        Take tokens at time now and return the number of seconds to wait before using them.
+        """
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated = now
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Client-side request rate limiter for API.
+
+    - rate, burst: requests per second (and burst size) for all requests
+    - read_rate, read_burst: requests per second for GET requests
+    - write_rate, write_burst: requests per second for POST, PUT, PATCH and DELETE requests
+    - path: share the buckets between processes through this file (requires fcntl)
+
+    A request waits for a token from the global bucket and from the bucket of its kind;
+    buckets without a rate are not limited. One RateLimiter can be shared by any number of
+    threads and CloudManager instances in a process.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: float | None = None,
+        read_rate: float | None = None,
+        read_burst: float | None = None,
+        write_rate: float | None = None,
+        write_burst: float | None = None,
+        path: str | None = None,
+    ) -> None:
+        """
+        Initialize the buckets that have a rate. See the class docstring for the parameters.
+        """
+        if path is not None and fcntl is None:
+            raise UpCloudClientError('Sharing a RateLimiter between processes requires fcntl.')
+
+        self.path = path
+        clock = time.time() if path is not None else time.monotonic()
+        limits = {
+            'global': (rate, burst),
+            'read': (read_rate, read_burst),
+            'write': (write_rate, write_burst),
+        }
+        self.buckets = {
+            name: TokenBucket(bucket_rate, bucket_burst, now=clock)
+            for name, (bucket_rate, bucket_burst) in limits.items()
+            if bucket_rate
+        }
+        self._lock = threading.Lock()
+
+    def _bucket_names(self, method: str) -> list:
+        kind = 'read' if method == 'GET' else 'write'
+        return [name for name in ('global', kind) if name in self.buckets]
+
+    def reserve(self, method: str = 'GET') -> float:
+        """
+        Reserve a token for a request and return the number of seconds to wait before sending.
+        """
+        names = self._bucket_names(method)
+        if not names:
+            return 0.0
+
+        with self._lock:
+            if self.path is None:
+                now = time.monotonic()
+                return max(self.buckets[name].take(now) for name in names)
+            return self._reserve_shared(names)
+
+    def _reserve_shared(self, names: list) -> float:
+        """
+        Take tokens from buckets whose state is stored in a file locked with flock.
+
+        Wall clock time is used as it is comparable between processes.
+        """
+        with open(self.path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or '{}')
+                except ValueError:
+                    state = {}
+
+                now = time.time()
+                delay = 0.0
+                for name in names:
+                    bucket = self.buckets[name]
+                    if name in state:
+                        bucket.tokens, bucket.updated = state[name]
+                    delay = max(delay, bucket.take(now))
+                    state[name] = [bucket.tokens, bucket.updated]
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+        return delay
+
+    def acquire(self, method: str = 'GET') -> None:
+        """
+        Block until a request may be sent.
+        """
+        delay = self.reserve(method)
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,147 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from upcloud_api.errors import UpCloudAPIError, UpCloudTimeoutError
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'PUT', 'DELETE'})
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header (delay in seconds or an HTTP date) into seconds from now.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed API request is retried.
+
+    - max_attempts: number of attempts in total, including the first one
+    - base_delay, max_delay: exponential backoff with full jitter, i.e. a random delay
+      between 0 and min(max_delay, base_delay * 2 ** retry) seconds
+    - deadline: give up once this many seconds have passed since the first attempt of a call;
+      the timeout of each attempt is capped to the time left, and an attempt that would
+      start after the deadline raises UpCloudTimeoutError instead
+    - retry_status_codes: HTTP status codes that are retried
+    - error_codes: per API error_code rules that override the status code: True always
+      retries the error (for any method, as the API rejected the request), False never does
+    - retry_non_idempotent: also retry POST and PATCH requests after failures that may have
+      been applied by the API (5xx responses, dropped connections, read timeouts)
+    - respect_retry_after: wait at least as long as a Retry-After header asks
+
+    Requests that never reached the API (connect timeouts) and rate limited (429) requests
+    are safe to retry for any method.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        deadline: float | None = None,
+        retry_status_codes=RETRY_STATUS_CODES,
+        error_codes: dict | None = None,
+        retry_non_idempotent: bool = False,
+        respect_retry_after: bool = True,
+    ) -> None:
+        """
+        Initialize the policy. See the class docstring for the parameters.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_status_codes = frozenset(retry_status_codes)
+        self.error_codes = dict(error_codes or {})
+        self.retry_non_idempotent = retry_non_idempotent
+        self.respect_retry_after = respect_retry_after
+
+    def deadline_at(self) -> float | None:
+        """
+        Return the time (time.monotonic) a call started now must finish by, if any.
+        """
+        if self.deadline is None:
+            return None
+        return time.monotonic() + self.deadline
+
+    def attempt_timeout(self, timeout, deadline_at: float | None):
+        """
+        Cap the timeout of an attempt to the time left before the deadline.
+
+        Raises UpCloudTimeoutError if no time is left, as the attempt could not finish.
+        """
+        if deadline_at is None or isinstance(timeout, tuple):
+            return timeout
+
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise UpCloudTimeoutError(f'request not finished within {self.deadline} seconds')
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def is_retryable(self, method: str, error: Exception, sent: bool = True) -> bool:
+        """
+        Return True if a request that failed with error may be retried.
+
+        error is an UpCloudAPIError or a transport error; sent is False when the request
+        is known not to have reached the API.
+        """
+        if isinstance(error, UpCloudAPIError):
+            rule = self.error_codes.get(error.error_code)
+            if rule is not None:
+                return rule
+            if error.status_code not in self.retry_status_codes:
+                return False
+            if error.status_code == 429:
+                return True
+        elif not sent:
+            return True
+
+        return method in IDEMPOTENT_METHODS or self.retry_non_idempotent
+
+    def backoff(self, retry: int) -> float:
+        """
+        Return a randomised delay before the given retry (0 for the first one).
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))  # noqa: S311
+
+    def next_delay(
+        self,
+        method: str,
+        error: Exception,
+        attempt: int,
+        deadline_at: float | None = None,
+        sent: bool = True,
+    ) -> float | None:
+        """
+        Return the number of seconds to wait after the given attempt (starting from 1) failed,
+        or None if the error should be raised instead.
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(method, error, sent):
+            return None
+
+        delay = self.backoff(attempt - 1)
+        retry_after = getattr(error, 'retry_after', None)
+        if self.respect_retry_after and retry_after is not None:
+            delay = max(delay, retry_after)
+
+        if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+            return None
+        return delay
@@ -1,8 +1,8 @@
-from time import sleep
 from typing import TYPE_CHECKING, Any
 
 from upcloud_api.firewall import FirewallRule
 from upcloud_api.ip_address import IPAddress
+from upcloud_api.polling import Poller
 from upcloud_api.server_group import ServerGroup
 from upcloud_api.storage import STORAGE_OSES_WHICH_REQUIRE_METADATA, Storage
 from upcloud_api.upcloud_resource import UpCloudResource
@@ -70,6 +70,61 @@ class ServerNetworkInterface(UpCloudResource):
         return body
 
 
+class _RawSubobjects:
+    """
+    Raw JSON of a Server's IP-addresses or storages, to be turned into objects on first use.
+    """
+
+    __slots__ = ('data', 'cloud_manager')
+
+    def __init__(self, data, cloud_manager) -> None:
+        self.data = data
+        self.cloud_manager = cloud_manager
+
+
+class _LazySubobjects:
+    """
+    Descriptor for Server.ip_addresses and Server.storage_devices.
+
+    Assigning _RawSubobjects keeps the API's JSON as is; the objects are built with
+    `build(data, cloud_manager)` when the attribute is first read and then cached in the
+    instance's __dict__. Assigning a list stores it directly.
+    """
+
+    def __init__(self, build) -> None:
+        self.build = build
+
+    def __set_name__(self, owner, name) -> None:
+        self.name = name
+        self.raw_name = f'_raw_{name}'
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        values = instance.__dict__
+        if self.name in values:
+            return values[self.name]
+
+        raw = values.get(self.raw_name)
+        if raw is None:
+            raise AttributeError(f"'Server' object has no attribute '{self.name}'")
+
+        # setdefault: threads reading at the same time get the same list
+        objs = values.setdefault(self.name, self.build(raw.data, raw.cloud_manager))
+        values.pop(self.raw_name, None)
+        return objs
+
+    def __set__(self, instance, value) -> None:
+        values = instance.__dict__
+        values.pop(self.name, None)
+        values.pop(self.raw_name, None)
+        if isinstance(value, _RawSubobjects):
+            values[self.raw_name] = value
+        else:
+            values[self.name] = value
+
+
 # TODO: should this inherit from UpcloudResource too?
 class Server:
     """
@@ -123,6 +178,14 @@ class Server:
         'vnc_password',
     ]
 
+    # built from the API's JSON on first access
+    ip_addresses = _LazySubobjects(
+        lambda data, cloud_manager: IPAddress._create_ip_address_objs(data, cloud_manager)
+    )
+    storage_devices = _LazySubobjects(
+        lambda data, cloud_manager: Storage._create_storage_objs(data, cloud_manager)
+    )
+
     def __init__(self, server=None, **kwargs) -> None:
         """
         Initialize Server.
@@ -131,19 +194,28 @@ class Server:
         Set title = hostname if title not given.
         """
         object.__setattr__(self, 'populated', False)
+        # updateable fields assigned since the last sync with the API, see save()
+        object.__setattr__(self, '_changed_fields', set())
         self._reset(server, **kwargs)
 
         if not hasattr(self, 'title') and hasattr(self, 'hostname'):
-            self.title = self.hostname
+            object.__setattr__(self, 'title', self.hostname)
 
     def __setattr__(self, name: str, value: Any) -> None:
         """
-        Override to prevent updating readonly fields.
+        Override to prevent updating readonly fields and to track changed fields.
+
+        Assigning a value equal to the current one does not count as a change, except for
+        dicts and lists, which may have been modified in place before being assigned back.
         """
         if name not in self.updateable_fields:
             raise Exception(f"'{name}' is a readonly field")
-        else:
-            object.__setattr__(self, name, value)
+
+        missing = object()
+        current = getattr(self, name, missing)
+        if current is missing or current != value or isinstance(value, (dict, list)):
+            self._changed_fields.add(name)
+        object.__setattr__(self, name, value)
 
     def _reset(self, server, **kwargs) -> None:
         """
@@ -153,7 +225,8 @@ class Server:
         - kwargs: any meta fields such as cloud_manager and populated.
 
         Note: storage_devices and ip_addresses may be given in server as dicts or
-        in kwargs as lists containing Storage and IPAddress objects.
+        in kwargs as lists containing Storage and IPAddress objects. Dicts are only turned
+        into objects when the attribute is first accessed.
         """
         if server:
             # handle storage, ip_address dicts and tags if they exist
@@ -161,6 +234,8 @@ class Server:
 
             for key in server:
                 object.__setattr__(self, key, server[key])
+            # the given values replace any unsaved local changes
+            self._changed_fields.difference_update(server)
 
         for key in kwargs:
             object.__setattr__(self, key, kwargs[key])
@@ -171,8 +246,8 @@ class Server:
 
         Note: syncs ip_addresses and storage_devices too (/server/uuid endpoint)
         """
-        server, IPAddresses, storages = self.cloud_manager.get_server_data(self.uuid)
-        self._reset(server, ip_addresses=IPAddresses, storage_devices=storages, populated=True)
+        data = self.cloud_manager.api.get_request(f'/server/{self.uuid}')
+        self._reset(data['server'], cloud_manager=self.cloud_manager, populated=True)
         return self
 
     def __str__(self) -> str:
@@ -186,18 +261,29 @@ class Server:
         """
         Sync local changes in server's attributes to the API.
 
+        Only the fields assigned since the server was fetched or last saved are sent; if
+        there are none, no request is made.
+
         Note: DOES NOT sync IPAddresses and storage_devices,
         use add_ip, add_storage, remove_ip, remove_storage instead.
         """
-        # dict comprehension that also works with 2.6
-        # http://stackoverflow.com/questions/21069668/alternative-to-dict-comprehension-prior-to-python-2-7
-        kwargs = {
-            field: getattr(self, field) for field in self.updateable_fields if hasattr(self, field)
-        }
+        kwargs = self._changed_kwargs()
+        if not kwargs:
+            return
 
-        self.cloud_manager.modify_server(self.uuid, **kwargs)
+        self.cloud_manager._modify_server(self.uuid, **kwargs)
         self._reset(kwargs)
 
+    def _changed_kwargs(self) -> dict:
+        """
+        Return field: value of the fields changed since the last sync, for modify_server.
+        """
+        return {
+            field: getattr(self, field)
+            for field in self.updateable_fields
+            if field in self._changed_fields
+        }
+
     def destroy(self, delete_storages=False):
         """
         Destroy the server.
@@ -363,6 +449,14 @@ class Server:
         firewall_rule_bodies = [FirewallRule.to_dict() for FirewallRule in FirewallRules]
         return self.cloud_manager.configure_firewall(self, firewall_rule_bodies)
 
+    def sync_firewall(self, FirewallRules, replace=True):
+        """
+        Make the server's firewall rules equal FirewallRules with as few requests as possible.
+
+        See: CloudManager.sync_firewall
+        """
+        return self.cloud_manager.sync_firewall(self, FirewallRules, replace=replace)
+
     def prepare_post_body(self):
         """
         Prepare a JSON serializable dict from a Server instance with nested.
@@ -474,7 +568,10 @@ class Server:
         Includes storages and IP-addresses.
         Use prepare_post_body for POST and .save() for PUT.
         """
-        fields = dict(vars(self).items())
+        fields = {key: value for key, value in vars(self).items() if not key.startswith('_')}
+        for name in ('ip_addresses', 'storage_devices'):
+            if hasattr(self, name):
+                fields[name] = getattr(self, name)
 
         if self.populated:
             fields['ip_addresses'] = []
@@ -499,7 +596,8 @@ class Server:
                 )
 
         del fields['populated']
-        del fields['cloud_manager']
+        # local servers (e.g. of a Spec) have no cloud manager
+        fields.pop('cloud_manager', None)
         return fields
 
     def get_ip(self, access='public', addr_family=None):
@@ -553,31 +651,40 @@ class Server:
         """Alias for get_ip('private')"""
         return self.get_ip('private', addr_family, *args, **kwargs)
 
-    def _wait_for_state_change(self, target_states, update_interval=10):
+    def _refresh_state(self) -> None:
         """
-        Blocking wait until target_state reached. update_interval is in seconds.
+        Update only the state field from the API without rebuilding the rest of the object.
+        """
+        object.__setattr__(self, 'state', self.cloud_manager.get_server_state(self.uuid))
 
-        Warning: state change must begin before calling this method.
+    def _is_in_state(self, target_states) -> bool:
+        if self.state == 'error':
+            raise Exception('server is in error state')
+        return self.state in target_states
+
+    def _wait_for_state_change(self, target_states, poller: Poller | None = None):
         """
-        while self.state not in target_states:
-            if self.state == 'error':
-                raise Exception('server is in error state')
+        Blocking wait until target_state reached.
 
-            # update server state every 10s
-            sleep(update_interval)
-            self.populate()
+        Polls the server state with fast initial polls and backoff (see: Poller).
+        Pass a poller to set an overall timeout or a cancel_event.
+
+        Warning: state change must begin before calling this method.
+        """
+        poller = poller or Poller()
+        poller.wait(lambda: self._is_in_state(target_states), self._refresh_state)
 
-    def ensure_started(self):
+    def ensure_started(self, poller: Poller | None = None):
         """
         Start a server and waits (blocking wait) until it is fully started.
         """
         # server is either starting or stopping (or error)
         if self.state in ['maintenance', 'error']:
-            self._wait_for_state_change(['stopped', 'started'])
+            self._wait_for_state_change(['stopped', 'started'], poller)
 
         if self.state == 'stopped':
             self.start()
-            self._wait_for_state_change(['started'])
+            self._wait_for_state_change(['started'], poller)
 
         if self.state == 'started':
             return True
@@ -585,7 +692,7 @@ class Server:
             # something went wrong, fail explicitly
             raise Exception('unknown server state: ' + self.state)
 
-    def stop_and_destroy(self, sync=True):
+    def stop_and_destroy(self, sync=True, poller: Poller | None = None):
         """
         Destroy a server and its storages. Stops the server before destroying.
 
@@ -620,7 +727,7 @@ class Server:
 
         # server is either starting or stopping (or error)
         if self.state in ['maintenance', 'error']:
-            self._wait_for_state_change(['stopped', 'started'])
+            self._wait_for_state_change(['stopped', 'started'], poller)
 
         if self.state == 'started':
             try_it_n_times(
@@ -629,7 +736,7 @@ class Server:
                 custom_error='stopping server failed',
             )
 
-            self._wait_for_state_change(['stopped'])
+            self._wait_for_state_change(['stopped'], poller)
 
         if self.state == 'stopped':
             _self_destruct()
@@ -643,12 +750,10 @@ class Server:
         tags = server.pop('tags', None)
 
         if ip_data:
-            ip_addresses = IPAddress._create_ip_address_objs(ip_data, cloud_manager=cloud_manager)
-            server['ip_addresses'] = ip_addresses
+            server['ip_addresses'] = _RawSubobjects(ip_data, cloud_manager)
 
         if storage_data:
-            storages = Storage._create_storage_objs(storage_data, cloud_manager=cloud_manager)
-            server['storage_devices'] = storages
+            server['storage_devices'] = _RawSubobjects(storage_data, cloud_manager)
 
         if tags and 'tag' in tags:
             server['tags'] = tags['tag']
@@ -661,4 +766,23 @@ class Server:
         server_dict.update(server)
         server_dict['cloud_manager'] = cloud_manager
 
-        return Server(**server_dict)
+        return cls(**server_dict)
+
+    @classmethod
+    def _from_api(cls, server, cloud_manager, **kwargs) -> 'Server':
+        """
+        Return an instance for a server dict from the API.
+
+        With an identity map (see: IdentityMap), the existing instance with the same UUID is
+        updated in place and returned instead of a new one.
+        """
+        identity_map = getattr(cloud_manager, 'identity_map', None)
+        if identity_map is None or not server.get('uuid'):
+            return cls(server, cloud_manager=cloud_manager, **kwargs)
+
+        return identity_map.load(
+            cls,
+            server['uuid'],
+            lambda: cls(server, cloud_manager=cloud_manager, **kwargs),
+            lambda instance: instance._reset(server, cloud_manager=cloud_manager, **kwargs),
+        )
@@ -41,12 +41,8 @@ class ServerGroup(UpCloudResource):
             body['anti_affinity'] = f"{self.anti_affinity}"
 
         if hasattr(self, 'servers'):
-            servers = []
-            for server in self.servers:
-                if isinstance(server, server.Server) and hasattr(server, 'uuid'):
-                    servers.append(server.uuid)
-                else:
-                    servers.append(server)
+            # Server objects and UUID strings both turn into UUIDs with str()
+            body['servers'] = {'server': [str(server) for server in self.servers]}
 
         if hasattr(self, 'labels'):
             dict_labels = {'label': []}
@@ -0,0 +1,445 @@
+import copy
+import inspect
+from array import array
+from itertools import chain, compress
+
+from upcloud_api.errors import UpCloudClientError
+from upcloud_api.server import Server
+from upcloud_api.utils import BulkResult, run_in_parallel
+
+SCALAR_COLUMNS = ('uuid', 'hostname', 'title', 'zone', 'state', 'plan')
+NUMBER_COLUMNS = ('core_number', 'memory_amount')
+SET_COLUMNS = ('tags', 'labels')
+
+
+def _mask_of(rows, size: int) -> int:
+    """
+    Return a bitmask with the bits of the given row numbers set.
+    """
+    bits = bytearray(b'0') * size
+    for row in rows:
+        bits[row] = 0x31  # '1'
+    bits.reverse()
+    return int(bits, 2) if size else 0
+
+
+def _rows_of(mask: int):
+    """
+    Yield the row numbers of the bits set in mask, in ascending order.
+    """
+    bits = bin(mask)[:1:-1]
+    row = bits.find('1')
+    while row != -1:
+        yield row
+        row = bits.find('1', row + 1)
+
+
+def _to_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+class _Column:
+    """
+    Dictionary-encoded column: the distinct values and an array of one code per row.
+
+    Codes are stored in the smallest array type that fits the number of distinct values.
+    While that is one byte per code, bitmasks are built in C by translating the codes;
+    otherwise from the row numbers of each code, collected in one pass on first use.
+    """
+
+    __slots__ = ('values', 'index', 'codes', '_rows', '_masks')
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty column.
+        """
+        self.values = []
+        self.index = {}
+        self.codes = array('B')
+        self._rows = None
+        self._masks = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _code(self, value) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+            if code == 1 << 8:
+                self.codes = array('H', self.codes)
+            elif code == 1 << 16:
+                self.codes = array('I', self.codes)
+        return code
+
+    def _changed(self) -> None:
+        self._rows = None
+        self._masks.clear()
+
+    def append(self, value) -> None:
+        """
+        Append a row.
+        """
+        code = self._code(value)
+        self.codes.append(code)
+        self._changed()
+
+    def value(self, row: int):
+        """
+        Return the value of a row.
+        """
+        return self.values[self.codes[row]]
+
+    def _code_rows(self):
+        """
+        Return the row number of each code in self.codes.
+        """
+        return range(len(self.codes))
+
+    def _row_lists(self) -> list:
+        if self._rows is None:
+            rows = [[] for _ in self.values]
+            for row, code in zip(self._code_rows(), self.codes, strict=True):
+                rows[code].append(row)
+            self._rows = rows
+        return self._rows
+
+    def mask(self, codes) -> int:
+        """
+        Return the bitmask of the rows having any of the given codes.
+
+        Masks of single codes are cached until the next row is appended.
+        """
+        if len(codes) == 1 and codes[0] in self._masks:
+            return self._masks[codes[0]]
+
+        if self.codes.typecode == 'B':
+            mask = self._translated_mask(codes)
+        else:
+            row_lists = self._row_lists()
+            mask = _mask_of(chain.from_iterable(row_lists[code] for code in codes), len(self))
+
+        if len(codes) == 1:
+            self._masks[codes[0]] = mask
+        return mask
+
+    def _translated_mask(self, codes) -> int:
+        table = bytearray(b'0') * 256
+        for code in codes:
+            table[code] = 0x31  # '1'
+        bits = self.codes.tobytes().translate(table)
+        return int(bits[::-1], 2) if bits else 0
+
+    def codes_matching(self, condition) -> list:
+        """
+        Return the codes of the values matching a condition: a value, a list, tuple or set of
+        values, or a callable that is called once for each distinct value.
+        """
+        if callable(condition):
+            return [code for code, value in enumerate(self.values) if condition(value)]
+        if isinstance(condition, (list, tuple, set, frozenset)):
+            return [self.index[value] for value in condition if value in self.index]
+        return [self.index[condition]] if condition in self.index else []
+
+
+class _SetColumn(_Column):
+    """
+    Dictionary-encoded column with any number of values per row (e.g. tags).
+
+    The codes of row i are codes[offsets[i]:offsets[i + 1]] and rows holds the row number
+    of each code.
+    """
+
+    __slots__ = ('offsets', 'rows')
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty column.
+        """
+        super().__init__()
+        self.offsets = array('I', [0])
+        self.rows = array('I')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def append(self, values) -> None:
+        """
+        Append a row with the given values.
+        """
+        # codes first: a new value may replace self.codes with a wider array
+        codes = [self._code(value) for value in values]
+        self.rows.extend([len(self)] * len(codes))
+        self.codes.extend(codes)
+        self.offsets.append(len(self.codes))
+        self._changed()
+
+    def value(self, row: int) -> list:
+        """
+        Return the values of a row.
+        """
+        codes = self.codes[self.offsets[row] : self.offsets[row + 1]]
+        return [self.values[code] for code in codes]
+
+    def _code_rows(self):
+        return self.rows
+
+    def _translated_mask(self, codes) -> int:
+        table = bytearray(256)
+        for code in codes:
+            table[code] = 1
+        flags = self.codes.tobytes().translate(table)
+        return _mask_of(compress(self.rows, flags), len(self))
+
+
+class ServerTable:
+    """
+    Columnar, in-memory table of servers for fast queries over large accounts.
+
+    Built from /server list data (see: ServerManager.get_server_table). Each column (uuid,
+    hostname, title, zone, state, plan, core_number, memory_amount, tags and labels) is
+    dictionary-encoded into an array of codes, and filters work on bitmasks of rows: a
+    condition is evaluated once per distinct value instead of once per server, and combining
+    conditions is a bitwise operation.
+
+        table = manager.get_server_table()
+        big = table.filter(zone='fi-hel1', state='started', tags='web', core_number=lambda n: n > 4)
+        big.column('uuid')
+        table.count_by('zone')
+        big.servers()
+
+    Filtering returns a new ServerTable that shares the columns with the original one, so
+    tables are cheap to derive and can be combined with `&`, `|` and `-`. core_number and
+    memory_amount are stored as ints; labels as (key, value) pairs.
+    """
+
+    def __init__(self, servers=(), cloud_manager=None, server_class=Server) -> None:
+        """
+        Initialize a table from an iterable of server dicts as returned by the API.
+
+        Objects returned by `servers()` are instances of server_class.
+        """
+        self.cloud_manager = cloud_manager
+        self.server_class = server_class
+        self._columns = {name: _Column() for name in SCALAR_COLUMNS + NUMBER_COLUMNS}
+        self._columns.update({name: _SetColumn() for name in SET_COLUMNS})
+        self._size = 0
+        self._mask = None  # None: all rows
+
+        for server in servers:
+            self.append(server)
+
+    def append(self, server: dict) -> None:
+        """
+        Add a server given as a dict as returned by the API.
+        """
+        if self._mask is not None:
+            raise UpCloudClientError('Servers can only be added to the full table.')
+
+        for name in SCALAR_COLUMNS:
+            self._columns[name].append(server.get(name))
+        for name in NUMBER_COLUMNS:
+            self._columns[name].append(_to_int(server.get(name)))
+
+        tags = server.get('tags') or {}
+        labels = server.get('labels') or {}
+        self._columns['tags'].append(tags.get('tag', []) if isinstance(tags, dict) else tags)
+        self._columns['labels'].append(
+            (label['key'], label['value'])
+            for label in (labels.get('label', []) if isinstance(labels, dict) else labels)
+        )
+        self._size += 1
+
+    @property
+    def mask(self) -> int:
+        """
+        Bitmask of the rows in this table.
+        """
+        return (1 << self._size) - 1 if self._mask is None else self._mask
+
+    def _view(self, mask: int) -> 'ServerTable':
+        table = copy.copy(self)
+        table._mask = mask
+        return table
+
+    def _column(self, name: str) -> _Column:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise UpCloudClientError(f'Unknown ServerTable column: {name}') from None
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __iter__(self):
+        """
+        Yield the rows as dicts of column: value.
+        """
+        for row in _rows_of(self.mask):
+            yield self._row(row)
+
+    def __contains__(self, uuid) -> bool:
+        code = self._columns['uuid'].index.get(str(uuid))
+        if code is None:
+            return False
+        return bool(self._columns['uuid'].mask([code]) & self.mask)
+
+    def _check_same_table(self, other: 'ServerTable') -> None:
+        if other._columns is not self._columns:
+            raise UpCloudClientError(
+                'Only tables derived from the same ServerTable can be combined.'
+            )
+
+    def __and__(self, other: 'ServerTable') -> 'ServerTable':
+        self._check_same_table(other)
+        return self._view(self.mask & other.mask)
+
+    def __or__(self, other: 'ServerTable') -> 'ServerTable':
+        self._check_same_table(other)
+        return self._view(self.mask | other.mask)
+
+    def __sub__(self, other: 'ServerTable') -> 'ServerTable':
+        self._check_same_table(other)
+        return self._view(self.mask & ~other.mask)
+
+    def _row(self, row: int) -> dict:
+        values = {name: column.value(row) for name, column in self._columns.items()}
+        values['labels'] = dict(values['labels'])
+        return values
+
+    def column(self, name: str) -> list:
+        """
+        Return the values of a column, one per row.
+        """
+        column = self._column(name)
+        return [column.value(row) for row in _rows_of(self.mask)]
+
+    def filter(self, tags_has_one=None, **conditions) -> 'ServerTable':
+        """
+        Return a table of the rows matching all conditions, given as column=condition.
+
+        - scalar and number columns: a value, a list, tuple or set of accepted values, or a
+          callable returning True for accepted values (e.g. core_number=lambda n: n > 4)
+        - tags: a tag or a list of tags that rows must all have; tags_has_one: a list of tags
+          of which rows must have at least one (Tag objects or strings, as in get_servers)
+        - labels: a dict of key: value that rows must all have; a value of None matches any
+          value of the key
+        """
+        mask = self.mask
+        if tags_has_one is not None:
+            mask &= self._tags_mask(tags_has_one, every=False)
+
+        for name, condition in conditions.items():
+            if not mask:
+                break
+            if name == 'tags':
+                if isinstance(condition, (list, tuple, set, frozenset)):
+                    mask &= self._tags_mask(condition, every=True)
+                else:
+                    mask &= self._tags_mask([condition], every=True)
+            elif name == 'labels':
+                mask &= self._labels_mask(condition)
+            else:
+                column = self._column(name)
+                mask &= column.mask(column.codes_matching(condition))
+
+        return self._view(mask)
+
+    def _tags_mask(self, tags, every: bool) -> int:
+        column = self._columns['tags']
+        mask = self.mask if every else 0
+        for tag in tags:
+            code = column.index.get(str(tag))
+            tag_mask = column.mask([code]) if code is not None else 0
+            mask = mask & tag_mask if every else mask | tag_mask
+        return mask
+
+    def _labels_mask(self, labels: dict) -> int:
+        column = self._columns['labels']
+        mask = self.mask
+        for key, value in labels.items():
+            if value is None:
+                codes = [code for code, (k, _) in enumerate(column.values) if k == key]
+            else:
+                code = column.index.get((key, value))
+                codes = [code] if code is not None else []
+            mask &= column.mask(codes)
+        return mask
+
+    def group_by(self, name: str) -> dict:
+        """
+        Return a dict of value: table of the rows having that value in a column.
+
+        Grouping by tags or labels puts a row in the group of each of its tags or
+        (key, value) labels.
+        """
+        column = self._column(name)
+        groups = {}
+        for code, value in enumerate(column.values):
+            mask = column.mask([code]) & self.mask
+            if mask:
+                groups[value] = self._view(mask)
+        return groups
+
+    def group_by_label(self, key: str) -> dict:
+        """
+        Return a dict of label value: table of the rows having the label key with that value.
+        """
+        return {
+            value: table
+            for (label_key, value), table in self.group_by('labels').items()
+            if label_key == key
+        }
+
+    def count_by(self, name: str) -> dict:
+        """
+        Return a dict of value: number of rows having that value in a column.
+        """
+        return {value: len(table) for value, table in self.group_by(name).items()}
+
+    def _instances(self) -> BulkResult:
+        """
+        Return unpopulated server_class instances for the rows.
+        """
+        server_list = BulkResult()
+        for row in _rows_of(self.mask):
+            values = {name: value for name, value in self._row(row).items() if value is not None}
+            for name in NUMBER_COLUMNS:
+                if name in values:
+                    values[name] = str(values[name])
+            values['tags'] = {'tag': values['tags']}
+            values['labels'] = {
+                'label': [{'key': key, 'value': value} for key, value in values['labels'].items()]
+            }
+            server_list.append(self.server_class._from_api(values, self.cloud_manager))
+        return server_list
+
+    def servers(self, populate: bool = False, max_workers: int = 8):
+        """
+        Return a list of Server instances for the rows.
+
+        The instances have the fields of the table's columns, like unpopulated servers from
+        get_servers. With populate=True the full details of each server are fetched by at most
+        `max_workers` threads and failures are collected in `.errors` of the returned
+        BulkResult as in get_servers. Tables of AsyncServers are populated with
+        `await table.populate_servers()` instead (see: AsyncServerTable).
+        """
+        if populate and inspect.iscoroutinefunction(self.server_class.populate):
+            raise UpCloudClientError(
+                'servers(populate=True) cannot populate async servers; '
+                'use `await table.populate_servers()`.'
+            )
+
+        server_list = self._instances()
+        if populate:
+            results = run_in_parallel(
+                lambda server_instance: server_instance.populate(),
+                server_list,
+                max_workers=max_workers,
+            )
+            for server_instance, (_, error) in zip(server_list, results, strict=True):
+                if error is not None:
+                    server_list.errors[server_instance] = error
+
+        return server_list
@@ -199,3 +199,23 @@ class Storage(UpCloudResource):
             storages = storages['storage']
 
         return [Storage(cloud_manager=cloud_manager, **storage) for storage in storages]
+
+    @classmethod
+    def _from_api(cls, storage, cloud_manager) -> 'Storage':
+        """
+        Return an instance for a storage dict from the API.
+
+        With an identity map (see: IdentityMap), the existing instance with the same UUID is
+        updated in place and returned instead of a new one.
+        """
+        identity_map = getattr(cloud_manager, 'identity_map', None)
+        uuid = storage.get('uuid')
+        if identity_map is None or not uuid:
+            return cls(cloud_manager=cloud_manager, **storage)
+
+        return identity_map.load(
+            cls,
+            uuid,
+            lambda: cls(cloud_manager=cloud_manager, **storage),
+            lambda instance: instance._reset(cloud_manager=cloud_manager, **storage),
+        )
@@ -1,5 +1,7 @@
 from upcloud_api.upcloud_resource import UpCloudResource
 
+STORAGE_IMPORT_FINAL_STATES = ['completed', 'failed', 'cancelled']
+
 
 class StorageImport(UpCloudResource):
     """
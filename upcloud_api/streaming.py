@@ -0,0 +1,176 @@
+import json
+import re
+
+_STRUCTURAL = re.compile(rb'["\[\]{}:,]')
+_STRING_END = re.compile(rb'["\\]')
+_NON_WHITESPACE = re.compile(rb'\S')
+
+
+class JSONArrayParser:
+    """
+    Incremental parser for one array of a JSON document that arrives in chunks.
+
+    The array is located by path, the keys of the objects leading to it, e.g.
+    ('storages', 'storage') for {"storages": {"storage": [...]}}. feed() returns the elements
+    that were completed by a chunk, each decoded on its own with loads. Only the element
+    being received is kept in memory, so memory use does not grow with the array.
+    """
+
+    def __init__(self, path, loads=json.loads) -> None:
+        """
+        Initialize a parser for the array at path, a sequence of object keys.
+        """
+        self.path = list(path)
+        self.loads = loads
+        self.done = False
+
+        self._buf = b''
+        self._pos = 0
+        # one (opening bracket, key in parent object) pair per open container
+        self._stack = []
+        self._key = None
+        self._expect_key = False
+        self._string_start = None
+        self._target_depth = None
+        self._element_start = None
+        self._element_pending = False
+
+    def feed(self, chunk: bytes) -> list:
+        """
+        Parse the next chunk of the document and return the elements it completed.
+        """
+        if self.done:
+            return []
+
+        keep = self._pos
+        if self._string_start is not None:
+            keep = min(keep, self._string_start)
+        if self._element_start is not None:
+            keep = min(keep, self._element_start)
+
+        self._buf = self._buf[keep:] + chunk
+        self._pos -= keep
+        if self._string_start is not None:
+            self._string_start -= keep
+        if self._element_start is not None:
+            self._element_start -= keep
+
+        elements = []
+        self._scan(elements)
+        return elements
+
+    def _scan(self, elements: list) -> None:
+        buf = self._buf
+        stack = self._stack
+
+        while True:
+            if self._string_start is not None:
+                match = _STRING_END.search(buf, self._pos)
+                if match is None:
+                    self._pos = len(buf)
+                    return
+                i = match.start()
+                if buf[i] == 0x5C:  # backslash, skip the escaped character
+                    if i + 1 >= len(buf):
+                        self._pos = i
+                        return
+                    self._pos = i + 2
+                    continue
+
+                self._pos = i + 1
+                if self._expect_key and self._element_start is None:
+                    self._key = json.loads(buf[self._string_start : self._pos])
+                self._string_start = None
+                continue
+
+            if self._element_pending:
+                match = _NON_WHITESPACE.search(buf, self._pos)
+                if match is None:
+                    self._pos = len(buf)
+                    return
+                self._element_pending = False
+                if buf[match.start()] != 0x5D:  # not the end of an empty array
+                    self._element_start = match.start()
+                self._pos = match.start()
+
+            match = _STRUCTURAL.search(buf, self._pos)
+            if match is None:
+                self._pos = len(buf)
+                return
+            i = match.start()
+            char = buf[i : i + 1]
+            self._pos = i + 1
+
+            if char == b'"':
+                self._string_start = i
+            elif char in (b'{', b'['):
+                in_object = bool(stack) and stack[-1][0] == b'{'
+                stack.append((char, self._key if in_object else None))
+                self._key = None
+                self._expect_key = char == b'{'
+                if (
+                    char == b'['
+                    and self._target_depth is None
+                    and [key for _, key in stack[1:]] == self.path
+                ):
+                    self._target_depth = len(stack)
+                    self._element_pending = True
+            elif char == b':':
+                self._expect_key = False
+            elif char == b',':
+                if len(stack) == self._target_depth:
+                    self._emit(elements, i)
+                    self._element_pending = True
+                self._expect_key = stack[-1][0] == b'{'
+            else:
+                # closing bracket
+                if char == b']' and len(stack) == self._target_depth:
+                    if self._element_start is not None:
+                        self._emit(elements, i)
+                    self.done = True
+                    self._buf = b''
+                    return
+                stack.pop()
+                self._expect_key = False
+
+    def _emit(self, elements: list, end: int) -> None:
+        elements.append(self.loads(self._buf[self._element_start : end]))
+        self._element_start = None
+
+
+def iter_json_array(chunks, path, loads=json.loads):
+    """
+    Yield the elements of the array at path from a JSON document given as byte chunks.
+
+    See JSONArrayParser.
+    """
+    parser = JSONArrayParser(path, loads)
+    try:
+        for chunk in chunks:
+            yield from parser.feed(chunk)
+            if parser.done:
+                return
+    finally:
+        # release the connection of a streamed response that is not read to the end
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+async def aiter_json_array(chunks, path, loads=json.loads):
+    """
+    Asynchronously yield the elements of the array at path from async byte chunks.
+
+    See JSONArrayParser.
+    """
+    parser = JSONArrayParser(path, loads)
+    try:
+        async for chunk in chunks:
+            for element in parser.feed(chunk):
+                yield element
+            if parser.done:
+                return
+    finally:
+        aclose = getattr(chunks, 'aclose', None)
+        if aclose is not None:
+            await aclose()
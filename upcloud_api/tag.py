@@ -14,6 +14,8 @@ class Tag(UpCloudResource):
                can be instantiated with UUID strings or Server objects
     """
 
+    __slots__ = ('_api_name',)
+
     ATTRIBUTES = {'name': None, 'description': None, 'servers': []}
 
     def __init__(self, name: str, description=None, servers=None, **kwargs) -> None:
@@ -39,7 +41,26 @@ class Tag(UpCloudResource):
 
         # convert UUIDs into server objects
         if self.servers and isinstance(self.servers[0], str):
-            self.servers = [Server(uuid=server, populated=False) for server in self.servers]
+            cloud_manager = getattr(self, 'cloud_manager', None)
+            identity_map = getattr(cloud_manager, 'identity_map', None)
+            # AsyncServer for an AsyncCloudManager
+            server_class = getattr(cloud_manager, 'server_class', Server)
+            if identity_map is None:
+                self.servers = [
+                    server_class(uuid=server, populated=False) for server in self.servers
+                ]
+            else:
+                # reuse the servers' objects instead of building stubs
+                self.servers = [
+                    identity_map.load(
+                        server_class,
+                        uuid,
+                        lambda uuid=uuid: server_class(
+                            uuid=uuid, populated=False, cloud_manager=cloud_manager
+                        ),
+                    )
+                    for uuid in self.servers
+                ]
 
     @property
     def server_uuids(self):
@@ -4,13 +4,40 @@ if TYPE_CHECKING:
     from upcloud_api import CloudManager
 
 
-class UpCloudResource:
+class _SlotsFromAttributes(type):
+    """
+    Metaclass that gives each resource class __slots__ for the keys of its ATTRIBUTES.
+
+    Names listed in a class body's own __slots__ are kept, and names that are already slots
+    of a base class or defined in the class body (e.g. properties) are skipped.
+    """
+
+    def __new__(mcls, name, bases, namespace):
+        inherited = set()
+        for base in bases:
+            for klass in base.__mro__:
+                inherited.update(klass.__dict__.get('__slots__', ()))
+
+        slots = list(namespace.get('__slots__', ()))
+        for attr in namespace.get('ATTRIBUTES', {}):
+            if attr not in inherited and attr not in namespace and attr not in slots:
+                slots.append(attr)
+
+        namespace['__slots__'] = tuple(slots)
+        return super().__new__(mcls, name, bases, namespace)
+
+
+class UpCloudResource(metaclass=_SlotsFromAttributes):
     """
     Base class for all API resources.
 
     ATTRIBUTES is used to define serialization (see: to_dict)
     and defaults (see: __init__ and _reset).
 
+    Instances have no per-instance __dict__: the keys of ATTRIBUTES are stored in slots
+    and any other attribute (e.g. a new field returned by the API) in an overflow dict
+    that is only created when needed.
+
     All UpCloudResources:
     - must define ATTRIBUTES accordingly with https://www.upcloud.com/api/ (doc)
     - must have `to_dict` for JSON serialization
@@ -19,6 +46,8 @@ class UpCloudResource:
     - optionally implement `sync` for refreshing the instance with new data from API
     """
 
+    __slots__ = ('cloud_manager', '_extra', '__weakref__')
+
     ATTRIBUTES = {}  # subclass should define this
 
     cloud_manager: 'CloudManager'
@@ -31,6 +60,38 @@ class UpCloudResource:
         """
         self._reset(**kwargs)
 
+    def __getattr__(self, name):
+        # only called when the attribute is not found in a slot or the class
+        try:
+            return object.__getattribute__(self, '_extra')[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(
+                f'{type(self).__name__!r} object has no attribute {name!r}'
+            ) from None
+
+    def __setattr__(self, name, value):
+        try:
+            object.__setattr__(self, name, value)
+        except AttributeError:
+            if hasattr(type(self), name):
+                # e.g. a read-only property
+                raise
+            try:
+                extra = object.__getattribute__(self, '_extra')
+            except AttributeError:
+                extra = {}
+                object.__setattr__(self, '_extra', extra)
+            extra[name] = value
+
+    def __delattr__(self, name):
+        try:
+            object.__delattr__(self, name)
+        except AttributeError:
+            try:
+                del object.__getattribute__(self, '_extra')[name]
+            except (AttributeError, KeyError):
+                raise AttributeError(name) from None
+
     def _reset(self, **kwargs) -> None:
         """
         Reset after repopulating from API (or when initializing).
@@ -0,0 +1,429 @@
+import hashlib
+import lzma
+import mmap
+import os
+import queue
+import threading
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from os import PathLike
+from typing import BinaryIO
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from upcloud_api.errors import UpCloudAPIError, UpCloudClientError
+from upcloud_api.utils import retry_with_backoff
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+# content type and default level of each compression; the levels favour speed so that
+# compressing keeps up with the upload
+COMPRESSIONS = {
+    'gzip': ('application/gzip', 1),
+    'xz': ('application/x-xz', 0),
+    'zstd': ('application/zstd', 3),
+}
+
+
+def is_retryable_upload_error(error) -> bool:
+    """
+    Return True for failed chunk uploads that are worth retrying: connection errors,
+    timeouts, rate limiting (HTTP 429) and server errors (HTTP 5xx).
+    """
+    if not isinstance(error, UpCloudAPIError):
+        return False
+    status_code = error.status_code
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+class _FileSource:
+    """
+    Random access to the bytes of a file for uploading it in chunks.
+
+    Paths and file objects with a descriptor are memory mapped, or read with positioned
+    reads if they cannot be mapped (e.g. empty files); other file objects are read under a
+    lock. Only the requested chunk is copied into memory.
+    """
+
+    def __init__(self, file: str | PathLike | BinaryIO) -> None:
+        """
+        Open a path (closed again by close()) or use an open binary file object.
+        """
+        self._owned = not hasattr(file, 'read')
+        self._file = open(file, 'rb') if self._owned else file
+        self._lock = threading.Lock()
+        self._map = None
+
+        try:
+            self._fd = self._file.fileno()
+        except (AttributeError, OSError):
+            self._fd = None
+
+        if self._fd is not None:
+            self.size = os.fstat(self._fd).st_size
+            try:
+                self._map = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                self._map = None
+        else:
+            self.size = self._file.seek(0, os.SEEK_END)
+
+    def read(self, offset: int, size: int) -> bytes:
+        """
+        Return up to size bytes starting at offset.
+        """
+        if self._map is not None:
+            return self._map[offset : offset + size]
+        if self._fd is not None and hasattr(os, 'pread'):
+            return os.pread(self._fd, size, offset)
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def close(self) -> None:
+        """
+        Unmap the file and close it if it was opened from a path.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._owned:
+            self._file.close()
+
+
+class ChunkedUpload:
+    """
+    Upload a file to a direct upload URL in fixed-size chunks with bounded memory.
+
+    Every chunk is a PUT of chunk_size bytes with a Content-Range header, sent over a pooled
+    session. At most max_parallel chunks are in flight (and in memory) at a time; the
+    default of one sends them in order. Failed chunks are retried with exponential backoff,
+    up to `retries` attempts (see: is_retryable_upload_error); after that, upload() raises
+    and the upload can be resumed from any offset the uploader has confirmed.
+    """
+
+    def __init__(
+        self,
+        file: str | PathLike | BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_parallel: int = 1,
+        retries: int = 5,
+        timeout: float = 60,
+        content_type: str = 'application/octet-stream',
+    ) -> None:
+        """
+        Open the file to upload; call close() (or use as a context manager) when done.
+        """
+        if chunk_size <= 0:
+            raise ValueError('chunk_size must be positive')
+        self.source = _FileSource(file)
+        self.chunk_size = chunk_size
+        self.max_parallel = max(1, max_parallel)
+        self.retries = retries
+        self.timeout = timeout
+        self.content_type = content_type
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_parallel)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the file in bytes.
+        """
+        return self.source.size
+
+    def close(self) -> None:
+        """
+        Close the file and the session.
+        """
+        self.source.close()
+        self.session.close()
+
+    def _put_chunk(self, url: str, offset: int) -> dict:
+        """
+        PUT the chunk starting at offset and return the uploader's response.
+        """
+        data = self.source.read(offset, self.chunk_size)
+        end = offset + len(data) - 1
+        headers = {
+            'Content-Type': self.content_type,
+            'Content-Range': f'bytes {offset}-{end}/{self.size}',
+        }
+        try:
+            res = self.session.put(url, data=data, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise UpCloudAPIError('UPLOAD_FAILED', f'chunk at {offset}: {e}') from e
+
+        if not res.ok:
+            raise UpCloudAPIError(
+                'UPLOAD_FAILED',
+                f'chunk at {offset}: HTTP {res.status_code} {res.text[:200]}',
+                status_code=res.status_code,
+            )
+        return res.json() if res.content else {}
+
+    def _send(self, url: str, offset: int) -> dict:
+        return retry_with_backoff(
+            lambda: self._put_chunk(url, offset),
+            is_retryable=is_retryable_upload_error,
+            n=self.retries,
+        )
+
+    def upload(self, url: str, offset: int = 0) -> dict:
+        """
+        Upload the file from offset to the end and return the uploader's last response.
+
+        With parallel chunks, that is the response confirming the most bytes (read_bytes),
+        or the one received last if the uploader does not report them: the chunk at the end
+        of the file may be done before the ones before it. Raises the error of the first
+        chunk that failed all its attempts; chunks already in flight are finished first, no
+        new ones are started.
+        """
+        offsets = range(offset, self.size, self.chunk_size)
+        if not offsets:
+            return {}
+        if self.max_parallel == 1:
+            response = {}
+            for chunk in offsets:
+                response = self._send(url, chunk)
+            return response
+
+        last = {}
+        pending = {}
+        chunks = iter(offsets)
+        error = None
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            while True:
+                while error is None and len(pending) < self.max_parallel:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending[executor.submit(self._send, url, chunk)] = chunk
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        if error is None or chunk < error[0]:
+                            error = (chunk, e)
+                        continue
+                    if int(response.get('read_bytes') or 0) >= int(last.get('read_bytes') or 0):
+                        last = response
+
+        if error is not None:
+            raise error[1]
+        return last
+
+
+class _End:
+    """
+    Marks the end of the blocks of an UploadStream.
+    """
+
+
+class UploadStream:
+    """
+    Stream a file for an upload in one pass, compressing and hashing it on the fly.
+
+    Iterating the stream yields the bytes to send. A background thread reads the file in
+    blocks of block_size bytes, compresses them with compression ('gzip', 'xz', 'zstd' or
+    None) and hashes the result while the previous blocks are being sent; at most
+    queue_size blocks wait in memory. Once the stream is exhausted, sha256 and md5 hold the
+    digests of the sent bytes, which is what the API reports in StorageImport.sha256sum and
+    md5sum (see: verify). 'zstd' requires the zstandard package.
+    """
+
+    def __init__(
+        self,
+        file: str | PathLike | BinaryIO,
+        compression: str | None = None,
+        level: int | None = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        queue_size: int = 4,
+    ) -> None:
+        """
+        Prepare to stream a path or a readable binary file object (e.g. a pipe).
+        """
+        if compression is not None and compression not in COMPRESSIONS:
+            raise UpCloudClientError(f'invalid compression: {compression}')
+        if compression == 'zstd' and zstandard is None:
+            raise UpCloudClientError('zstd compression requires the zstandard package')
+
+        self.file = file
+        self.compression = compression
+        self.level = (
+            level if level is not None or compression is None else COMPRESSIONS[compression][1]
+        )
+        self.block_size = block_size
+        self.queue_size = queue_size
+
+        self._reset()
+
+    def _reset(self) -> None:
+        self.bytes_read = 0
+        self.bytes_sent = 0
+        self._sha256 = hashlib.sha256()
+        self._md5 = hashlib.md5(usedforsecurity=False)
+
+    @property
+    def content_type(self) -> str:
+        """
+        Content type of the sent bytes.
+        """
+        if self.compression is None:
+            return 'application/octet-stream'
+        return COMPRESSIONS[self.compression][0]
+
+    @property
+    def sha256(self) -> str:
+        """
+        SHA-256 hex digest of the bytes sent so far.
+        """
+        return self._sha256.hexdigest()
+
+    @property
+    def md5(self) -> str:
+        """
+        MD5 hex digest of the bytes sent so far.
+        """
+        return self._md5.hexdigest()
+
+    def _compressor(self):
+        if self.compression == 'gzip':
+            # wbits 16 + 15: gzip header and trailer
+            return zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        if self.compression == 'xz':
+            return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=self.level)
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level).compressobj()
+        return None
+
+    def _blocks(self):
+        """
+        Yield the compressed and hashed blocks to send, from the start of the file.
+        """
+        self._reset()
+        compressor = self._compressor()
+        owned = not hasattr(self.file, 'read')
+        f = open(self.file, 'rb') if owned else self.file
+        try:
+            while True:
+                block = f.read(self.block_size)
+                if not block:
+                    break
+                self.bytes_read += len(block)
+                data = compressor.compress(block) if compressor is not None else block
+                if data:
+                    yield self._hashed(data)
+            if compressor is not None:
+                data = compressor.flush()
+                if data:
+                    yield self._hashed(data)
+        finally:
+            if owned:
+                f.close()
+
+    def _hashed(self, data: bytes) -> bytes:
+        self._sha256.update(data)
+        self._md5.update(data)
+        self.bytes_sent += len(data)
+        return data
+
+    def __iter__(self):
+        blocks = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def _put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    blocks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def _produce():
+            try:
+                for data in self._blocks():
+                    if not _put(data):
+                        return
+                _put(_End)
+            except Exception as e:
+                _put(e)
+
+        producer = threading.Thread(target=_produce, name='upcloud-upload-stream', daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = blocks.get()
+                if item is _End:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            producer.join()
+
+    def upload(self, url: str, timeout: float | None = 60) -> dict:
+        """
+        Stream the file to a direct upload URL in one PUT and return the uploader's response.
+        """
+        try:
+            res = requests.put(
+                url, data=iter(self), headers={'Content-Type': self.content_type}, timeout=timeout
+            )
+        except requests.exceptions.RequestException as e:
+            raise UpCloudAPIError('UPLOAD_FAILED', str(e)) from e
+
+        if not res.ok:
+            raise UpCloudAPIError(
+                'UPLOAD_FAILED',
+                f'HTTP {res.status_code} {res.text[:200]}',
+                status_code=res.status_code,
+            )
+        return res.json() if res.content else {}
+
+    def verify(self, storage_import) -> None:
+        """
+        Raise UpCloudClientError unless the digests of the sent bytes match those the API
+        reports for the import (a StorageImport or the uploader's response dict).
+        """
+        if isinstance(storage_import, dict):
+            reported = storage_import
+        else:
+            reported = {
+                'sha256sum': storage_import.sha256sum,
+                'md5sum': storage_import.md5sum,
+            }
+
+        checked = False
+        for field, digest in (('sha256sum', self.sha256), ('md5sum', self.md5)):
+            if reported.get(field):
+                checked = True
+                if reported[field] != digest:
+                    raise UpCloudClientError(
+                        f'{field} mismatch: sent {digest}, import reports {reported[field]}'
+                    )
+        if not checked:
+            raise UpCloudClientError('the import reports no checksums to verify against')
@@ -1,4 +1,6 @@
 import itertools
+import random
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
 
 from upcloud_api.errors import UpCloudAPIError, UpCloudClientError
@@ -22,3 +24,83 @@ def try_it_n_times(operation, expected_error_codes, custom_error='operation fail
             sleep(3)
         if i >= n - 1:
             raise UpCloudClientError(custom_error)
+
+
+TRANSIENT_ERROR_CODES = ['SERVER_STATE_ILLEGAL', 'STORAGE_STATE_ILLEGAL']
+
+
+def is_transient_error(error, transient_error_codes=None) -> bool:
+    """
+    Return True for API errors that are likely to succeed when retried later:
+    resources that are temporarily in an illegal state and rate limited (HTTP 429) requests.
+    """
+    if transient_error_codes is None:
+        transient_error_codes = TRANSIENT_ERROR_CODES
+
+    return isinstance(error, UpCloudAPIError) and (
+        error.error_code in transient_error_codes or error.status_code == 429
+    )
+
+
+def retry_with_backoff(
+    operation, is_retryable=is_transient_error, n=5, base_delay=1, max_delay=30
+):
+    """
+    Call operation and return its result, retrying up to n attempts in total.
+
+    Only errors for which is_retryable(error) returns True are retried; others are raised
+    immediately, as is the last error. Waits an exponentially growing, randomised
+    ("full jitter") time between attempts.
+    """
+    for attempt in range(n):
+        try:
+            return operation()
+        except UpCloudClientError as e:
+            if attempt >= n - 1 or not is_retryable(e):
+                raise
+            sleep(random.uniform(0, min(max_delay, base_delay * 2**attempt)))  # noqa: S311
+
+
+class BulkResult(list):
+    """
+    Results of an operation run for many items, in the same order as the given items.
+
+    A failure for one item does not abort the others; the exception is stored in
+    `errors` with the failed item as the key.
+    """
+
+    def __init__(self, results=(), errors=None):
+        """
+        Initialize with the results and a dict of errors keyed by the failed items.
+        """
+        super().__init__(results)
+        self.errors = errors if errors is not None else {}
+
+    @property
+    def ok(self) -> bool:
+        """
+        True when the operation succeeded for every item.
+        """
+        return not self.errors
+
+
+def run_in_parallel(operation, items, max_workers=8):
+    """
+    Call operation(item) for every item using a bounded pool of worker threads.
+
+    Returns a list of (result, exception) tuples in the same order as items.
+    Exactly one of result and exception is set for each item.
+    """
+    items = list(items)
+
+    def _call(item):
+        try:
+            return operation(item), None
+        except Exception as e:
+            return None, e
+
+    if max_workers <= 1 or len(items) <= 1:
+        return [_call(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(_call, items))